@@ -2,6 +2,8 @@ from src.util import Vector2D
 
 PLAYER_1_PORT = 5700
 PLAYER_2_PORT = 5701
+# Seconds without input before a player counts as disconnected and the NPC takes over
+CONNECTION_TIMEOUT = 2
 
 SPEED_RATE = 0.15
 
@@ -19,3 +21,23 @@ VERTICAL_LABEL_MARGIN = 30
 
 NPC_MAX_BASE_SPEED = 0.35
 GRAVITY = -180
+
+# Players created per sound, when all of them are busy the oldest one is cut off for the new sound
+AUDIO_VOICES = 4
+
+# "python" integrates each GameObject on its own and is the faster one for the game, "numpy" keeps all bodies in a
+# PhysicsStore of arrays, which only pays off with thousands of moving objects (see the README)
+PHYSICS_BACKEND = "python"
+
+# Simulation ticks per second, independent of the render rate
+TICK_RATE = 120
+# Most ticks simulated in one frame, after a longer hitch the game slows down instead of catching up
+MAX_SUBSTEPS = 8
+# Frames drawn per second
+RENDER_RATE = 60
+
+# Spectator feed: snapshots per second, seconds without an acknowledgement before a spectator is dropped
+SPECTATOR_PORT = 5800
+SPECTATOR_RATE = 30
+SPECTATOR_TIMEOUT = 5
+MAX_SPECTATORS = 64
@@ -1,32 +1,132 @@
-import sys
-import pyglet
-from pyglet import window, clock
-from config import WINDOW_WIDTH, WINDOW_HEIGHT
-from src.managers.game_manager import GameManager
-from src.managers.collision_manager import CollisionManager
-from src.managers.ui import GameUI
-from src.util import gameobject_batch, ui_batch
+import time
+
+STARTED = time.perf_counter()  # Before the other imports, so the startup report includes them
+
+import sys  # noqa: E402
+import click  # noqa: E402
+import pyglet  # noqa: E402
+from pyglet import window, clock  # noqa: E402
+from pyglet.window import key  # noqa: E402
+from config import MAX_SUBSTEPS, RENDER_RATE, TICK_RATE, WINDOW_WIDTH, WINDOW_HEIGHT  # noqa: E402
+from DIPPID import SensorUDP  # noqa: E402
+from src.assets import AssetManager  # noqa: E402
+from src.latency import LatencyTracker  # noqa: E402
+from src.managers.game_manager import GameManager  # noqa: E402
+from src.managers.collision_manager import CollisionManager  # noqa: E402
+from src.managers.ui import GameUI  # noqa: E402
+from src.profiler import FrameProfiler, ProfilerOverlay  # noqa: E402
+from src.scripts.paddle import Paddle  # noqa: E402
+from src.spectator import SpectatorFeed  # noqa: E402
+from src.startup import StartupTimer  # noqa: E402
+from src.timestep import FixedTimestep  # noqa: E402
+from src.util import gameobject_batch, ui_batch  # noqa: E402
+
+IMPORTED = time.perf_counter()
 
 
 class GameWindow(window.Window):
-    def __init__(self):
-        super().__init__(WINDOW_WIDTH, WINDOW_HEIGHT)
-        self._default_vertex_source
-        self.set_caption("DIPPID Pong")
-        self.set_visible(True)
-        self.game_manager = GameManager(self)
-        self.collision_manager = CollisionManager(self, self.game_manager)
-        self.ui = GameUI(self)
+    def __init__(
+        self,
+        assets: AssetManager = None,
+        startup: StartupTimer = None,
+        print_startup: bool = False,
+        profile_path: str = None,
+        measure_latency: bool = False,
+        spectator_port: int = None,
+    ):
+        """
+        Sounds are only loaded by `assets` once the first frame is drawn. `startup` times the phases until then,
+        `print_startup` prints them. With `profile_path` frame times are recorded from the start and written there
+        on exit, otherwise only while the profiler overlay (F3) is shown. `measure_latency` follows every paddle
+        input to the frame that shows it and prints the latencies on exit. With `spectator_port` the match is
+        broadcast to spectators connecting to that port.
+        """
+        self.assets = assets if assets is not None else AssetManager()
+        self.startup = startup if startup is not None else StartupTimer()
+        self.print_startup = print_startup
+        with self.startup.phase("window"):
+            super().__init__(WINDOW_WIDTH, WINDOW_HEIGHT)
+            self._default_vertex_source
+            self.set_caption("DIPPID Pong")
+            self.set_visible(True)
+        with self.startup.phase("scene"):
+            self.game_manager = GameManager(
+                self, sensor_factory=self.startup.timed("sensors", SensorUDP), assets=self.assets
+            )
+            self.collision_manager = CollisionManager(self, self.game_manager)
+        with self.startup.phase("ui"):
+            self.ui = GameUI(self)
+        self.timestep = FixedTimestep(TICK_RATE, MAX_SUBSTEPS)
+        self.spectators = None
+        if spectator_port is not None:
+            # Snapshots are stamped with the time of the last tick, not the frame they're sent on
+            self.spectators = SpectatorFeed(self.game_manager, spectator_port, clock=lambda: self.timestep.time)
+
+        paddles = [go.get_script(Paddle) for go in self.game_manager.find_by_script(Paddle)]
+        self.latency = LatencyTracker()
+        self.latency.attach(self, self.game_manager, paddles)
+        # Before the profiler, which then wraps the latency hooks and restores them when it's disabled
+        if measure_latency:
+            self.latency.enable()
+
+        self.profiler = FrameProfiler()
+        self.profiler.instrument(self.collision_manager, "update", "collision")
+        self.profiler.instrument(self.game_manager, "update", "game")
+        self.profiler.instrument(self.ui, "update", "ui")
+        self.profiler.instrument(gameobject_batch, "draw", "draw objects")
+        self.profiler.instrument(ui_batch, "draw", "draw ui")
+        for paddle in paddles:
+            self.profiler.instrument(paddle.sensor, "_update", "sensors")
+        if self.spectators is not None:
+            self.profiler.instrument(self.spectators, "update", "spectators")
+        self.overlay = ProfilerOverlay(self.profiler, 10, WINDOW_HEIGHT - 10)
+        self.profile_path = profile_path
+        if profile_path:
+            self.profiler.enable()
 
     def on_update(self, delta_time):
-        self.collision_manager.update(delta_time)
-        self.game_manager.update(delta_time)
+        # The simulation advances in fixed ticks, drawing interpolates between the last two of them
+        tick = self.timestep.tick
+        for _ in range(self.timestep.advance(delta_time)):
+            self.game_manager.begin_tick()
+            self.collision_manager.update(tick)
+            self.game_manager.update(tick)
+        self.game_manager.sync_shapes(self.timestep.alpha)
+        if self.spectators is not None:
+            self.spectators.update()
         self.ui.update(delta_time)
+        self.overlay.update(delta_time)
 
     def on_draw(self):
         self.clear()
         gameobject_batch.draw()
         ui_batch.draw()
+        self.overlay.draw()
+        if self.profiler.enabled:
+            self.profiler.end_frame()
+        if self.startup.first_frame is None:
+            self.startup.frame_drawn()
+            # Decode sounds while the first frames are shown, not before
+            self.assets.preload()
+            if self.print_startup:
+                clock.schedule_once(self.report_startup, 0)
+
+    def report_startup(self, delta_time=None):
+        """Prints the startup phases once the background loads are done."""
+        if self.assets.pending():
+            clock.schedule_once(self.report_startup, 0.05)
+            return
+        print(self.startup.report(self.assets.load_times))
+
+    def on_key_press(self, symbol, modifiers):
+        if symbol == key.F3:
+            self.overlay.toggle()
+            if self.overlay.visible:
+                self.profiler.enable()
+            elif not self.profile_path:
+                self.profiler.disable()
+            return
+        return super().on_key_press(symbol, modifiers)
 
     def on_resize(self, width, height):
         # Enforce fixed window size
@@ -38,12 +138,41 @@ class GameWindow(window.Window):
         super().on_close()
 
         clock.unschedule(self.on_update)
+        if self.profile_path:
+            self.profiler.export(self.profile_path)
+        if self.latency.enabled:
+            print(self.latency.report())
+        if self.spectators is not None:
+            stats = self.spectators.stats()
+            if stats.sent:
+                print(
+                    f"Spectator feed: {stats.snapshots} snapshots, {stats.bandwidth:,.0f} B/s and"
+                    f" {stats.cpu * 100:.3f}% of a core per spectator"
+                )
+            self.spectators.close()
         self.game_manager.exit()
         pyglet.app.exit()
         sys.exit()
 
 
+@click.command()
+@click.option("--profile-startup", is_flag=True, help="Print how long each startup phase took")
+@click.option("--profile", "profile_path", default=None, help="Record frame times and write them to this .csv or .json file on exit")
+@click.option("--latency", is_flag=True, help="Print how long paddle inputs took to reach the screen on exit")
+@click.option("--spectator-port", type=int, default=None, help="Broadcast the match to spectators on this port, e.g. 5800")
+def main(profile_startup: bool, profile_path: str, latency: bool, spectator_port: int):
+    startup = StartupTimer(STARTED)
+    startup.add("import", IMPORTED - STARTED)
+    win = GameWindow(
+        startup=startup,
+        print_startup=profile_startup,
+        profile_path=profile_path,
+        measure_latency=latency,
+        spectator_port=spectator_port,
+    )
+    pyglet.clock.schedule_interval(win.on_update, 1 / RENDER_RATE)
+    pyglet.app.run(1 / RENDER_RATE)
+
+
 if __name__ == "__main__":
-    win = GameWindow()
-    pyglet.clock.schedule_interval(win.on_update, 1 / 60.0)
-    pyglet.app.run()
+    main()
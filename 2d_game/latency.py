@@ -0,0 +1,82 @@
+import os
+import sys
+import threading
+from typing import Optional
+import click
+import pyglet
+
+# The sender's modules, after the game's directory so the game keeps its own DIPPID module
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "dippid_sender"))
+
+# A tilt that changes with every packet and a pressed button, so the player connects and every packet moves the paddle
+DEFAULT_CONFIG = {
+    "interval": 10,
+    "mocks": {
+        "gravity": {"z": "sin(t) * 9.81 * 2 - 9.81"},
+        "button_1": "1",
+    },
+}
+
+
+@click.command()
+@click.option("--duration", "-d", default=10.0, show_default=True, help="Seconds to measure")
+@click.option("--warmup", default=1.0, show_default=True, help="Seconds to run before measuring")
+@click.option("--config", "-c", default=None, help="Sender mock config as JSON string or path/to/file.json, a sine wave on gravity.z by default")
+@click.option("--interval", "-i", type=int, default=None, help="Milliseconds between packets, overrides the config")
+@click.option("--side", type=click.Choice(["left", "right"]), default="left", show_default=True, help="Paddle to send to")
+@click.option("--headless", is_flag=True, help="Render offscreen without a display (needs EGL)")
+@click.option("--output", "-o", default=None, help="Write the latencies of every input to this .json file")
+def main(
+    duration: float,
+    warmup: float,
+    config: Optional[str],
+    interval: Optional[int],
+    side: str,
+    headless: bool,
+    output: Optional[str],
+):
+    """
+    Runs the game window and streams inputs from the DIPPID sender over loopback to one paddle, then prints how long
+    the inputs took from being received to being on screen. The sender schedules its packets against fixed deadlines,
+    so the same config and interval give comparable runs.
+    """
+    # pyglet opens the display when the window module is imported
+    if headless:
+        pyglet.options["headless"] = True
+    from config import RENDER_RATE
+    from DIPPID_sender import DEFAULT_INTERVAL, load_config, prepare_mocks, stream
+    from game import GameWindow
+    from src.scripts.paddle import Paddle
+    from transport import Transport
+
+    cfg = load_config(config) if config else DEFAULT_CONFIG
+    interval = interval or cfg.get("interval", DEFAULT_INTERVAL)
+    base_dir = os.path.dirname(os.path.abspath(config)) if config and os.path.isfile(config) else os.getcwd()
+    prepared = prepare_mocks(cfg.get("mocks", {}), interval, base_dir)
+
+    win = GameWindow(measure_latency=True)
+    port = win.game_manager.find("Paddle Left" if side == "left" else "Paddle Right").get_script(Paddle).player_id
+    transport = Transport([("127.0.0.1", port)])
+    stop = threading.Event()
+    sender = threading.Thread(
+        target=stream, args=(transport, prepared, interval), kwargs={"should_stop": stop.is_set}, daemon=True
+    )
+    print(f"Sending to port {port} every {interval}ms, measuring for {duration:g}s after {warmup:g}s warm up")
+
+    pyglet.clock.schedule_interval(win.on_update, 1 / RENDER_RATE)
+    pyglet.clock.schedule_once(lambda dt: win.latency.clear(), warmup)
+    # Closing prints the report
+    pyglet.clock.schedule_once(lambda dt: win.dispatch_event("on_close"), warmup + duration)
+    sender.start()
+    try:
+        pyglet.app.run(1 / RENDER_RATE)
+    finally:
+        stop.set()
+        sender.join()
+        transport.close()
+        if output:
+            win.latency.export(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import multiprocessing
+import os
+import queue
+import time
+from typing import List, Optional, Tuple
+import click
+
+import src.no_display  # noqa: F401
+
+from config import TICK_RATE
+from src.match_server import (
+    MatchServer,
+    PortAllocator,
+    ShardStats,
+    UDPHub,
+    matches_per_core,
+    measure_tick_cost,
+    plan_shards,
+)
+
+DEFAULT_BASE_PORT = 6000
+# Share of a core a shard is planned to use, the rest absorbs hitches and socket bursts
+TARGET_LOAD = 0.75
+
+MatchSpec = Tuple[int, Tuple[int, int], Optional[int]]  # Match id, sensor ports, seed
+
+
+def raise_file_limit(needed: int):
+    """Every sensor port is a socket, raise the soft limit of open files as far as allowed."""
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != resource.RLIM_INFINITY and soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (needed if hard == resource.RLIM_INFINITY else min(needed, hard), hard))
+
+
+def run_shard(
+    shard: int,
+    specs: List[MatchSpec],
+    tick_rate: float,
+    ip: Optional[str],
+    npc: bool,
+    stop: "multiprocessing.synchronize.Event",
+    reports: "multiprocessing.Queue",
+    report_interval: float,
+):
+    """Runs one shard of the matches in this process until `stop` is set."""
+    if ip is not None:
+        raise_file_limit(2 * len(specs) + 64)
+    server = MatchServer(tick_rate, UDPHub(ip) if ip is not None else None, shard)
+    try:
+        for match_id, ports, seed in specs:
+            server.add_match(match_id, ports, seed, npc)
+        server.run(stop.is_set, reports.put, report_interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+def print_stats(stats: List[ShardStats], tick_rate: float):
+    matches = sum(s.matches for s in stats)
+    finished = sum(s.finished for s in stats)
+    received = sum(s.received for s in stats)
+    dropped = sum(s.dropped for s in stats)
+    shards = ", ".join(
+        f"#{s.shard} {s.matches} matches {s.ticks / s.elapsed:.0f} ticks/s {s.load:.0%} load {s.overruns} late"
+        for s in stats
+    )
+    print(f"{matches} matches at {tick_rate:g} Hz, {finished} finished, {received} packets ({dropped} dropped) | {shards}")
+
+
+@click.command()
+@click.option("--matches", "-n", default=8, show_default=True, help="Number of concurrent matches")
+@click.option("--tick-rate", "-r", default=TICK_RATE, show_default=True, help="Simulation ticks per second")
+@click.option("--base-port", "-p", default=DEFAULT_BASE_PORT, show_default=True, help="First sensor port")
+@click.option("--ip", default="0.0.0.0", show_default=True, help="Address the sensor ports are bound to")
+@click.option("--no-network", is_flag=True, help="Don't bind sensor ports, e.g. for load tests with --npc")
+@click.option("--npc", is_flag=True, help="Start every match right away, NPC against NPC until players connect")
+@click.option("--workers", "-w", default=0, show_default=True, help="Processes to shard matches over, 0 plans them from the measured tick cost")
+@click.option("--duration", "-d", type=float, default=None, help="Seconds to run, forever by default")
+@click.option("--stats", default=5.0, show_default=True, help="Seconds between stats reports")
+@click.option("--seed", "-s", type=int, default=None, help="Seed for reproducible matches")
+@click.option("--benchmark", type=float, default=None, help="Measure the tick cost for this many seconds and print the matches per core")
+def main(
+    matches: int,
+    tick_rate: float,
+    base_port: int,
+    ip: str,
+    no_network: bool,
+    npc: bool,
+    workers: int,
+    duration: Optional[float],
+    stats: float,
+    seed: Optional[int],
+    benchmark: Optional[float],
+):
+    """
+    Hosts many Pong matches in one server. Each match listens for its two players on a pair of consecutive ports
+    starting at the base port. Matches are sharded over worker processes once one core can't tick them all.
+    """
+    cores = os.cpu_count() or 1
+    if benchmark is not None or workers == 0:
+        cost = measure_tick_cost(tick_rate, duration=benchmark or 0.5)
+        capacity = matches_per_core(cost, tick_rate, TARGET_LOAD)
+        print(
+            f"Tick cost {cost * 1e6:.1f} us per match: {matches_per_core(cost, tick_rate)} matches per core"
+            f" at {tick_rate:g} Hz, {capacity} at {TARGET_LOAD:.0%} load"
+        )
+        if benchmark is not None:
+            return
+        shard_sizes = plan_shards(matches, capacity, cores)
+        if len(shard_sizes) * capacity < matches:
+            print(f"Warning: {matches} matches exceed the planned capacity of {cores} cores")
+    else:
+        shard_sizes = plan_shards(matches, max(1, -(-matches // workers)), workers)
+
+    ports = PortAllocator(base_port)
+    specs: List[MatchSpec] = [
+        (i, ports.allocate(), None if seed is None else seed + i) for i in range(matches)
+    ]
+    shards, start = [], 0
+    for size in shard_sizes:
+        shards.append(specs[start : start + size])
+        start += size
+    if not no_network:
+        print(f"Match i listens on ports {base_port} + 2i (left) and {base_port} + 2i + 1 (right), up to {specs[-1][1][1]}")
+    print(f"{matches} matches in {len(shards)} shard(s) at {tick_rate:g} Hz")
+
+    stop = multiprocessing.Event()
+    reports = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(
+            target=run_shard,
+            args=(i, shard, tick_rate, None if no_network else ip, npc, stop, reports, stats),
+            daemon=True,
+        )
+        for i, shard in enumerate(shards)
+    ]
+    for process in processes:
+        process.start()
+
+    deadline = None if duration is None else time.monotonic() + duration
+    latest = {}
+    try:
+        while deadline is None or time.monotonic() < deadline:
+            try:
+                report = reports.get(timeout=0.2)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes):
+                    break
+                continue
+            latest[report.shard] = report
+            if len(latest) == len(processes):
+                print_stats([latest[i] for i in sorted(latest)], tick_rate)
+                latest.clear()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import time
+from multiprocessing import Pool
+from typing import List, Optional, Tuple
+import click
+
+import src.no_display  # noqa: F401
+
+from config import PLAYER_1_PORT, TICK_RATE
+from src.headless import HeadlessGame, MatchResult
+
+
+def play(job: Tuple[int, Optional[int], float, float]) -> List[MatchResult]:
+    """Plays a share of the matches in one process, every worker has its own game and random state."""
+    matches, seed, tick_rate, max_duration = job
+    game = HeadlessGame(tick_rate=tick_rate, seed=seed)
+    try:
+        return [game.run_match(max_duration) for _ in range(matches)]
+    finally:
+        game.close()
+
+
+@click.command()
+@click.option("--matches", "-n", default=100, show_default=True, help="Number of matches to simulate")
+@click.option("--seed", "-s", type=int, default=None, help="Seed for reproducible runs")
+@click.option("--tick-rate", "-r", default=TICK_RATE, show_default=True, help="Simulation ticks per second")
+@click.option("--max-duration", default=600.0, show_default=True, help="Simulated seconds before a match is abandoned")
+@click.option("--workers", "-w", default=1, show_default=True, help="Processes to spread the matches over")
+def main(matches: int, seed: Optional[int], tick_rate: float, max_duration: float, workers: int):
+    """Plays NPC against NPC matches without a window, sound or network and prints the results."""
+    workers = max(1, min(workers, matches))
+    jobs = [
+        (matches // workers + (1 if i < matches % workers else 0), None if seed is None else seed + i, tick_rate, max_duration)
+        for i in range(workers)
+    ]
+    start = time.perf_counter()
+    if workers == 1:
+        results = play(jobs[0])
+    else:
+        with Pool(workers) as pool:
+            results = [result for share in pool.map(play, jobs) for result in share]
+    elapsed = time.perf_counter() - start
+
+    wins = [0, 0]
+    timeouts = 0
+    for result in results:
+        if result.winner is None:
+            timeouts += 1
+        else:
+            wins[0 if result.winner == PLAYER_1_PORT else 1] += 1
+    simulated = sum(result.duration for result in results)
+    print(f"{matches} matches in {elapsed:.2f}s ({matches / elapsed * 60:,.0f} matches/min, {workers} workers)")
+    print(f"Wins left/right: {wins[0]}/{wins[1]}, timeouts: {timeouts}")
+    print(
+        f"Average match: {simulated / matches:.1f}s simulated,"
+        f" {simulated / elapsed:,.0f}x real time at {tick_rate:g} ticks/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import time
+from typing import Optional
+import click
+import pyglet
+
+# The viewer opens its own window later, the benchmark none
+import src.no_display  # noqa: F401
+
+from config import (
+    FONT_SIZE,
+    PADDLE_DIMENSIONS,
+    RENDER_RATE,
+    SPECTATOR_PORT,
+    SPECTATOR_RATE,
+    TICK_RATE,
+    VERTICAL_LABEL_MARGIN,
+    WINDOW_HEIGHT,
+    WINDOW_WIDTH,
+)
+from src.spectator import SpectatorClient
+from src.util import GameState
+
+BALL_SIZE = 15
+STATUS_TEXT = {
+    GameState.INACTIVE: "Waiting for players",
+    GameState.WAITING: "Waiting for the serve",
+    GameState.PLAYING: "",
+    GameState.RESETTING: "Point scored",
+    GameState.GAME_OVER: "Game over",
+}
+
+
+def view(client: SpectatorClient):
+    """Shows the feed in a window, drawn at the render rate between the received snapshots."""
+    from pyglet import shapes, window
+    from pyglet.text import Label
+
+    win = window.Window(WINDOW_WIDTH, WINDOW_HEIGHT, caption="DIPPID Pong - spectating")
+    batch = pyglet.graphics.Batch()
+    ball = shapes.Rectangle(0, 0, BALL_SIZE, BALL_SIZE, color=(255, 255, 255), batch=batch)
+    left = shapes.Rectangle(0, 0, PADDLE_DIMENSIONS.x, PADDLE_DIMENSIONS.y, color=(255, 255, 255), batch=batch)
+    right = shapes.Rectangle(0, 0, PADDLE_DIMENSIONS.x, PADDLE_DIMENSIONS.y, color=(255, 255, 255), batch=batch)
+    score = Label(
+        "",
+        font_size=FONT_SIZE * 2,
+        x=WINDOW_WIDTH / 2,
+        y=WINDOW_HEIGHT - VERTICAL_LABEL_MARGIN,
+        anchor_x="center",
+        anchor_y="center",
+        batch=batch,
+    )
+    status = Label(
+        "Connecting...",
+        font_size=FONT_SIZE,
+        x=WINDOW_WIDTH / 2,
+        y=VERTICAL_LABEL_MARGIN,
+        anchor_x="center",
+        anchor_y="center",
+        batch=batch,
+    )
+
+    def update(delta_time):
+        client.poll()
+        state = client.sample()
+        if state is None:
+            return
+        ball.position = (state.ball_x, state.ball_y)
+        left.position = (state.left_x, state.left_y)
+        right.position = (state.right_x, state.right_y)
+        # Labels are only laid out again when their text changes
+        text = f"{state.left_score}   {state.right_score}"
+        if score.text != text:
+            score.text = text
+        if status.text != STATUS_TEXT[state.state]:
+            status.text = STATUS_TEXT[state.state]
+
+    @win.event
+    def on_draw():
+        win.clear()
+        batch.draw()
+
+    @win.event
+    def on_close():
+        client.close()
+
+    pyglet.clock.schedule_interval(update, 1 / RENDER_RATE)
+    pyglet.app.run(1 / RENDER_RATE)
+
+
+def run_benchmark(duration: float, spectators: int, rate: int):
+    """
+    Plays an NPC match headless and broadcasts it to `spectators` clients over loopback, as fast as possible, then
+    prints the bytes and CPU time the feed needs per spectator at `rate` snapshots per second.
+    """
+    from src.headless import HeadlessGame
+    from src.spectator import ZERO, SpectatorFeed, encode
+
+    game = HeadlessGame(seed=0)
+    game.game_manager.reset()
+    feed = SpectatorFeed(game.game_manager, 0, rate, ip="127.0.0.1")
+    clients = [SpectatorClient("127.0.0.1", feed.address[1], clock=game.clock) for _ in range(spectators)]
+    ticks_per_snapshot = max(1, round(TICK_RATE / rate))
+    # Join and acknowledge the first snapshot before measuring, it's a full one for every spectator
+    for client in clients:
+        client.poll()
+    feed.update()
+    for client in clients:
+        client.poll()
+    feed.stats()
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        for _ in range(ticks_per_snapshot):
+            game.step()
+        feed.update()
+        for client in clients:
+            client.poll()
+    stats = feed.stats()
+    full_size = len(encode(feed.session, feed.seq, 0, feed.history[feed.seq], 0, ZERO))
+    print(f"{stats.snapshots} snapshots to {stats.spectators} spectators ({stats.full} full)")
+    print(
+        f"  Packet: {stats.bytes_per_packet:.1f} bytes on average, {full_size} bytes as a full snapshot"
+        f" (+28 bytes UDP/IP headers)"
+    )
+    print(f"  Per spectator at {rate} Hz: {stats.bandwidth:,.0f} B/s, {stats.cpu * 100:.3f}% of a core")
+    print(f"  {stats.cpu * spectators * 100:.2f}% of a core for all {spectators} spectators")
+    undecoded = sum(client.dropped for client in clients)
+    if undecoded:
+        print(f"  {undecoded} packets couldn't be decoded")
+    for client in clients:
+        client.close()
+    feed.close()
+    game.close()
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1", show_default=True, help="Address of the game")
+@click.option("--port", "-p", default=SPECTATOR_PORT, show_default=True, help="Spectator port of the game")
+@click.option("--delay", "-d", default=0.1, show_default=True, help="Seconds to stay behind the feed for smooth motion")
+@click.option("--benchmark", type=float, default=None, help="Measure the feed for this many seconds instead of watching")
+@click.option("--spectators", "-n", default=32, show_default=True, help="Spectators to simulate with --benchmark")
+@click.option("--rate", "-r", default=SPECTATOR_RATE, show_default=True, help="Snapshots per second with --benchmark")
+def main(host: str, port: int, delay: float, benchmark: Optional[float], spectators: int, rate: int):
+    """Watches a match broadcast by `game.py --spectator-port`."""
+    if benchmark is not None:
+        run_benchmark(benchmark, spectators, rate)
+        return
+    view(SpectatorClient(host, port, delay))
+
+
+if __name__ == "__main__":
+    main()
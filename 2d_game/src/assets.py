@@ -0,0 +1,67 @@
+from __future__ import annotations
+import os
+import queue
+import time
+from concurrent.futures import Future
+from threading import Lock, Thread
+from typing import Dict, Optional
+
+ASSETS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "assets"))
+
+
+class AssetManager:
+    """
+    Decoded assets by file name, every file is loaded once. Requests only queue a load until `preload` starts the
+    background loader, so nothing is imported or decoded before the first frame is on screen.
+    """
+
+    def __init__(self, root: str = ASSETS_DIR):
+        self.root = root
+        self.load_times: Dict[str, float] = {}  # Seconds spent loading each asset
+        self._futures: Dict[str, Future] = {}
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._lock = Lock()
+        self._thread: Optional[Thread] = None
+
+    def sound_async(self, name: str) -> Future:
+        """The decoded sound once it's loaded, queued for the background loader if it isn't yet."""
+        with self._lock:
+            future = self._futures.get(name)
+            if future is None:
+                future = self._futures[name] = Future()
+                self._queue.put(name)
+        return future
+
+    def preload(self, *names: str):
+        """Queues `names` and starts loading everything queued on a background thread."""
+        for name in names:
+            self.sound_async(name)
+        with self._lock:
+            if self._thread is None:
+                self._thread = Thread(target=self._work, name="AssetManager", daemon=True)
+                self._thread.start()
+
+    def pending(self) -> int:
+        return sum(not future.done() for future in self._futures.values())
+
+    def _work(self):
+        while True:
+            self._load(self._queue.get())
+
+    def _load(self, name: str):
+        future = self._futures[name]
+        with self._lock:
+            # Loaded, or being loaded on another thread
+            if future.running() or future.done():
+                return
+            future.set_running_or_notify_cancel()
+        start = time.perf_counter()
+        try:
+            from pyglet import media
+
+            source = media.load(os.path.join(self.root, name), streaming=False)
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            future.set_result(source)
+        self.load_times[name] = time.perf_counter() - start
@@ -0,0 +1,96 @@
+from __future__ import annotations
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, List, Optional, Union
+
+if TYPE_CHECKING:
+    from pyglet.media import Player, Source
+
+
+class VoicePool:
+    """
+    A fixed number of voices for one sound. Playing uses the voice that has been idle the longest; if every voice
+    is busy the one that started first is cut off and reused (voice stealing). A voice pauses and rewinds when its
+    sound ends instead of dropping it, so it's replayed without creating a new audio player.
+    The sound may still be loading: voices are created once it's decoded, until then plays are skipped.
+    """
+
+    def __init__(self, source: Union["Source", Future], voices: int = 4):
+        self.source: Optional["Source"] = None
+        self._loading: Optional[Future] = source if isinstance(source, Future) else None
+        if self._loading is None:
+            self.source = source
+        self.count = max(1, voices)
+        # Ordered from least to most recently started
+        self.voices: List["Player"] = []
+        self.plays = 0
+        self.stolen = 0
+        self.skipped = 0  # Plays before the sound was loaded or after it failed to load
+
+    def _ready(self) -> bool:
+        if self.voices:
+            return True
+        if self._loading is not None:
+            if not self._loading.done():
+                return False
+            loading, self._loading = self._loading, None
+            try:
+                self.source = loading.result()
+            except Exception as e:
+                print(f"Sound not available, playing without it: {e}")
+        if self.source is None:
+            return False
+        from pyglet.media import Player
+
+        for _ in range(self.count):
+            voice = Player()
+            voice.queue(self.source)
+            voice.push_handlers(on_eos=self._rewind_handler(voice))
+            self.voices.append(voice)
+        return True
+
+    @staticmethod
+    def _rewind_handler(voice: "Player"):
+        def on_eos():
+            voice.pause()
+            voice.seek(0.0)
+            return True  # Handled, keeps the player from moving on to an empty playlist
+
+        return on_eos
+
+    def play(self, pitch: float = 1.0, volume: float = 1.0):
+        if not self._ready():
+            self.skipped += 1
+            return
+        voice = next((v for v in self.voices if not v.playing), None)
+        if voice is None:
+            voice = self.voices[0]
+            self.stolen += 1
+            voice.pause()
+            voice.seek(0.0)
+        self.voices.remove(voice)
+        self.voices.append(voice)
+        voice.pitch = pitch
+        voice.volume = volume
+        voice.play()
+        self.plays += 1
+
+    def delete(self):
+        for voice in self.voices:
+            voice.delete()
+        self.voices.clear()
+
+
+class NullVoicePool:
+    """Silent stand-in for a VoicePool in headless runs, only counts what would have been played."""
+
+    def __init__(self, voices: int = 4):
+        self.voices: List["Player"] = []
+        self.plays = 0
+        self.stolen = 0
+        self.skipped = 0
+
+    def play(self, pitch: float = 1.0, volume: float = 1.0):
+        self.plays += 1
+
+    def delete(self):
+        pass
@@ -1,13 +1,17 @@
 from __future__ import annotations
+import itertools
 from pyglet import shapes
+from src.registry import script_types
 from src.util import Vector2D
 from typing import List, TYPE_CHECKING
-from typing import Type, TypeVar, Optional
+from typing import Dict, Type, TypeVar, Optional
 from config import GRAVITY
 
 if TYPE_CHECKING:
     from src.script import Script
+    from src.managers.collision_manager import Contact
     from src.managers.game_manager import GameManager
+    from src.physics import PhysicsStore
 
 T = TypeVar("T", bound="Script")
 
@@ -15,7 +19,7 @@ T = TypeVar("T", bound="Script")
 class GameObject:
     out_of_bounds_hor: bool = False
     out_of_bounds_ver: bool = False
-    gm: "GameManager" = None  # Static reference to the GameManager
+    _uids = itertools.count()
 
     def __init__(
         self,
@@ -24,18 +28,37 @@ class GameObject:
         tag: str = "",
         collision: bool = True,
         gravity: bool = False,
+        static: bool = False,
+        *,
+        gm: "GameManager",
     ):
-        self.velocity = Vector2D(0, 0)
+        """
+        Static objects never move: they aren't updated or integrated, don't get `update` calls on their scripts
+        and are only tested for collisions against moving objects. The object belongs to the scene of `gm`.
+        """
+        # Increasing id to order objects by registration, e.g. for collision pairs
+        self.uid = next(GameObject._uids)
         self.shape = shape
         self.name = name
         self.tag = tag
         self.collision = collision
         self.gravity = gravity
+        self.static = static
         self.scripts: List["Script"] = []
-        # Store previous position for collision sweeping
-        self.prev_x = self.shape.x
-        self.prev_y = self.shape.y
-        GameObject.gm.register_obj(self)
+        # First script registered for each script class and its base classes, for constant time get_script
+        self._script_index: Dict[type, "Script"] = {}
+
+        # The simulation state lives either in the shared physics store or on the object itself,
+        # the shape only mirrors the position for drawing
+        self.gm = gm
+        self.physics: Optional["PhysicsStore"] = None if static else self.gm.physics
+        if self.physics is not None:
+            self.slot = self.physics.add(self, shape.x, shape.y, gravity)
+        else:
+            self._x = self._prev_x = self._last_x = self._drawn_x = shape.x
+            self._y = self._prev_y = self._last_y = self._drawn_y = shape.y
+            self._velocity = Vector2D(0, 0)
+        self.gm.register_obj(self)
 
     @staticmethod
     def create(
@@ -44,43 +67,154 @@ class GameObject:
         tag: str = "",
         collision: bool = True,
         gravity: bool = False,
+        static: bool = False,
+        *,
+        gm: "GameManager",
     ):
-        obj = GameObject(shape, name, tag, collision, gravity)
+        obj = GameObject(shape, name, tag, collision, gravity, static, gm=gm)
         return obj
 
     def get_script(self, script_type: Type[T]) -> Optional[T]:
-        for script in self.scripts:
-            if isinstance(script, script_type):
-                return script
-        return None
+        return self._script_index.get(script_type)
 
     def register_script(self, script: "Script"):
         self.scripts.append(script)
         script.gameobject = self
-
-    def get_center(self) -> Vector2D:
-        return Vector2D(
-            self.shape.x + self.shape.width / 2, self.shape.y + self.shape.height / 2
-        )
+        for cls in script_types(script):
+            self._script_index.setdefault(cls, script)
+        self.gm.registry.add_script(self, script)
+
+    # With a physics store the state is read with ndarray.item, which returns a Python float without creating a NumPy
+    # scalar first. Code that reads many objects at once should read the store arrays directly
+    @property
+    def x(self) -> float:
+        if self.physics is not None:
+            return self.physics.position.item(self.slot, 0)
+        return self._x
+
+    @x.setter
+    def x(self, value: float):
+        if self.physics is not None:
+            self.physics.position[self.slot, 0] = value
+        else:
+            self._x = value
+
+    @property
+    def y(self) -> float:
+        if self.physics is not None:
+            return self.physics.position.item(self.slot, 1)
+        return self._y
+
+    @y.setter
+    def y(self, value: float):
+        if self.physics is not None:
+            self.physics.position[self.slot, 1] = value
+        else:
+            self._y = value
+
+    # Position before the last movement, used for collision sweeping
+    @property
+    def prev_x(self) -> float:
+        if self.physics is not None:
+            return self.physics.previous.item(self.slot, 0)
+        return self._prev_x
+
+    @prev_x.setter
+    def prev_x(self, value: float):
+        if self.physics is not None:
+            self.physics.previous[self.slot, 0] = value
+        else:
+            self._prev_x = value
+
+    @property
+    def prev_y(self) -> float:
+        if self.physics is not None:
+            return self.physics.previous.item(self.slot, 1)
+        return self._prev_y
+
+    @prev_y.setter
+    def prev_y(self, value: float):
+        if self.physics is not None:
+            self.physics.previous[self.slot, 1] = value
+        else:
+            self._prev_y = value
+
+    @property
+    def velocity(self) -> Vector2D:
+        """A copy of the velocity on both backends, changes have to be assigned back or made with `set_velocity`."""
+        if self.physics is not None:
+            velocity = self.physics.velocity
+            return Vector2D(velocity.item(self.slot, 0), velocity.item(self.slot, 1))
+        return self._velocity.copy()
+
+    @velocity.setter
+    def velocity(self, value: Vector2D):
+        # Copied so callers can keep reusing the vector they passed in
+        if self.physics is not None:
+            self.physics.velocity[self.slot] = (value.x, value.y)
+        else:
+            self._velocity.set(value.x, value.y)
+
+    def get_velocity(self, out: Vector2D) -> Vector2D:
+        """Writes the velocity into `out` instead of allocating a copy."""
+        if self.physics is not None:
+            velocity = self.physics.velocity
+            return out.set(velocity.item(self.slot, 0), velocity.item(self.slot, 1))
+        return out.copy_from(self._velocity)
+
+    def get_center(self, out: Optional[Vector2D] = None) -> Vector2D:
+        """The center of the shape, written into `out` if given."""
+        x = self.x + self.shape.width / 2
+        y = self.y + self.shape.height / 2
+        if out is not None:
+            return out.set(x, y)
+        return Vector2D(x, y)
 
     def update(self, delta_time: float):
+        self.integrate(delta_time)
+        self.update_scripts(delta_time)
+
+    def integrate(self, delta_time: float):
+        """Moves the object by its velocity and applies gravity."""
+        if self.physics is not None:
+            self.physics.integrate_one(self.slot, delta_time)
+            return
         # Store previous position before moving
-        self.prev_x = self.shape.x
-        self.prev_y = self.shape.y
-        self.shape.position = (
-            self.shape.x + self.velocity.x * delta_time,
-            self.shape.y + self.velocity.y * delta_time,
-        )
+        self._prev_x = self._x
+        self._prev_y = self._y
+        self._x += self._velocity.x * delta_time
+        self._y += self._velocity.y * delta_time
         if self.gravity:
-            self.velocity.y += GRAVITY * delta_time
+            self._velocity.y += GRAVITY * delta_time
 
+    def update_scripts(self, delta_time: float):
         for script in self.scripts:
             script.update(delta_time)
 
-    def on_collision_start(self, other: "GameObject"):
+    def begin_tick(self):
+        """Remembers the position at the start of a simulation tick for render interpolation."""
+        self._last_x = self._x
+        self._last_y = self._y
+
+    def sync_shape(self, alpha: float = 1.0):
+        """
+        Moves the shape to the position between the start (alpha 0) and the end (alpha 1) of the last tick if it
+        changed. Objects in a physics store are synced by the store.
+        """
+        if alpha == 1.0:
+            x, y = self._x, self._y
+        else:
+            x = self._last_x + (self._x - self._last_x) * alpha
+            y = self._last_y + (self._y - self._last_y) * alpha
+        if x != self._drawn_x or y != self._drawn_y:
+            self._drawn_x = x
+            self._drawn_y = y
+            self.shape.position = (x, y)
+
+    def on_collision_start(self, other: "GameObject", contact: Optional["Contact"] = None):
         """Called when a collision starts with another GameObject"""
         for script in self.scripts:
-            script.on_collision_start(other)
+            script.on_collision_start(other, contact)
 
     def on_collision_end(self, other: "GameObject"):
         """Called when a collision ends with another GameObject"""
@@ -88,12 +222,24 @@ class GameObject:
             script.on_collision_end(other)
 
     def destroy(self):
-        self.scripts.clear()
+        # Unregistered first, the registry drops the script indexes of this object
         self.gm.unregister_obj(self)
+        self.scripts.clear()
+        self._script_index.clear()
+        if self.physics is not None:
+            self.physics.remove(self.slot)
 
     def set_position(self, x: float, y: float):
-        self.shape.x = x
-        self.shape.y = y
+        self.x = x
+        self.y = y
+
+    def teleport(self, x: float, y: float):
+        """Moves the object without sweeping the movement for collisions or interpolating it when drawn."""
+        if self.physics is not None:
+            self.physics.teleport(self.slot, x, y)
+        else:
+            self._x = self._prev_x = self._last_x = x
+            self._y = self._prev_y = self._last_y = y
 
     def set_velocity(self, velocity: Vector2D):
         self.velocity = velocity
@@ -0,0 +1,128 @@
+from __future__ import annotations
+import json
+from typing import Callable, NamedTuple, Optional, Tuple
+from config import PLAYER_1_PORT, PLAYER_2_PORT, TICK_RATE, WINDOW_HEIGHT, WINDOW_WIDTH
+from DIPPID import Sensor
+from src.managers.collision_manager import CollisionManager
+from src.managers.game_manager import GameManager
+from src.scripts.paddle import Paddle
+from src.util import GameState
+
+
+class VirtualWindow:
+    """The window size, all the game logic needs from a window."""
+
+    def __init__(self, width: int = WINDOW_WIDTH, height: int = WINDOW_HEIGHT):
+        self.width = width
+        self.height = height
+
+
+class VirtualSensor(Sensor):
+    """Sensor without a connection, inputs are pushed by the caller and handled right away on its thread."""
+
+    def __init__(self, port: int):
+        Sensor.__init__(self)
+        self.port = port
+        self._connection_thread = None
+
+    def push(self, **values):
+        """Sends values as if they were received from a device, e.g. `push(gravity={"z": 3}, button_1=1)`."""
+        self._update(json.dumps(values))
+
+
+class SimulationClock:
+    """Simulated time in seconds, only advances with the simulation."""
+
+    def __init__(self, start: float = 0.0):
+        self.time = start
+
+    def advance(self, delta_time: float):
+        self.time += delta_time
+
+    def __call__(self) -> float:
+        return self.time
+
+
+class MatchResult(NamedTuple):
+    winner: Optional[int]  # Player id (port) of the winner, None if the match timed out
+    scores: Tuple[int, int]  # Left, right
+    duration: float  # Simulated seconds
+    ticks: int
+
+
+class HeadlessGame:
+    """
+    Runs the game logic without a display, audio device or network, stepping the simulation as fast as possible.
+    Players are NPCs unless inputs are pushed into their sensors, e.g. from the `controller` of `run_match`.
+    Every game has its own scene, clock and random state, so any number of them can run in one process.
+    """
+
+    def __init__(
+        self,
+        width: int = WINDOW_WIDTH,
+        height: int = WINDOW_HEIGHT,
+        tick_rate: float = TICK_RATE,
+        seed: Optional[int] = None,
+        sensor_factory: Callable[[int], Sensor] = VirtualSensor,
+        ports: Tuple[int, int] = (PLAYER_1_PORT, PLAYER_2_PORT),
+    ):
+        self.tick = 1 / tick_rate
+        self.window = VirtualWindow(width, height)
+        self.clock = SimulationClock()
+        self.game_manager = GameManager(
+            self.window,
+            headless=True,
+            clock=self.clock,
+            sensor_factory=sensor_factory,
+            ports=ports,
+            seed=seed,
+        )
+        self.collision_manager = CollisionManager(self.window, self.game_manager)
+        self.ticks = 0
+
+    def paddle(self, side: str) -> Paddle:
+        return self.game_manager.find("Paddle Left" if side == "left" else "Paddle Right").get_script(Paddle)
+
+    def sensor(self, side: str) -> VirtualSensor:
+        """The sensor of the left or right player, to push inputs into."""
+        return self.paddle(side).sensor
+
+    def step(self):
+        """Simulates one tick, the same way the window does."""
+        self.game_manager.begin_tick()
+        self.collision_manager.update(self.tick)
+        self.game_manager.update(self.tick)
+        self.clock.advance(self.tick)
+        self.ticks += 1
+
+    def run_match(
+        self,
+        max_duration: float = 600,
+        controller: Optional[Callable[["HeadlessGame"], None]] = None,
+    ) -> MatchResult:
+        """
+        Plays a match from a fresh serve until a player wins or `max_duration` simulated seconds passed.
+        `controller` is called before every tick and can push inputs into the sensors.
+        """
+        gm = self.game_manager
+        gm.reset_scores()
+        gm.winner = None
+        gm.last_scorer = None
+        gm.reset()
+        start_time = self.clock.time
+        start_ticks = self.ticks
+        winner = None
+        while self.clock.time - start_time < max_duration:
+            if controller is not None:
+                controller(self)
+            self.step()
+            if gm.state == GameState.GAME_OVER:
+                winner = gm.winner.player_id
+                break
+        left, right = self.paddle("left"), self.paddle("right")
+        return MatchResult(
+            winner, (left.score, right.score), self.clock.time - start_time, self.ticks - start_ticks
+        )
+
+    def close(self):
+        self.game_manager.exit()
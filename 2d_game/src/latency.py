@@ -0,0 +1,191 @@
+from __future__ import annotations
+import json
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from src.profiler import PERCENTILES
+
+if TYPE_CHECKING:
+    from src.managers.game_manager import GameManager
+    from src.scripts.paddle import Paddle
+
+# Received, handled by on_input, applied by a tick, drawn by a frame
+RECEIVED, HANDLED, APPLIED, PRESENTED = range(4)
+STAGES = {
+    "handle": (RECEIVED, HANDLED),
+    "tick": (HANDLED, APPLIED),
+    "frame": (APPLIED, PRESENTED),
+    "total": (RECEIVED, PRESENTED),
+}
+
+
+class LatencyTracker:
+    """
+    Input to screen latency of the paddles. Every sensor message is stamped when it's received, an input that moves a
+    paddle is then followed through `Paddle.on_input`, the end of the next simulation tick (which integrates the paddle's
+    GameObject with the new velocity) and the end of the next buffer flip, which puts the moved paddle on screen.
+    An input replaced by a newer one before a tick used it never reaches the screen and only counts as superseded.
+    Like the FrameProfiler the hooks are instance attributes installed by `enable`, enable this one first.
+    """
+
+    def __init__(self, capacity: int = 10000):
+        self.capacity = capacity
+        self.enabled = False
+        self.count = 0  # Inputs presented in total, the buffer holds the last `capacity` of them
+        self.superseded = 0
+        self._samples = np.zeros((capacity, 4))
+        self._targets: List[Tuple[Any, str, Callable[[Callable], Callable]]] = []
+        self._installed: List[Tuple[Any, str, Optional[Callable]]] = []
+        self._paddles: List["Paddle"] = []
+        self._input_hooks: List[Tuple["Paddle", Callable[[dict], None]]] = []
+        self._lock = threading.Lock()
+        self._pending: Dict[int, Tuple[float, float]] = {}  # Latest handled input per paddle, set on sensor threads
+        self._applied: List[Tuple[float, float, float]] = []
+        self._received: Dict[int, float] = {}
+
+    def attach(self, window: Any, game_manager: "GameManager", paddles: Sequence["Paddle"]):
+        """Follows the inputs of `paddles` through the ticks of `game_manager` to the flips of `window`."""
+        for paddle in paddles:
+            self._paddles.append(paddle)
+            self._targets.append((paddle.sensor, "_update", self._receive_hook(paddle.player_id)))
+        self._targets.append((game_manager, "update", self._tick_hook))
+        self._targets.append((window, "flip", self._flip_hook))
+
+    def enable(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        for obj, attr, hook in self._targets:
+            # Remember an attribute the instance had itself, otherwise deleting the wrapper exposes the method again
+            self._installed.append((obj, attr, obj.__dict__.get(attr)))
+            setattr(obj, attr, hook(getattr(obj, attr)))
+        # The sensor keeps the bound method it registered, so the callback is swapped instead of the attribute
+        for paddle in self._paddles:
+            hook = self._input_hook(paddle)
+            paddle.sensor.unregister_callback("gravity", paddle.on_input)
+            paddle.sensor.register_callback("gravity", hook)
+            self._input_hooks.append((paddle, hook))
+
+    def disable(self):
+        if not self.enabled:
+            return
+        self.enabled = False
+        for paddle, hook in self._input_hooks:
+            paddle.sensor.unregister_callback("gravity", hook)
+            paddle.sensor.register_callback("gravity", paddle.on_input)
+        self._input_hooks.clear()
+        for obj, attr, own in reversed(self._installed):
+            if own is None:
+                delattr(obj, attr)
+            else:
+                setattr(obj, attr, own)
+        self._installed.clear()
+
+    def clear(self):
+        """Drops the samples recorded so far, e.g. after a warm up."""
+        with self._lock:
+            self._pending.clear()
+        self._applied.clear()
+        self.count = 0
+        self.superseded = 0
+
+    def _receive_hook(self, player_id: int) -> Callable[[Callable], Callable]:
+        received = self._received
+        perf_counter = time.perf_counter
+
+        def hook(original: Callable) -> Callable:
+            def timed(data):
+                received[player_id] = perf_counter()
+                return original(data)
+
+            return timed
+
+        return hook
+
+    def _input_hook(self, paddle: "Paddle") -> Callable[[dict], None]:
+        player_id = paddle.player_id
+        on_input = paddle.on_input
+
+        def timed(gravity: dict):
+            on_input(gravity)
+            # Only inputs the paddle accepted move it
+            if not paddle.accepts(gravity):
+                return
+            sample = (self._received.get(player_id, 0.0), time.perf_counter())
+            with self._lock:
+                if player_id in self._pending:
+                    self.superseded += 1
+                self._pending[player_id] = sample
+
+        return timed
+
+    def _tick_hook(self, original: Callable) -> Callable:
+        def timed(delta_time: float):
+            start = time.perf_counter()
+            result = original(delta_time)
+            applied = time.perf_counter()
+            with self._lock:
+                # Inputs handled while the tick ran may have come too late for it, they wait for the next one
+                ready = [key for key, (_, handled) in self._pending.items() if handled <= start]
+                taken = [self._pending.pop(key) for key in ready]
+            self._applied.extend((received, handled, applied) for received, handled in taken)
+            return result
+
+        return timed
+
+    def _flip_hook(self, original: Callable) -> Callable:
+        def timed():
+            result = original()
+            if self._applied:
+                presented = time.perf_counter()
+                for received, handled, applied in self._applied:
+                    self._samples[self.count % self.capacity] = (received, handled, applied, presented)
+                    self.count += 1
+                self._applied.clear()
+            return result
+
+        return timed
+
+    def samples(self, stage: str) -> np.ndarray:
+        """Latency of `stage` in ms for the buffered inputs, in no particular order."""
+        start, end = STAGES[stage]
+        rows = self._samples[: min(self.count, self.capacity)]
+        return (rows[:, end] - rows[:, start]) * 1000
+
+    def summary(self, percentiles: Sequence[int] = PERCENTILES) -> Dict[str, Dict[str, float]]:
+        """Mean, percentiles and maximum of every stage in ms."""
+        result = {}
+        if not self.count:
+            return result
+        for stage in STAGES:
+            samples = self.samples(stage)
+            stats = {"mean": float(samples.mean())}
+            for p, value in zip(percentiles, np.percentile(samples, percentiles)):
+                stats[f"p{p}"] = float(value)
+            stats["max"] = float(samples.max())
+            result[stage] = stats
+        return result
+
+    def report(self) -> str:
+        lines = [f"{self.count} inputs on screen, {self.superseded} superseded before a tick"]
+        summary = self.summary()
+        if summary:
+            lines.append(f"{'ms':<8}{'mean':>8}" + "".join(f"{f'p{p}':>8}" for p in PERCENTILES) + f"{'max':>8}")
+            for stage, stats in summary.items():
+                lines.append(f"{stage:<8}" + "".join(f"{value:8.2f}" for value in stats.values()))
+        return "\n".join(lines)
+
+    def export(self, path: str):
+        """Writes the counts, the summary and every buffered input's stage latencies in ms as JSON."""
+        with open(path, "w") as f:
+            json.dump(
+                {
+                    "inputs": self.count,
+                    "superseded": self.superseded,
+                    "summary": self.summary(),
+                    "samples": {stage: self.samples(stage).tolist() for stage in STAGES},
+                },
+                f,
+                indent=2,
+            )
@@ -1,87 +1,208 @@
-from typing import TYPE_CHECKING, List
+from __future__ import annotations
+import math
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple
 from src.gameobject import GameObject
+from src.util import Vector2D
 
 if TYPE_CHECKING:
     from game import GameWindow
     from src.managers.game_manager import GameManager
 
+# Position, previous position and size of an object: x, y, prev_x, prev_y, width, height
+Body = Tuple[float, float, float, float, float, float]
+
+
+@dataclass
+class Contact:
+    """Result of a swept collision test, seen from one of the two objects."""
+
+    time: float  # Fraction of the last movement at which the objects touched, 0 if they already overlapped
+    normal: Vector2D  # Surface normal of the other object at the contact, pointing towards this one
+    remaining: float  # Seconds of the current step left after the time of impact
+
+    def flipped(self) -> Contact:
+        """The same contact seen from the other object."""
+        return Contact(self.time, -self.normal, self.remaining)
+
 
 class CollisionManager:
     def __init__(self, window: "GameWindow", game_manager: "GameManager"):
-        self.collisions: List[tuple[GameObject, GameObject]] = []
+        # Active contacts, each pair is ordered by registration of its objects
+        self.collisions: Dict[Tuple[GameObject, GameObject], Contact] = {}
         self.window = window
         self.game_manager = game_manager
+        # Bounds of static collidable objects sorted by min x and their bodies, rebuilt when the static objects change
+        self._static_boxes: List[Tuple[float, float, float, float, GameObject]] = []
+        self._static_bodies: Dict[GameObject, Body] = {}
+        self._static_version = -1
 
     def update(self, delta_time: float):
-        objects = self.game_manager.gameobjects
-        for i in range(len(objects)):
+        bodies = self.bodies(self.game_manager.dynamic_objects)
+        width, height = self.game_manager.window.width, self.game_manager.window.height
+        collidable: List[GameObject] = []
+        # Static objects never move, so they can't leave the window either
+        for obj, (x, y, _, _, w, h) in bodies.items():
             # Check for OOB regardless of collision settings
-            objects[i].out_of_bounds_hor = self.check_out_of_bounds_hor(objects[i])
-            objects[i].out_of_bounds_ver = self.check_out_of_bounds_ver(objects[i])
-
-            if not objects[i].collision:
-                continue
-
-            # Check for collisions with other objects
-            for j in range(i + 1, len(objects)):
-                obj1 = objects[i]
-                obj2 = objects[j]
-                is_colliding = self.check_collision(obj1, obj2)
-                was_colliding = self.collisions.count((obj1, obj2)) > 0
-                if is_colliding and not was_colliding:
-                    obj1.on_collision_start(obj2)
-                    obj2.on_collision_start(obj1)
-                    self.collisions.append((obj1, obj2))
-                elif not is_colliding and was_colliding:
-                    obj1.on_collision_end(obj2)
-                    obj2.on_collision_end(obj1)
-                    self.collisions.remove((obj1, obj2))
-
-    def check_collision(self, obj1: GameObject, obj2: GameObject) -> bool:
+            obj.out_of_bounds_hor = x + w < 0 or x > width
+            obj.out_of_bounds_ver = y + h < 0 or y > height
+            if obj.collision:
+                collidable.append(obj)
+
+        # Only pairs whose swept bounds overlap need the exact check
+        self._get_static_boxes()
+        bodies.update(self._static_bodies)
+        contacts: Dict[Tuple[GameObject, GameObject], Contact] = {}
+        for obj1, obj2 in self.broad_phase(collidable, bodies):
+            contact = self._sweep(bodies[obj1], bodies[obj2], delta_time)
+            if contact:
+                contacts[(obj1, obj2)] = contact
+
+        # Sorted so callbacks fire in a deterministic order
+        started = [pair for pair in contacts if pair not in self.collisions]
+        ended = [pair for pair in self.collisions if pair not in contacts]
+        for obj1, obj2 in sorted(started, key=self._pair_order):
+            contact = contacts[(obj1, obj2)]
+            obj1.on_collision_start(obj2, contact)
+            obj2.on_collision_start(obj1, contact.flipped())
+        for obj1, obj2 in sorted(ended, key=self._pair_order):
+            obj1.on_collision_end(obj2)
+            obj2.on_collision_end(obj1)
+        self.collisions = contacts
+
+    @staticmethod
+    def _pair_order(pair: Tuple[GameObject, GameObject]) -> Tuple[int, int]:
+        return pair[0].uid, pair[1].uid
+
+    def bodies(self, objects: Iterable[GameObject]) -> Dict[GameObject, Body]:
+        """
+        The bodies of `objects`. Objects in the physics store are read from its arrays in one go, going through the
+        scalar properties would index the arrays once per value.
+        """
+        physics = self.game_manager.physics
+        if physics is not None:
+            position = physics.position[: physics.size].tolist()
+            previous = physics.previous[: physics.size].tolist()
+        result = {}
+        for obj in objects:
+            shape = obj.shape
+            if obj.physics is not None:
+                x, y = position[obj.slot]
+                prev_x, prev_y = previous[obj.slot]
+                result[obj] = (x, y, prev_x, prev_y, shape.width, shape.height)
+            else:
+                result[obj] = (obj.x, obj.y, obj.prev_x, obj.prev_y, shape.width, shape.height)
+        return result
+
+    def broad_phase(
+        self, objects: List[GameObject], bodies: Optional[Dict[GameObject, Body]] = None
+    ) -> Iterator[Tuple[GameObject, GameObject]]:
+        """
+        Sweep and prune over the bounding boxes that cover each object's movement since the last frame.
+        Boxes are sorted along the x axis, every box is only compared against the following boxes that
+        start within its x range. Each box is then compared with the precomputed boxes of the static objects,
+        static objects are never paired with each other. Yields candidate pairs ordered by registration.
+        `bodies` of the objects are read from the objects if not given.
+        """
+        if bodies is None:
+            bodies = self.bodies(objects)
+        boxes = []
+        for obj in objects:
+            x, y, prev_x, prev_y, w, h = bodies[obj]
+            boxes.append((min(x, prev_x), max(x, prev_x) + w, min(y, prev_y), max(y, prev_y) + h, obj))
+        boxes.sort(key=lambda box: box[0])
+
+        count = len(boxes)
+        for i in range(count):
+            _, max_x, min_y, max_y, obj = boxes[i]
+            # Later boxes start further right, stop at the first one that starts after this one ends
+            for j in range(i + 1, count):
+                other = boxes[j]
+                if other[0] > max_x:
+                    break
+                if other[2] <= max_y and min_y <= other[3]:
+                    other_obj = other[4]
+                    yield (obj, other_obj) if obj.uid < other_obj.uid else (other_obj, obj)
+
+        statics = self._get_static_boxes()
+        if not statics:
+            return
+        for min_x, max_x, min_y, max_y, obj in boxes:
+            for static in statics:
+                if static[0] > max_x:
+                    break
+                if static[1] >= min_x and static[2] <= max_y and min_y <= static[3]:
+                    other_obj = static[4]
+                    yield (obj, other_obj) if obj.uid < other_obj.uid else (other_obj, obj)
+
+    def _get_static_boxes(self) -> List[Tuple[float, float, float, float, GameObject]]:
+        if self._static_version != self.game_manager.static_version:
+            self._static_bodies = self.bodies(obj for obj in self.game_manager.static_objects if obj.collision)
+            self._static_boxes = sorted(
+                ((x, x + w, y, y + h, obj) for obj, (x, y, _, _, w, h) in self._static_bodies.items()),
+                key=lambda box: box[0],
+            )
+            self._static_version = self.game_manager.static_version
+        return self._static_boxes
+
+    def check_collision(
+        self, obj1: GameObject, obj2: GameObject, delta_time: float = 0
+    ) -> Optional[Contact]:
         """
         Checks for collision between two game objects using continuous collision detection (CCD).
-        It interpolates the movement of each corner of the first object (obj1) from its previous
-        position to its current position and checks if any of these interpolated points
-        are inside the second object (obj2).
+        Both boxes move linearly from their previous to their current position, so in the frame of obj2 only
+        obj1 moves, by the difference of both movements. Intersecting that movement with the slabs of obj2 on
+        each axis gives the interval in which the boxes overlap, which is exact at any speed.
+        Returns the contact seen from obj1 or None if the boxes don't overlap during the movement.
         """
-        COLLISION_ACCURACY = 4
-        corners_prev = [
-            (obj1.prev_x, obj1.prev_y),
-            (obj1.prev_x + obj1.shape.width, obj1.prev_y),
-            (obj1.prev_x, obj1.prev_y + obj1.shape.height),
-            (obj1.prev_x + obj1.shape.width, obj1.prev_y + obj1.shape.height),
-        ]
-        corners_curr = [
-            (obj1.shape.x, obj1.shape.y),
-            (obj1.shape.x + obj1.shape.width, obj1.shape.y),
-            (obj1.shape.x, obj1.shape.y + obj1.shape.height),
-            (obj1.shape.x + obj1.shape.width, obj1.shape.y + obj1.shape.height),
-        ]
-        for corner_index in range(4):
-            prev_corner_x, prev_corner_y = corners_prev[corner_index]
-            curr_corner_x, curr_corner_y = corners_curr[corner_index]
-            for step in range(COLLISION_ACCURACY + 1):
-                interpolation_factor = step / COLLISION_ACCURACY
-                interpolated_x = (
-                    prev_corner_x
-                    + (curr_corner_x - prev_corner_x) * interpolation_factor
-                )
-                interpolated_y = (
-                    prev_corner_y
-                    + (curr_corner_y - prev_corner_y) * interpolation_factor
-                )
-                if (interpolated_x, interpolated_y) in obj2:
-                    return True
-        return False
-
-    def check_out_of_bounds_hor(self, obj: GameObject) -> bool:
-        return (
-            obj.shape.x + obj.shape.width < 0
-            or obj.shape.x > self.game_manager.window.width
-        )
-
-    def check_out_of_bounds_ver(self, obj: GameObject) -> bool:
-        return (
-            obj.shape.y + obj.shape.height < 0
-            or obj.shape.y > self.game_manager.window.height
-        )
+        body1 = (obj1.x, obj1.y, obj1.prev_x, obj1.prev_y, obj1.shape.width, obj1.shape.height)
+        body2 = (obj2.x, obj2.y, obj2.prev_x, obj2.prev_y, obj2.shape.width, obj2.shape.height)
+        return self._sweep(body1, body2, delta_time)
+
+    @staticmethod
+    def _sweep(body1: Body, body2: Body, delta_time: float) -> Optional[Contact]:
+        x1, y1, ax, ay, w1, h1 = body1
+        x2, y2, bx, by, w2, h2 = body2
+        dx = (x1 - ax) - (x2 - bx)
+        dy = (y1 - ay) - (y2 - by)
+
+        # Time interval in which the boxes overlap on each axis, touching edges don't count
+        if dx == 0:
+            if not (ax < bx + w2 and bx < ax + w1):
+                return None
+            enter_x, exit_x = -math.inf, math.inf
+        elif dx > 0:
+            enter_x, exit_x = (bx - (ax + w1)) / dx, (bx + w2 - ax) / dx
+        else:
+            enter_x, exit_x = (bx + w2 - ax) / dx, (bx - (ax + w1)) / dx
+
+        if dy == 0:
+            if not (ay < by + h2 and by < ay + h1):
+                return None
+            enter_y, exit_y = -math.inf, math.inf
+        elif dy > 0:
+            enter_y, exit_y = (by - (ay + h1)) / dy, (by + h2 - ay) / dy
+        else:
+            enter_y, exit_y = (by + h2 - ay) / dy, (by - (ay + h1)) / dy
+
+        enter = max(enter_x, enter_y)
+        leave = min(exit_x, exit_y)
+        if enter >= leave or enter >= 1 or leave <= 0:
+            return None
+
+        if enter >= 0:
+            # The axis that started overlapping last is the one that was hit
+            if enter_x > enter_y:
+                normal = Vector2D(-1 if dx > 0 else 1, 0)
+            else:
+                normal = Vector2D(0, -1 if dy > 0 else 1)
+            return Contact(enter, normal, (1 - enter) * delta_time)
+
+        # Already overlapping at the start, push out along the axis with the least penetration
+        overlap_x = min(ax + w1, bx + w2) - max(ax, bx)
+        overlap_y = min(ay + h1, by + h2) - max(ay, by)
+        if overlap_x < overlap_y:
+            normal = Vector2D(1 if ax + w1 / 2 > bx + w2 / 2 else -1, 0)
+        else:
+            normal = Vector2D(0, 1 if ay + h1 / 2 > by + h2 / 2 else -1)
+        return Contact(0.0, normal, delta_time)
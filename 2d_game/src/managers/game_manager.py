@@ -1,76 +1,121 @@
 from __future__ import annotations
 import math
-import os
 import random
-from typing import TYPE_CHECKING, List, Literal, Type, TypeVar
+import time
+import numpy as np
+from typing import TYPE_CHECKING, Callable, Literal, Optional, Tuple, Type, TypeVar
 from src.gameobject import GameObject
 from config import (
+    AUDIO_VOICES,
     INITIAL_BALL_SPEED,
     PADDLE_DIMENSIONS,
+    PHYSICS_BACKEND,
     PLAYER_1_PORT,
     PLAYER_2_PORT,
     RESET_DURATION,
     WIN_CONDITION,
 )
-from src.util import GameState, Vector2D
-from pyglet import shapes, media
+from src.assets import AssetManager
+from src.audio import NullVoicePool, VoicePool
+from src.registry import Registry
+from src.static_layer import StaticLayer
+from src.util import Box, GameState, Vector2D
+from pyglet import shapes
 from src.scripts.ball import Ball
 from src.scripts.paddle import Paddle
 from src.scripts.border import Border
-from src.scripts.confetti import Confetti
+from src.particles import ParticleEmitter
 from src.util import gameobject_batch
+from DIPPID import SensorUDP
 
 if TYPE_CHECKING:
     from game import GameWindow
+    from DIPPID import Sensor
     from src.script import Script
 
 T = TypeVar("T", bound="Script")
 
 
 class GameManager:
-    """GameManager is responsible for managing the game state and updating game objects."""
-
-    state: GameState = GameState.INACTIVE
-    reset_timer: float = 0
-    last_scorer: Paddle | None = None
-    gameobjects: List[GameObject] = []
-
-    def __init__(self, window: "GameWindow"):
+    """
+    GameManager is responsible for managing the game state and updating game objects.
+    All state of a match lives on its instance, so several matches can run side by side in one process.
+    """
+
+    def __init__(
+        self,
+        window: "GameWindow",
+        headless: bool = False,
+        clock: Callable[[], float] = time.time,
+        sensor_factory: Callable[[int], "Sensor"] = SensorUDP,
+        ports: Tuple[int, int] = (PLAYER_1_PORT, PLAYER_2_PORT),
+        seed: Optional[int] = None,
+        assets: Optional[AssetManager] = None,
+    ):
+        """
+        In headless mode `window` only needs a width and a height, shapes are plain boxes that aren't drawn,
+        sounds are silent and static geometry isn't baked into a vertex list. `clock` is used for input timeouts and
+        `sensor_factory` creates the input sensor for each of the player `ports`, which double as player ids.
+        Randomness comes from the manager's own generator, seeded with `seed`. Sounds are loaded by `assets`.
+        """
         self.window = window
+        self.headless = headless
+        self.clock = clock
+        self.sensor_factory = sensor_factory
+        self.ports = ports
+        self.assets = assets if assets is not None else AssetManager()
+        self.random = random.Random(seed)
+        # Headless matches draw nothing, so they don't add to the shared batch
+        self.batch = None if headless else gameobject_batch
+        self.registry = Registry()
+        self.gameobjects = self.registry.objects
+        # Objects that move and get updated every tick, and static ones that are only collided with
+        self.dynamic_objects = self.registry.dynamic
+        self.static_objects = self.registry.static
+        self.state = GameState.INACTIVE
+        self.reset_timer: float = 0
+        self.last_scorer: Paddle | None = None
         self.winner = None  # Track the winner for GAME_OVER state
-        GameObject.gm = self  # Set static reference to this GameManager
-
-        self.win_audio = media.load(
-            os.path.abspath(os.path.dirname(__file__) + "/../../assets/pop.ogg"),
-            streaming=False,
+        # Velocities are copied on assignment, so one zero vector can stop any number of objects
+        self._zero = Vector2D(0, 0)
+        self.physics = None
+        if PHYSICS_BACKEND == "numpy":
+            from src.physics import PhysicsStore
+
+            self.physics = PhysicsStore()
+
+        self.win_audio = self.create_voices("pop.ogg")
+        self.particles = ParticleEmitter(
+            self.window.width,
+            self.window.height,
+            batch=self.batch,
         )
+        self.static_layer = StaticLayer(batch=self.batch)
 
         # Init Ball
         ball_size = 15
-        ball_shape = shapes.RoundedRectangle(
+        ball_shape = self.create_shape(
             self.window.width / 2 - ball_size / 2,
             self.window.height / 2 - ball_size / 2,
             width=ball_size,
             height=ball_size,
             radius=ball_size / 2,
             color=(255, 255, 255),
-            batch=gameobject_batch,
         )
-        ball = GameObject.create(ball_shape, name="Ball", tag="ball", collision=True)
+        ball = GameObject.create(ball_shape, name="Ball", tag="ball", collision=True, gm=self)
         ball.register_script(Ball(ball))
 
         # Init Paddles
         def init_paddle(side: Literal["left", "right"]) -> None:
             width = PADDLE_DIMENSIONS.x
             height = PADDLE_DIMENSIONS.y
-            paddle_shape = shapes.RoundedRectangle(
+            paddle_shape = self.create_shape(
                 20 if side == "left" else self.window.width - 20 - width,
                 self.window.height / 2 - height / 2,
                 width=width,
                 height=height,
                 radius=math.pi,
                 color=(255, 255, 255),
-                batch=gameobject_batch,
             )
 
             paddle = GameObject.create(
@@ -78,10 +123,10 @@ class GameManager:
                 name="Paddle Left" if side == "left" else "Paddle Right",
                 tag="paddle",
                 collision=True,
+                gm=self,
             )
-            paddle.register_script(
-                Paddle(paddle, PLAYER_1_PORT if side == "left" else PLAYER_2_PORT)
-            )
+            port = self.ports[0] if side == "left" else self.ports[1]
+            paddle.register_script(Paddle(paddle, port, self.sensor_factory(port)))
 
         init_paddle("left")
         init_paddle("right")
@@ -90,47 +135,68 @@ class GameManager:
         def init_border(side: Literal["top", "bottom"]) -> None:
             width = self.window.width
             height = self.window.height
-            border_shape = shapes.RoundedRectangle(
+            border_shape = self.create_shape(
                 x=0,
                 y=self.window.height if side == "top" else 0 - height,
                 width=width,
                 height=height,
-                radius=math.pi,
                 color=(255, 255, 255, 150),
-                batch=gameobject_batch,
+                static=True,
             )
             border = GameObject.create(
                 border_shape,
                 name="Border Top" if side == "top" else "Border Bottom",
                 tag="border",
                 collision=True,
+                static=True,
+                gm=self,
             )
             border.register_script(Border(border, direction=1 if side == "top" else 2))
 
         init_border("top")
         init_border("bottom")
 
-        # Init Separator
-        def init_separator_segment(x: float, y: float) -> None:
-            width = 4
-            height = 4
-            separator_shape = shapes.Rectangle(
-                x=x - width / 2,
-                y=y - height / 2,
-                width=width,
-                height=height,
-                color=(255, 255, 255, 40),
-                batch=gameobject_batch,
+        # Init Separator, only drawn so it doesn't need GameObjects
+        for i in range(0, self.window.height, 10):
+            size = 4
+            self.static_layer.add_rect(
+                self.window.width / 2 - size / 2, i + 10 - size / 2, size, size, (255, 255, 255, 40)
             )
-            GameObject.create(
-                separator_shape,
-                name="Separator",
-                tag="separator",
-                collision=False,
+
+        self.static_layer.build()
+
+    def create_shape(
+        self,
+        x: float,
+        y: float,
+        width: float,
+        height: float,
+        color: Tuple[int, ...],
+        radius: Optional[float] = None,
+        static: bool = False,
+    ):
+        """
+        Creates a (rounded) rectangle in the game object batch, or an undrawn box in headless mode.
+        Static shapes are baked into the static layer as plain rectangles and can't be moved.
+        """
+        if static:
+            return self.static_layer.add_rect(x, y, width, height, color)
+        if self.headless:
+            return Box(x, y, width, height, color)
+        if radius is not None:
+            return shapes.RoundedRectangle(
+                x, y, width=width, height=height, radius=radius, color=color, batch=self.batch
             )
+        return shapes.Rectangle(x, y, width=width, height=height, color=color, batch=self.batch)
 
-        for i in range(0, self.window.height, 10):
-            init_separator_segment(self.window.width / 2, i + 10)
+    def create_voices(self, name: str, voices: int = AUDIO_VOICES) -> VoicePool | NullVoicePool:
+        """
+        A pool of `voices` players for a sound from the assets directory, silent in headless mode.
+        The sound is only queued for loading, it plays once the asset manager decoded it.
+        """
+        if self.headless:
+            return NullVoicePool(voices)
+        return VoicePool(self.assets.sound_async(name), voices)
 
     def reset(self):
         ball = self.find("Ball")
@@ -146,42 +212,65 @@ class GameManager:
         for paddle in paddles:
             paddle.get_script(Paddle).score = 0
 
+    @property
+    def static_version(self) -> int:
+        return self.registry.static_version
+
     def find_by_tag(self, tag: str) -> list[GameObject]:
         """Find all GameObjects with the specified tag."""
-        return [go for go in self.gameobjects if go.tag == tag]
+        return self.registry.find_by_tag(tag)
 
     def find_by_script(self, script_type: Type[T]) -> list[GameObject]:
         """Find all GameObjects with the specified script type."""
-        return [
-            go
-            for go in self.gameobjects
-            if any(isinstance(script, script_type) for script in go.scripts)
-        ]
+        return self.registry.find_by_script(script_type)
 
     def find(self, name: str) -> GameObject | None:
         """Find a GameObject by its name."""
-        for go in self.gameobjects:
-            if go.name == name:
-                return go
-        return None
+        return self.registry.find(name)
 
     def register_obj(self, gameobject: GameObject):
         """Register a GameObject with the GameManager."""
-        self.gameobjects.append(gameobject)
+        self.registry.add(gameobject)
 
     def unregister_obj(self, gameobject: GameObject):
         """Unregister a GameObject from the GameManager."""
-        if gameobject in self.gameobjects:
-            self.gameobjects.remove(gameobject)
+        self.registry.remove(gameobject)
+
+    def begin_tick(self):
+        """Snapshots all positions before a simulation tick, drawing interpolates from there."""
+        if self.physics is not None:
+            self.physics.begin_tick()
+        else:
+            for go in self.dynamic_objects:
+                go.begin_tick()
+        self.particles.begin_tick()
 
     def update(self, delta_time: float):
-        # Forward update call
-        for go in self.gameobjects:
-            go.update(delta_time)
+        # Forward update call, with a physics store all bodies are integrated in one step
+        if self.physics is not None:
+            self.physics.integrate(delta_time)
+            for go in self.dynamic_objects:
+                go.update_scripts(delta_time)
+        else:
+            for go in self.dynamic_objects:
+                go.update(delta_time)
+        self.particles.update(delta_time)
 
         # Calculate and set game state
         self._handle_state(delta_time)
 
+    def sync_shapes(self, alpha: float = 1.0):
+        """
+        Moves the shapes of all objects to their simulated positions, interpolated by alpha between the start and
+        the end of the last tick.
+        """
+        if self.physics is not None:
+            self.physics.sync_shapes(alpha)
+        else:
+            for go in self.dynamic_objects:
+                go.sync_shape(alpha)
+        self.particles.sync(alpha)
+
     def exit(self):
         for paddle in [go.get_script(Paddle) for go in self.find_by_script(Paddle)]:
             paddle.disconnect()
@@ -189,26 +278,29 @@ class GameManager:
     def _handle_state(self, delta_time: float):
         """Handle the state transitions of the game."""
 
-        ball = self.find("Ball").get_script(Ball) if self.find("Ball") else None
-        paddles = self.find_by_script(Paddle)
-        paddle_left = next(
-            (p.get_script(Paddle) for p in paddles if p.name == "Paddle Left"), None
-        )
-        paddle_right = next(
-            (p.get_script(Paddle) for p in paddles if p.name == "Paddle Right"), None
-        )
+        ball_go = self.find("Ball")
+        left_go = self.find("Paddle Left")
+        right_go = self.find("Paddle Right")
+        ball = ball_go.get_script(Ball) if ball_go else None
+        paddle_left = left_go.get_script(Paddle) if left_go else None
+        paddle_right = right_go.get_script(Paddle) if right_go else None
 
         if not ball or not paddle_left or not paddle_right:
             raise ValueError("GameManager is missing required game objects.")
 
+        # Connection changes are applied here, so they never happen halfway through a tick
+        now = self.clock()
+        paddle_left.update_connection(now)
+        paddle_right.update_connection(now)
+
         # Only update paddles if the game is in PLAYING state
         if self.state == GameState.PLAYING:
-            for go in [go for go in self.gameobjects if go.tag == "paddle"]:
+            for go in self.find_by_tag("paddle"):
                 go.update(delta_time)
 
         # State transitions
         if self.state == GameState.INACTIVE:
-            if paddle_left.is_connected() or paddle_right.is_connected():
+            if paddle_left.connected or paddle_right.connected:
                 self.state = GameState.WAITING
 
         elif self.state == GameState.WAITING:
@@ -230,7 +322,7 @@ class GameManager:
                 # Spawn confetti for scored point at ball position in the opposite direction of its velocity
                 self._spawn_confetti(ball)
 
-                if ball.gameobject.shape.x < 0:
+                if ball.gameobject.x < 0:
                     paddle_right.score += 1
                     self.last_scorer = paddle_right
                 else:
@@ -250,8 +342,8 @@ class GameManager:
 
         elif self.state == GameState.RESETTING:
             self.reset_timer -= delta_time
-            paddle_left.gameobject.set_velocity(Vector2D(0, 0))
-            paddle_right.gameobject.set_velocity(Vector2D(0, 0))
+            paddle_left.gameobject.set_velocity(self._zero)
+            paddle_right.gameobject.set_velocity(self._zero)
             if self.reset_timer <= 0:
                 self.reset()
 
@@ -265,43 +357,15 @@ class GameManager:
                 self.reset()
 
     def _spawn_confetti(self, ball: "Ball"):
-        player = self.win_audio.play()
-        player.volume = 0.3
-        for i in range(15):
-            confetti = GameObject.create(
-                shapes.Rectangle(
-                    ball.gameobject.shape.x,
-                    ball.gameobject.shape.y,
-                    width=3,
-                    height=3,
-                    color=(
-                        random.randint(50, 255),
-                        random.randint(50, 255),
-                        random.randint(50, 255),
-                        random.randint(150, 255),
-                    ),
-                    batch=gameobject_batch,
-                ),
-                name="Confetti",
-                tag="confetti",
-                collision=False,
-                gravity=True,
-            )
-            dir = Vector2D(
-                -ball.gameobject.velocity.x,
-                0,
-            )
-
-            confetti.set_velocity(
-                dir.rotate_angle(random.uniform(-15, 15)).normalize()
-                * INITIAL_BALL_SPEED
-                * random.uniform(0.8, 1.2)
-            )
-            confetti.set_position(
-                min(
-                    max(ball.gameobject.shape.x, confetti.shape.width / 2),
-                    self.window.width - confetti.shape.width / 2,
-                ),
-                ball.gameobject.shape.y,
-            )
-            confetti.register_script(Confetti(confetti))
+        self.win_audio.play(volume=0.3)
+        size = self.particles.size
+        self.particles.emit(
+            15,
+            min(max(ball.gameobject.x, size / 2), self.window.width - size / 2),
+            ball.gameobject.y,
+            direction=(-ball.gameobject.velocity.x, 0),
+            speed=INITIAL_BALL_SPEED,
+            spread=15,
+            speed_variation=0.2,
+            rng=np.random.default_rng(self.random.getrandbits(64)),
+        )
@@ -1,6 +1,6 @@
 import pyglet
-from typing import TYPE_CHECKING, Optional, Tuple
-from config import PLAYER_1_PORT, PLAYER_2_PORT, FONT_SIZE, VERTICAL_LABEL_MARGIN
+from typing import TYPE_CHECKING, NamedTuple, Optional, Tuple
+from config import FONT_SIZE, VERTICAL_LABEL_MARGIN
 from src.util import GameState, ui_batch
 from src.scripts.paddle import Paddle
 
@@ -29,6 +29,18 @@ class Text(pyglet.text.Label):
         )
 
 
+class UIState(NamedTuple):
+    game_state: GameState
+    score_left: int
+    score_right: int
+    connected_left: bool
+    connected_right: bool
+    ready_left: bool
+    ready_right: bool
+    winner: Optional[int]
+    last_scorer: Optional[int]
+
+
 class GameUI:
     game_state: pyglet.text.Label
     score_left: pyglet.text.Label
@@ -53,6 +65,7 @@ class GameUI:
             raise ValueError("Paddles not found in the game manager.")
 
         self.setup_labels()
+        self._shown: Optional[UIState] = None
 
     def setup_labels(self) -> None:
         center_x: int = self.window.width // 2
@@ -76,14 +89,14 @@ class GameUI:
         # Port labels
         y: int = self.score_left.y - VERTICAL_LABEL_MARGIN // 2 - FONT_SIZE // 2
         self.conn_info_left = Text(
-            f"Port: {PLAYER_1_PORT}",
+            f"Port: {self.paddle_left.player_id}",
             center_x - score_x_offset,
             y,
             FONT_SIZE // 1.5,
             color=(255, 255, 255, 70),
         )
         self.conn_info_right = Text(
-            f"Port: {PLAYER_2_PORT}",
+            f"Port: {self.paddle_right.player_id}",
             center_x + score_x_offset,
             y,
             FONT_SIZE // 1.5,
@@ -91,45 +104,65 @@ class GameUI:
         )
 
     def update(self, delta_time: float) -> None:
-        self.score_left.text = str(self.paddle_left.score)
-        self.score_right.text = str(self.paddle_right.score)
-        self.conn_info_right.text = self.get_conn_info_text(self.paddle_right)
-        self.conn_info_left.text = self.get_conn_info_text(self.paddle_left)
-        self.game_state.text = self.get_status_text()
-
-    def get_conn_info_text(self, paddle: "Paddle") -> str:
-        if paddle.is_connected():
-            return f"{paddle.player_id} (Connected)"
-        else:
-            return f"{paddle.player_id} (NPC)"
+        # Labels are only touched when something they show changed, setting text or color lays them out again
+        state = self.observe()
+        if state == self._shown:
+            return
+        self._shown = state
+        self.set_label(self.score_left, str(state.score_left))
+        self.set_label(self.score_right, str(state.score_right))
+        self.set_label(self.conn_info_left, self.get_conn_info_text(self.paddle_left.player_id, state.connected_left))
+        self.set_label(
+            self.conn_info_right, self.get_conn_info_text(self.paddle_right.player_id, state.connected_right)
+        )
+        self.set_label(self.game_state, *self.get_status(state))
 
-    def get_status_text(self) -> str:
+    def observe(self) -> "UIState":
+        """Everything the labels show, read once per frame."""
         gm = self.window.game_manager
+        return UIState(
+            gm.state,
+            self.paddle_left.score,
+            self.paddle_right.score,
+            self.paddle_left.connected,
+            self.paddle_right.connected,
+            self.paddle_left.is_ready(),
+            self.paddle_right.is_ready(),
+            gm.winner.player_id if gm.winner else None,
+            gm.last_scorer.player_id if gm.last_scorer else None,
+        )
 
-        if not (self.paddle_left.is_connected() or self.paddle_right.is_connected()):
-            self.game_state.color = (255, 220, 5, 200)
-            return "Use the DIPPID app to connect to the ports below!"
-
-        elif gm.state == GameState.GAME_OVER:
-            self.game_state.color = (255, 100, 100, 255)
-            return f"Player {gm.winner.player_id} wins! Press button_1 to restart."
+    @staticmethod
+    def set_label(label: pyglet.text.Label, text: str, color: Optional[Tuple[int, int, int, int]] = None) -> None:
+        if label.text != text:
+            label.text = text
+        if color is not None and label.color != color:
+            label.color = color
 
-        elif gm.state == GameState.WAITING:
-            self.game_state.color = (100, 255, 100, 200)
-            num_connected_players = len(
-                [p for p in [self.paddle_left, self.paddle_right] if p.is_connected()]
-            )
-            num_ready_players = len(
-                [
-                    p
-                    for p in [self.paddle_left, self.paddle_right]
-                    if p.is_ready() and p.is_connected()
-                ]
+    def get_conn_info_text(self, player_id: int, connected: bool) -> str:
+        if connected:
+            return f"{player_id} (Connected)"
+        else:
+            return f"{player_id} (NPC)"
+
+    def get_status(self, state: "UIState") -> Tuple[str, Tuple[int, int, int, int]]:
+        """The status text and its color."""
+        if not (state.connected_left or state.connected_right):
+            return "Use the DIPPID app to connect to the ports below!", (255, 220, 5, 200)
+
+        elif state.game_state == GameState.GAME_OVER:
+            return f"Player {state.winner} wins! Press button_1 to restart.", (255, 100, 100, 255)
+
+        elif state.game_state == GameState.WAITING:
+            connected = (state.connected_left, state.connected_right)
+            ready = (state.ready_left, state.ready_right)
+            num_connected_players = sum(connected)
+            num_ready_players = sum(r and c for r, c in zip(ready, connected))
+            return (
+                f"Press button_1 to ready up! ({num_ready_players}/{num_connected_players})",
+                (100, 255, 100, 200),
             )
-            return f"Press button_1 to ready up! ({num_ready_players}/{num_connected_players})"
-        elif gm.state == GameState.RESETTING:
-            self.game_state.color = (100, 255, 100, 200)
-            return f"{gm.last_scorer.player_id} scored!"
+        elif state.game_state == GameState.RESETTING:
+            return f"{state.last_scorer} scored!", (100, 255, 100, 200)
         else:
-            self.game_state.color = (255, 255, 255, 120)
-            return ""
+            return "", (255, 255, 255, 120)
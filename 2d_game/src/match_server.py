@@ -0,0 +1,289 @@
+from __future__ import annotations
+import math
+import selectors
+import socket
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from DIPPID import Sensor
+from src.headless import HeadlessGame, VirtualSensor
+from src.util import GameState
+
+
+class PortAllocator:
+    """Hands out a pair of consecutive sensor ports per match, released pairs are reused first."""
+
+    def __init__(self, base_port: int, max_matches: int = 10000):
+        self.base_port = base_port
+        self.max_matches = max_matches
+        self._next = 0
+        self._free: List[int] = []
+
+    def allocate(self) -> Tuple[int, int]:
+        if self._free:
+            slot = self._free.pop()
+        elif self._next < self.max_matches:
+            slot = self._next
+            self._next += 1
+        else:
+            raise RuntimeError(f"No free ports left for more than {self.max_matches} matches")
+        port = self.base_port + 2 * slot
+        return port, port + 1
+
+    def release(self, ports: Tuple[int, int]):
+        self._free.append((ports[0] - self.base_port) // 2)
+
+
+class HubSensor(VirtualSensor):
+    """Sensor fed by a UDPHub on the server thread instead of its own receive thread."""
+
+    def __init__(self, port: int, hub: "UDPHub"):
+        super().__init__(port)
+        self.hub = hub
+
+    def disconnect(self):
+        self.hub.close_port(self.port)
+        super().disconnect()
+
+
+class UDPHub:
+    """
+    Receives the datagrams of many sensor ports without a thread per sensor: every port gets a non-blocking socket
+    and all of them are polled with one selector between two ticks.
+    """
+
+    def __init__(self, ip: str = "0.0.0.0"):
+        self.ip = ip
+        self.selector = selectors.DefaultSelector()
+        self.sockets: Dict[int, socket.socket] = {}
+        self.received = 0
+        self.dropped = 0  # Datagrams that weren't valid sensor messages
+
+    def sensor(self, port: int) -> HubSensor:
+        """Binds `port` and returns its sensor, usable as the `sensor_factory` of a GameManager."""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.setblocking(False)
+            sock.bind((self.ip, port))
+        except OSError:
+            sock.close()
+            raise
+        sensor = HubSensor(port, self)
+        self.selector.register(sock, selectors.EVENT_READ, sensor)
+        self.sockets[port] = sock
+        return sensor
+
+    def close_port(self, port: int):
+        sock = self.sockets.pop(port, None)
+        if sock is not None:
+            self.selector.unregister(sock)
+            sock.close()
+
+    def poll(self) -> int:
+        """
+        Hands every pending datagram to its sensor and returns how many were received. Sensors run on the tick
+        thread, so a malformed datagram is dropped and counted instead of stopping every match of the shard.
+        """
+        received = 0
+        for key, _ in self.selector.select(0):
+            sock, sensor = key.fileobj, key.data
+            while True:
+                try:
+                    data = sock.recv(1024)
+                except (BlockingIOError, InterruptedError):
+                    break
+                except OSError:
+                    # E.g. ICMP errors reported on the socket
+                    continue
+                try:
+                    sensor._update(data.decode())
+                except (UnicodeDecodeError, ValueError, TypeError, AttributeError):
+                    # Not UTF-8, JSON that isn't an object or capabilities of the wrong type
+                    self.dropped += 1
+                    continue
+                received += 1
+        self.received += received
+        return received
+
+    def close(self):
+        for port in list(self.sockets):
+            self.close_port(port)
+        self.selector.close()
+
+
+class Match:
+    """
+    One headless game on the server. Without players a match stays inactive like the windowed game, unless `npc`
+    starts it right away and keeps it playing NPC against NPC, which is what load tests use.
+    """
+
+    def __init__(
+        self,
+        match_id: int,
+        ports: Tuple[int, int],
+        tick_rate: float,
+        sensor_factory: Callable[[int], Sensor] = VirtualSensor,
+        seed: Optional[int] = None,
+        npc: bool = False,
+    ):
+        self.match_id = match_id
+        self.ports = ports
+        self.game = HeadlessGame(tick_rate=tick_rate, seed=seed, sensor_factory=sensor_factory, ports=ports)
+        self.finished = 0  # Matches played to the end on this slot
+        self._state = self.game.game_manager.state
+        if npc:
+            self.game.game_manager.reset()
+
+    def step(self):
+        self.game.step()
+        state = self.game.game_manager.state
+        if state == GameState.GAME_OVER and self._state != GameState.GAME_OVER:
+            self.finished += 1
+        self._state = state
+
+    def close(self):
+        self.game.close()
+
+
+class ShardStats(NamedTuple):
+    shard: int
+    matches: int
+    ticks: int  # Server ticks since the last report
+    elapsed: float  # Wall clock seconds since the last report
+    busy: float  # Seconds spent simulating and polling sockets
+    overruns: int  # Ticks that finished after their deadline
+    finished: int  # Matches played to the end, in total
+    received: int  # Sensor datagrams, in total
+    dropped: int  # Malformed sensor datagrams, in total
+
+    @property
+    def load(self) -> float:
+        """Fraction of the tick budget in use, 1 means the shard's core is saturated."""
+        return self.busy / self.elapsed if self.elapsed else 0.0
+
+
+class MatchServer:
+    """
+    Runs any number of matches on one shared tick loop: all sockets are polled, then every match is stepped once.
+    Ticks are scheduled on fixed deadlines; a shard that can't keep up counts overruns and, after falling more than
+    `max_lag` ticks behind, skips ahead instead of running a burst of catch-up ticks.
+    """
+
+    def __init__(self, tick_rate: float, hub: Optional[UDPHub] = None, shard: int = 0, max_lag: int = 8):
+        self.tick_rate = tick_rate
+        self.tick = 1 / tick_rate
+        self.hub = hub
+        self.shard = shard
+        self.max_lag = max_lag
+        self.matches: Dict[int, Match] = {}
+        self.ticks = 0
+        self._finished_closed = 0
+        self._reset_stats(time.perf_counter())
+
+    def _reset_stats(self, now: float):
+        self._stats_start = now
+        self._stats_ticks = 0
+        self._busy = 0.0
+        self._overruns = 0
+
+    def add_match(self, match_id: int, ports: Tuple[int, int], seed: Optional[int] = None, npc: bool = False) -> Match:
+        sensor_factory = self.hub.sensor if self.hub is not None else VirtualSensor
+        match = Match(match_id, ports, self.tick_rate, sensor_factory, seed, npc)
+        self.matches[match_id] = match
+        return match
+
+    def remove_match(self, match_id: int):
+        match = self.matches.pop(match_id)
+        self._finished_closed += match.finished
+        match.close()
+
+    def step(self):
+        """Polls all sensor ports and advances every match by one tick."""
+        if self.hub is not None:
+            self.hub.poll()
+        for match in self.matches.values():
+            match.step()
+        self.ticks += 1
+        self._stats_ticks += 1
+
+    def run(
+        self,
+        should_stop: Callable[[], bool],
+        report: Optional[Callable[[ShardStats], None]] = None,
+        report_interval: float = 1.0,
+    ):
+        """Ticks in real time until `should_stop` returns true, calling `report` every `report_interval` seconds."""
+        now = time.perf_counter()
+        self._reset_stats(now)
+        next_tick = now
+        next_report = now + report_interval
+        while not should_stop():
+            start = time.perf_counter()
+            self.step()
+            end = time.perf_counter()
+            self._busy += end - start
+            next_tick += self.tick
+            if end > next_tick:
+                self._overruns += 1
+                if end - next_tick > self.max_lag * self.tick:
+                    next_tick = end
+            else:
+                time.sleep(next_tick - end)
+            if report is not None and end >= next_report:
+                report(self.stats())
+                next_report = end + report_interval
+
+    def stats(self) -> ShardStats:
+        """Stats since the last call."""
+        now = time.perf_counter()
+        stats = ShardStats(
+            self.shard,
+            len(self.matches),
+            self._stats_ticks,
+            now - self._stats_start,
+            self._busy,
+            self._overruns,
+            self._finished_closed + sum(match.finished for match in self.matches.values()),
+            self.hub.received if self.hub is not None else 0,
+            self.hub.dropped if self.hub is not None else 0,
+        )
+        self._reset_stats(now)
+        return stats
+
+    def close(self):
+        for match_id in list(self.matches):
+            self.remove_match(match_id)
+        if self.hub is not None:
+            self.hub.close()
+
+
+def measure_tick_cost(tick_rate: float, matches: int = 32, duration: float = 1.0, seed: int = 0) -> float:
+    """Average seconds one NPC match takes per tick, stepping `matches` of them as fast as possible."""
+    server = MatchServer(tick_rate)
+    for i in range(matches):
+        server.add_match(i, (0, 1), seed=seed + i, npc=True)
+    try:
+        # Warm up past the first serves, then measure
+        for _ in range(int(tick_rate)):
+            server.step()
+        start = time.perf_counter()
+        ticks = 0
+        while time.perf_counter() - start < duration:
+            server.step()
+            ticks += 1
+        return (time.perf_counter() - start) / (ticks * matches)
+    finally:
+        server.close()
+
+
+def matches_per_core(tick_cost: float, tick_rate: float, load: float = 1.0) -> int:
+    """Matches one core can tick at `tick_rate` while using at most `load` of its time."""
+    return max(1, math.floor(load / (tick_cost * tick_rate)))
+
+
+def plan_shards(matches: int, capacity: int, max_shards: int) -> List[int]:
+    """
+    Splits `matches` over as few shards as fit `capacity` matches each, at most `max_shards`.
+    Returns the number of matches per shard, shards are only added once one core would be saturated.
+    """
+    shards = max(1, min(max_shards, math.ceil(matches / capacity)))
+    return [matches // shards + (1 if i < matches % shards else 0) for i in range(shards)]
@@ -0,0 +1,8 @@
+"""
+Imported first by scripts that draw nothing, or open their own window later: importing `config` or the game modules
+creates pyglet's shadow window, which needs a display connection, unless this option is set before.
+"""
+
+import pyglet
+
+pyglet.options["shadow_window"] = False
@@ -0,0 +1,200 @@
+from __future__ import annotations
+import math
+import random
+from typing import List, Optional, Tuple
+import numpy as np
+from pyglet.graphics import Batch, Group
+from config import GRAVITY
+from src.util import BlendGroup
+
+# Two triangles per particle
+VERTICES_PER_PARTICLE = 6
+
+
+class ParticleEmitter:
+    """
+    Square particles that fall with gravity and die when they leave the window, e.g. confetti.
+    All particles live in preallocated arrays and are integrated in one vectorized step. They are drawn from a
+    single vertex list, dead particles are transparent until their slot is reused by the next burst.
+    The vertex list only grows up to the highest slot ever used, so unused capacity isn't drawn.
+    """
+
+    def __init__(
+        self,
+        width: float,
+        height: float,
+        capacity: int = 4096,
+        size: float = 3,
+        gravity: float = GRAVITY,
+        batch: Optional[Batch] = None,
+        group: Optional[Group] = None,
+    ):
+        self.width = width
+        self.height = height
+        self.capacity = capacity
+        self.size = size
+        self.gravity = gravity
+        self.position = np.zeros((capacity, 2))
+        self.velocity = np.zeros((capacity, 2))
+        # Positions at the start of the last tick for render interpolation
+        self.last = np.zeros((capacity, 2))
+        self.color = np.zeros((capacity, 4), dtype=np.uint8)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.count = 0
+        self.end = 0  # One past the highest slot in use, only [:end] is integrated and drawn
+        self.dropped = 0  # Particles not emitted because every slot was in use
+        # Low slots first, keeps the used range compact
+        self._free: List[int] = list(range(capacity - 1, -1, -1))
+        self._colors_dirty = False
+        self._moved = False
+        self._vertex_list = None
+        self._drawn = 0  # Particles the vertex list has room for
+        if batch is not None:
+            self._create_vertex_list(batch, group, min(16, capacity))
+
+    def _quads(self, count: int) -> Tuple[float, ...]:
+        s = self.size
+        return (0, 0, s, 0, s, s, 0, 0, s, s, 0, s) * count
+
+    def _create_vertex_list(self, batch: Batch, group: Optional[Group], count: int):
+        from pyglet import gl, shapes
+
+        program = shapes.get_default_shader()
+        vertices = count * VERTICES_PER_PARTICLE
+        self._vertex_list = program.vertex_list(
+            vertices,
+            gl.GL_TRIANGLES,
+            batch,
+            BlendGroup(program, group),
+            position=("f", self._quads(count)),
+            color=("Bn", (0, 0, 0, 0) * vertices),
+            translation=("f", (0, 0) * vertices),
+        )
+        self._drawn = count
+
+    def _grow_vertex_list(self, needed: int):
+        count = self._drawn
+        while count < needed:
+            count *= 2
+        count = min(count, self.capacity)
+        self._vertex_list.resize(count * VERTICES_PER_PARTICLE)
+        self._vertex_list.position[:] = self._quads(count)
+        self._drawn = count
+        self._colors_dirty = True
+        self._moved = True
+
+    def emit(
+        self,
+        count: int,
+        x: float,
+        y: float,
+        direction: Tuple[float, float],
+        speed: float,
+        spread: float = 0,
+        speed_variation: float = 0,
+        rng: Optional[np.random.Generator] = None,
+    ):
+        """
+        Spawns `count` particles at (x, y) moving along `direction` with `speed`, each rotated by up to
+        `spread` degrees and with the speed varied by up to the fraction `speed_variation`.
+        Colors are random, like the confetti GameObjects used to be. Without `rng` the randomness is derived from
+        the `random` module, so seeding that makes bursts reproducible.
+        """
+        rng = rng if rng is not None else np.random.default_rng(random.getrandbits(64))
+        available = min(count, len(self._free))
+        self.dropped += count - available
+        if available == 0:
+            return
+        slots = np.array(self._free[-available:])
+        del self._free[-available:]
+
+        length = math.hypot(*direction)
+        dx, dy = (direction[0] / length, direction[1] / length) if length else (0.0, 0.0)
+        angles = np.radians(rng.uniform(-spread, spread, available))
+        speeds = speed * rng.uniform(1 - speed_variation, 1 + speed_variation, available)
+        cos, sin = np.cos(angles), np.sin(angles)
+        self.velocity[slots, 0] = (dx * cos - dy * sin) * speeds
+        self.velocity[slots, 1] = (dx * sin + dy * cos) * speeds
+        self.position[slots] = self.last[slots] = (x, y)
+        self.color[slots, :3] = rng.integers(50, 256, (available, 3))
+        self.color[slots, 3] = rng.integers(150, 256, available)
+        self.alive[slots] = True
+        self.count += available
+        self.end = max(self.end, int(slots.max()) + 1)
+        self._colors_dirty = True
+        self._moved = True
+
+    def begin_tick(self):
+        if self.count:
+            self.last[: self.end] = self.position[: self.end]
+
+    def update(self, delta_time: float):
+        """Moves all particles, applies gravity afterwards and recycles the ones that left the window."""
+        if not self.count:
+            return
+        n = self.end
+        position = self.position[:n]
+        velocity = self.velocity[:n]
+        position += velocity * delta_time
+        velocity[:, 1] += self.gravity * delta_time
+
+        x, y = position[:, 0], position[:, 1]
+        outside = (x + self.size < 0) | (x > self.width) | (y + self.size < 0) | (y > self.height)
+        dead = np.flatnonzero(outside & self.alive[:n])
+        if len(dead):
+            self.alive[dead] = False
+            self.velocity[dead] = 0
+            self.color[dead, 3] = 0
+            self.count -= len(dead)
+            self._free.extend(dead.tolist())
+            # Hand out low slots first again
+            self._free.sort(reverse=True)
+            while self.end > 0 and not self.alive[self.end - 1]:
+                self.end -= 1
+            self._colors_dirty = True
+        self._moved = True
+
+    def sync(self, alpha: float = 1.0):
+        """Writes the particles interpolated between the start and the end of the last tick to the vertex list."""
+        if self._vertex_list is None or not (self._moved or self._colors_dirty):
+            return
+        if self.end > self._drawn:
+            self._grow_vertex_list(self.end)
+        drawn = self._drawn
+        # Views are fetched again every time, the batch may have moved the buffer
+        if self._moved:
+            translation = np.frombuffer(self._vertex_list.translation, dtype=np.float32).reshape(
+                drawn, VERTICES_PER_PARTICLE, 2
+            )
+            self.write_translations(translation, alpha)
+            self._moved = False
+        if self._colors_dirty:
+            color = np.frombuffer(self._vertex_list.color, dtype=np.uint8).reshape(
+                drawn, VERTICES_PER_PARTICLE, 4
+            )
+            color[:] = self.color[:drawn, None, :]
+            self._colors_dirty = False
+
+    def write_translations(self, out: np.ndarray, alpha: float = 1.0):
+        """Fills `out` (particles x vertices x 2) with the interpolated particle positions."""
+        n = self.end
+        if alpha == 1.0:
+            current = self.position[:n]
+        else:
+            last = self.last[:n]
+            current = last + (self.position[:n] - last) * alpha
+        out[:n] = current[:, None, :]
+
+    def clear(self):
+        self.alive[:] = False
+        self.color[:, 3] = 0
+        self.velocity[:] = 0
+        self.count = 0
+        self.end = 0
+        self._free = list(range(self.capacity - 1, -1, -1))
+        self._colors_dirty = True
+
+    def delete(self):
+        if self._vertex_list is not None:
+            self._vertex_list.delete()
+            self._vertex_list = None
@@ -0,0 +1,127 @@
+from __future__ import annotations
+import numpy as np
+from typing import TYPE_CHECKING, List
+from config import GRAVITY
+
+if TYPE_CHECKING:
+    from src.gameobject import GameObject
+
+
+class PhysicsStore:
+    """
+    Holds positions, previous positions and velocities of all bodies in contiguous arrays so a frame is
+    integrated in a few vectorized operations instead of one GameObject.update per object.
+    GameObjects keep a slot index into the arrays and read and write their state through it.
+    """
+
+    def __init__(self, capacity: int = 256):
+        self.capacity = 0
+        self.size = 0  # One past the highest slot in use, integration only touches [:size]
+        self.position = np.zeros((0, 2))
+        self.previous = np.zeros((0, 2))
+        self.velocity = np.zeros((0, 2))
+        # Positions at the start of the last simulation tick, drawing interpolates from here to position
+        self.last = np.zeros((0, 2))
+        self.active = np.zeros(0, dtype=bool)
+        # 1 for bodies affected by gravity, 0 otherwise
+        self.gravity = np.zeros(0)
+        # Position last written to each shape, shapes are only updated when their body moved
+        self.drawn = np.zeros((0, 2))
+        # Shape of every slot as an object array, so the shapes of moved bodies are gathered with the same mask
+        self.shapes = np.empty(0, dtype=object)
+        self._free: List[int] = []
+        self._grow(capacity)
+
+    def _grow(self, capacity: int):
+        old = self.capacity
+
+        def resize(array: np.ndarray, fill: float = 0) -> np.ndarray:
+            grown = np.full((capacity,) + array.shape[1:], fill, dtype=array.dtype)
+            grown[:old] = array
+            return grown
+
+        self.position = resize(self.position)
+        self.previous = resize(self.previous)
+        self.velocity = resize(self.velocity)
+        self.last = resize(self.last)
+        self.active = resize(self.active)
+        self.gravity = resize(self.gravity)
+        self.drawn = resize(self.drawn, np.nan)
+        self.shapes = resize(self.shapes, None)
+        # Hand out low slots first to keep the used range compact
+        self._free.extend(range(capacity - 1, old - 1, -1))
+        self._free.sort(reverse=True)
+        self.capacity = capacity
+
+    def add(self, handle: "GameObject", x: float, y: float, gravity: bool) -> int:
+        if not self._free:
+            self._grow(self.capacity * 2)
+        slot = self._free.pop()
+        self.position[slot] = self.previous[slot] = self.last[slot] = self.drawn[slot] = (x, y)
+        self.velocity[slot] = 0
+        self.active[slot] = True
+        self.gravity[slot] = 1 if gravity else 0
+        self.shapes[slot] = handle.shape
+        self.size = max(self.size, slot + 1)
+        return slot
+
+    def remove(self, slot: int):
+        # Zeroed bodies can stay in the integrated range, they don't move
+        self.active[slot] = False
+        self.gravity[slot] = 0
+        self.velocity[slot] = 0
+        self.shapes[slot] = None
+        self._free.append(slot)
+        while self.size > 0 and not self.active[self.size - 1]:
+            self.size -= 1
+
+    def teleport(self, slot: int, x: float, y: float):
+        """Moves a body without sweeping or interpolating the movement."""
+        self.position[slot] = self.previous[slot] = self.last[slot] = (x, y)
+
+    def begin_tick(self):
+        """Remembers the positions at the start of a simulation tick for render interpolation."""
+        n = self.size
+        self.last[:n] = self.position[:n]
+
+    def integrate(self, delta_time: float):
+        """Moves every body by its velocity and applies gravity afterwards, like GameObject.update."""
+        n = self.size
+        self.previous[:n] = self.position[:n]
+        self.position[:n] += self.velocity[:n] * delta_time
+        self.velocity[:n, 1] += self.gravity[:n] * (GRAVITY * delta_time)
+
+    def integrate_one(self, slot: int, delta_time: float):
+        """Integrates a single body, for objects that are updated outside the regular frame step."""
+        self.previous[slot] = self.position[slot]
+        self.position[slot] += self.velocity[slot] * delta_time
+        self.velocity[slot, 1] += self.gravity[slot] * (GRAVITY * delta_time)
+
+    def sync_shapes(self, alpha: float = 1.0):
+        """
+        Writes the positions of bodies that moved since the last sync to their shapes, interpolated between the
+        start (alpha 0) and the end (alpha 1) of the last tick.
+        """
+        n = self.size
+        if alpha == 1.0:
+            current = self.position[:n]
+        else:
+            last = self.last[:n]
+            current = last + (self.position[:n] - last) * alpha
+        drawn = self.drawn[:n]
+        # A row viewed as one complex number compares x and y in a single operation, NaN (never drawn) never matches.
+        # Removed slots keep their last position, they are masked out in case they moved before their removal
+        moved = (current.view(np.complex128)[:, 0] != drawn.view(np.complex128)[:, 0]) & self.active[:n]
+        if moved.all():
+            # Usually every body moved, then nothing needs to be gathered
+            drawn[:] = current
+            positions, shapes = current, self.shapes[:n]
+        elif moved.any():
+            positions = current[moved]
+            drawn[moved] = positions
+            shapes = self.shapes[:n][moved]
+        else:
+            return
+        # Only the setters run per shape, column lists are much cheaper to build than one list per row
+        for shape, x, y in zip(shapes.tolist(), positions[:, 0].tolist(), positions[:, 1].tolist()):
+            shape.position = (x, y)
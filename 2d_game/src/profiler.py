@@ -0,0 +1,186 @@
+from __future__ import annotations
+import csv
+import json
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from pyglet.graphics import Batch
+from pyglet.text import Label
+
+PERCENTILES = (50, 95, 99)
+
+
+class FrameProfiler:
+    """
+    Per frame time of named sections in fixed-size ring buffers, the last `capacity` frames are kept.
+    Sections are methods wrapped in place by `instrument`. The wrappers are only installed while the profiler is
+    enabled, a disabled profiler leaves the original methods untouched and costs nothing.
+    Time spent on other threads (e.g. sensor callbacks) counts for the frame during which the call finished.
+    """
+
+    def __init__(self, capacity: int = 600):
+        self.capacity = capacity
+        self.enabled = False
+        self.frames = 0  # Frames recorded in total, the ring buffers hold the last `capacity` of them
+        self.sections: List[str] = []
+        self._buffers: Dict[str, np.ndarray] = {}
+        self._current: Dict[str, float] = {}
+        self._targets: List[Tuple[Any, str, str]] = []
+        self._installed: List[Tuple[Any, str, Optional[Callable]]] = []
+        self._last_frame: Optional[float] = None
+        self.add_section("frame")
+
+    def add_section(self, section: str):
+        if section not in self._buffers:
+            self.sections.append(section)
+            self._buffers[section] = np.zeros(self.capacity)
+            self._current[section] = 0.0
+
+    def instrument(self, obj: Any, attr: str, section: str):
+        """Times every call of `obj.attr` as `section` while the profiler is enabled."""
+        self.add_section(section)
+        self._targets.append((obj, attr, section))
+        if self.enabled:
+            self._install(obj, attr, section)
+
+    def _install(self, obj: Any, attr: str, section: str):
+        original = getattr(obj, attr)
+        current = self._current
+        perf_counter = time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                current[section] += perf_counter() - start
+
+        # Remember an attribute the instance had itself, otherwise deleting the wrapper exposes the method again
+        self._installed.append((obj, attr, obj.__dict__.get(attr)))
+        setattr(obj, attr, timed)
+
+    def enable(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        self._last_frame = None
+        for obj, attr, section in self._targets:
+            self._install(obj, attr, section)
+
+    def disable(self):
+        if not self.enabled:
+            return
+        self.enabled = False
+        for obj, attr, own in reversed(self._installed):
+            if own is None:
+                delattr(obj, attr)
+            else:
+                setattr(obj, attr, own)
+        self._installed.clear()
+
+    def end_frame(self):
+        """Stores the time every section took since the last call as one frame."""
+        now = time.perf_counter()
+        current = self._current
+        # The first frame after enabling has no interval
+        current["frame"] = now - self._last_frame if self._last_frame is not None else np.nan
+        self._last_frame = now
+        index = self.frames % self.capacity
+        for section, buffer in self._buffers.items():
+            buffer[index] = current[section] * 1000
+            current[section] = 0.0
+        self.frames += 1
+
+    def samples(self, section: str) -> np.ndarray:
+        """Frame times of `section` in ms, oldest first."""
+        buffer = self._buffers[section]
+        if self.frames <= self.capacity:
+            return buffer[: self.frames]
+        index = self.frames % self.capacity
+        return np.concatenate((buffer[index:], buffer[:index]))
+
+    def summary(self, percentiles: Sequence[int] = PERCENTILES) -> Dict[str, Dict[str, float]]:
+        """Mean, percentiles and maximum of every section in ms over the buffered frames."""
+        result = {}
+        for section in self.sections:
+            samples = self.samples(section)
+            samples = samples[~np.isnan(samples)]
+            if not len(samples):
+                continue
+            stats = {"mean": float(samples.mean())}
+            for p, value in zip(percentiles, np.percentile(samples, percentiles)):
+                stats[f"p{p}"] = float(value)
+            stats["max"] = float(samples.max())
+            result[section] = stats
+        return result
+
+    def export(self, path: str):
+        """Writes the buffered frames to a CSV file, one row per frame, or a summary and the frames to JSON."""
+        frames = min(self.frames, self.capacity)
+        first = self.frames - frames
+        columns = [self.samples(section) for section in self.sections]
+        if path.endswith(".json"):
+            with open(path, "w") as f:
+                json.dump(
+                    {
+                        "frames": self.frames,
+                        "summary": self.summary(),
+                        "samples": {section: column.tolist() for section, column in zip(self.sections, columns)},
+                    },
+                    f,
+                    indent=2,
+                )
+            return
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame"] + [f"{section}_ms" for section in self.sections])
+            for i in range(frames):
+                writer.writerow([first + i] + [f"{column[i]:.4f}" for column in columns])
+
+
+class ProfilerOverlay:
+    """Percentiles of every section drawn over the game, refreshed a few times per second to stay cheap."""
+
+    def __init__(self, profiler: FrameProfiler, x: float, y: float, refresh: float = 0.25):
+        self.profiler = profiler
+        self.x = x
+        self.y = y
+        self.refresh = refresh
+        self.visible = False
+        self.batch = None
+        self.label = None
+        self._age = 0.0
+
+    def toggle(self):
+        self.visible = not self.visible
+        if self.visible and self.label is None:
+            self.batch = Batch()
+            self.label = Label(
+                "",
+                font_name=["DejaVu Sans Mono", "Consolas", "Menlo", "Courier New"],
+                font_size=9,
+                x=self.x,
+                y=self.y,
+                width=420,
+                multiline=True,
+                anchor_y="top",
+                color=(180, 255, 180, 230),
+                batch=self.batch,
+            )
+        self._age = self.refresh
+
+    def update(self, delta_time: float):
+        if not self.visible:
+            return
+        self._age += delta_time
+        if self._age < self.refresh:
+            return
+        self._age = 0.0
+        lines = [f"{'ms':<14}{'mean':>8}" + "".join(f"{f'p{p}':>8}" for p in PERCENTILES) + f"{'max':>8}"]
+        for section, stats in self.profiler.summary().items():
+            lines.append(f"{section:<14}" + "".join(f"{value:8.3f}" for value in stats.values()))
+        self.label.text = "\n".join(lines)
+
+    def draw(self):
+        if self.visible:
+            self.batch.draw()
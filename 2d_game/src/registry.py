@@ -0,0 +1,113 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Type, TypeVar
+from src.script import Script
+
+if TYPE_CHECKING:
+    from src.gameobject import GameObject
+
+T = TypeVar("T", bound=Script)
+
+
+class ObjectList(list):
+    """
+    List of GameObjects with constant time `remove` and `in`. Removing moves the last object into the freed
+    position, so the order is only kept as long as nothing is removed. Only use `append` and `remove` to change it.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._index: Dict[int, int] = {}
+
+    def append(self, gameobject: "GameObject"):
+        self._index[gameobject.uid] = len(self)
+        super().append(gameobject)
+
+    def remove(self, gameobject: "GameObject"):
+        index = self._index.pop(gameobject.uid)
+        last = super().pop()
+        if last is not gameobject:
+            self[index] = last
+            self._index[last.uid] = index
+
+    def __contains__(self, gameobject: object) -> bool:
+        return getattr(gameobject, "uid", None) in self._index
+
+    def clear(self):
+        super().clear()
+        self._index.clear()
+
+
+def script_types(script: Script) -> Iterable[type]:
+    """The script's class and its base classes that are scripts, so lookups match like `isinstance`."""
+    return (cls for cls in type(script).__mro__ if issubclass(cls, Script))
+
+
+class Registry:
+    """
+    All GameObjects of a scene with indexes by name, tag and script type. Every index maps to the objects by uid
+    in registration order, so lookups and removal take constant time and return the same objects in the same order
+    as scanning the list would. Names and tags are indexed on registration and must not change afterwards.
+    """
+
+    def __init__(self):
+        self.objects = ObjectList()
+        # Objects that move and get updated every tick, and static ones that are only collided with
+        self.dynamic = ObjectList()
+        self.static = ObjectList()
+        self.static_version = 0  # Incremented when static objects change, to rebuild cached collision data
+        self._by_name: Dict[str, Dict[int, "GameObject"]] = {}
+        self._by_tag: Dict[str, Dict[int, "GameObject"]] = {}
+        self._by_script: Dict[type, Dict[int, "GameObject"]] = {}
+
+    def add(self, gameobject: "GameObject"):
+        self.objects.append(gameobject)
+        if gameobject.static:
+            self.static.append(gameobject)
+            self.static_version += 1
+        else:
+            self.dynamic.append(gameobject)
+        self._by_name.setdefault(gameobject.name, {})[gameobject.uid] = gameobject
+        self._by_tag.setdefault(gameobject.tag, {})[gameobject.uid] = gameobject
+        for script in gameobject.scripts:
+            self.add_script(gameobject, script)
+
+    def remove(self, gameobject: "GameObject"):
+        if gameobject not in self.objects:
+            return
+        self.objects.remove(gameobject)
+        if gameobject.static:
+            self.static.remove(gameobject)
+            self.static_version += 1
+        else:
+            self.dynamic.remove(gameobject)
+        self._discard(self._by_name, gameobject.name, gameobject)
+        self._discard(self._by_tag, gameobject.tag, gameobject)
+        for script in gameobject.scripts:
+            for cls in script_types(script):
+                self._discard(self._by_script, cls, gameobject)
+
+    def add_script(self, gameobject: "GameObject", script: Script):
+        if gameobject not in self.objects:
+            return
+        for cls in script_types(script):
+            self._by_script.setdefault(cls, {})[gameobject.uid] = gameobject
+
+    @staticmethod
+    def _discard(index: Dict, key, gameobject: "GameObject"):
+        bucket = index.get(key)
+        if bucket is not None:
+            bucket.pop(gameobject.uid, None)
+            if not bucket:
+                del index[key]
+
+    def find(self, name: str) -> Optional["GameObject"]:
+        bucket = self._by_name.get(name)
+        return next(iter(bucket.values())) if bucket else None
+
+    def find_by_tag(self, tag: str) -> List["GameObject"]:
+        bucket = self._by_tag.get(tag)
+        return list(bucket.values()) if bucket else []
+
+    def find_by_script(self, script_type: Type[T]) -> List["GameObject"]:
+        bucket = self._by_script.get(script_type)
+        return list(bucket.values()) if bucket else []
@@ -1,8 +1,9 @@
 from abc import abstractmethod
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 if TYPE_CHECKING:
     from src.gameobject import GameObject
+    from src.managers.collision_manager import Contact
 
 
 class Script:
@@ -16,7 +17,7 @@ class Script:
         pass  # Override in subclasses for custom logic
 
     @abstractmethod
-    def on_collision_start(self, other: "GameObject"):
+    def on_collision_start(self, other: "GameObject", contact: Optional["Contact"] = None):
         pass
 
     @abstractmethod
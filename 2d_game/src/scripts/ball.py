@@ -1,9 +1,6 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 from src.script import Script
 from src.util import Vector2D
-import os
-import pyglet
-import random
 import math
 from config import INITIAL_BALL_SPEED, SPEED_RATE
 from src.scripts.border import Border
@@ -11,41 +8,72 @@ from src.scripts.paddle import Paddle
 
 if TYPE_CHECKING:
     from src.gameobject import GameObject
+    from src.managers.collision_manager import Contact
 
 
 class Ball(Script):
     def __init__(self, gameobject):
         super().__init__()
         self.gameobject = gameobject
-        self.audio = pyglet.media.load(
-            os.path.abspath(os.path.dirname(__file__) + "/../../assets/bounce.wav"),
-            streaming=False,
-        )
-        self.player = None
+        self.audio = gameobject.gm.create_voices("bounce.wav")
+        # Reused for velocity and center calculations instead of allocating new vectors on every bounce
+        self._velocity = Vector2D(0, 0)
+        self._center = Vector2D(0, 0)
+        self._other_center = Vector2D(0, 0)
 
     def play_bounce_sound(self):
-        self.player = self.audio.play()
-        self.player.pitch = random.uniform(0.8, 1.2)
-        self.player.volume = 0.3
+        self.audio.play(pitch=self.gameobject.gm.random.uniform(0.8, 1.2), volume=0.3)
+
+    def move_to_contact(self, contact: "Contact"):
+        """Moves the ball back to where it touched the other object during the last movement."""
+        go = self.gameobject
+        go.x = go.prev_x + (go.x - go.prev_x) * contact.time
+        go.y = go.prev_y + (go.y - go.prev_y) * contact.time
 
-    def on_collision_start(self, other: "GameObject"):
+    def advance(self, contact: "Contact"):
+        """Continues the movement with the new velocity for the rest of the step."""
+        go = self.gameobject
+        velocity = go.get_velocity(self._velocity)
+        go.x += velocity.x * contact.remaining
+        go.y += velocity.y * contact.remaining
+
+    def on_collision_start(self, other: "GameObject", contact: Optional["Contact"] = None):
         if other.tag == "border":
             border = other.get_script(Border)
             if border:
-                self.gameobject.velocity = self.gameobject.velocity.reflect(
-                    border.normal()
+                if contact:
+                    self.move_to_contact(contact)
+                self.gameobject.velocity = self.gameobject.get_velocity(self._velocity).reflect_(
+                    contact.normal if contact else border.normal()
                 )
+                if contact:
+                    self.advance(contact)
             self.play_bounce_sound()
         elif other.tag == "paddle":
             paddle = other.get_script(Paddle)
             paddle.update_npc_offset()
-            ball_center = self.gameobject.get_center()
-            paddle_center = other.get_center()
+            if contact:
+                self.move_to_contact(contact)
+                if contact.normal.x == 0:
+                    # Hit the top or bottom edge of the paddle, bounce off vertically
+                    self.gameobject.velocity = self.gameobject.get_velocity(
+                        self._velocity
+                    ).reflect_(contact.normal)
+                    self.advance(contact)
+                    self.play_bounce_sound()
+                    return
+            ball_center = self.gameobject.get_center(self._center)
+            paddle_center = other.get_center(self._other_center)
             paddle_height = other.shape.height
             offset = (ball_center.y - paddle_center.y) / (paddle_height / 2)
             offset = max(-1, min(1, offset))
-            direction = -1 if self.gameobject.velocity.x > 0 else 1
-            speed = self.gameobject.velocity.length() + random.uniform(
+            velocity = self.gameobject.get_velocity(self._velocity)
+            # Bounce away from the paddle face that was hit, even if the paddle caught up with the ball
+            if contact:
+                direction = 1 if contact.normal.x > 0 else -1
+            else:
+                direction = -1 if velocity.x > 0 else 1
+            speed = velocity.length() + self.gameobject.gm.random.uniform(
                 INITIAL_BALL_SPEED * (SPEED_RATE / 3), INITIAL_BALL_SPEED * SPEED_RATE
             )
             max_bounce_angle = 60
@@ -53,12 +81,15 @@ class Ball(Script):
             rad = math.radians(angle)
             new_vx = direction * abs(math.cos(rad)) * speed
             new_vy = math.sin(rad) * speed
-            self.gameobject.velocity = Vector2D(new_vx, new_vy)
+            self.gameobject.velocity = velocity.set(new_vx, new_vy)
+            if contact:
+                self.advance(contact)
             self.play_bounce_sound()
 
     def reset(self, x, y):
-        self.gameobject.shape.x = x - self.gameobject.shape.width / 2
-        self.gameobject.shape.y = y - self.gameobject.shape.height / 2
-        self.gameobject.velocity = Vector2D(0, 0)
+        self.gameobject.teleport(
+            x - self.gameobject.shape.width / 2, y - self.gameobject.shape.height / 2
+        )
+        self.gameobject.velocity = self._velocity.set(0, 0)
         self.gameobject.out_of_bounds_ver = False
         self.gameobject.out_of_bounds_hor = False
@@ -1,83 +1,127 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
 from src.script import Script
-from src.util import Vector2D
-from config import INITIAL_BALL_SPEED, NPC_MAX_BASE_SPEED
-import random
+from src.util import ConnectionState, Vector2D
+from config import CONNECTION_TIMEOUT, INITIAL_BALL_SPEED, NPC_MAX_BASE_SPEED
 import math
-import time
 from DIPPID import SensorUDP
 
 if TYPE_CHECKING:
+    from DIPPID import Sensor
     from src.gameobject import GameObject
 
 
 class Paddle(Script):
-    def __init__(self, gameobject: "GameObject", player_id):
+    def __init__(self, gameobject: "GameObject", player_id, sensor: Optional["Sensor"] = None):
         super().__init__()
         self.gameobject = gameobject
         self.player_id: int = player_id
         self.score: int = 0
         self.npc_offset_y: int = 0
         self.last_signal: float = None
-        self.sensor = SensorUDP(player_id)
+        # Cached connection state, changed once per tick by update_connection
+        self.state = ConnectionState.DISCONNECTED
+        self.connected: bool = False
+        self._signalled = False  # Input arrived since the last update_connection
+        self._callbacks: Dict[str, List[Callable[["Paddle"], None]]] = {"connect": [], "disconnect": []}
+        # Listens on the player id as port unless another sensor is passed in
+        self.sensor = sensor if sensor is not None else SensorUDP(player_id)
         self.sensor.register_callback("gravity", self.on_input)
         self.window = gameobject.gm.window
+        self.clock = gameobject.gm.clock
+        # Reused every frame by the NPC instead of allocating new vectors
+        self._velocity = Vector2D(0, 0)
+        self._center = Vector2D(0, 0)
+        self._ball_center = Vector2D(0, 0)
+        self._ball_velocity = Vector2D(0, 0)
+        # Separate vector for the sensor thread so it never shares one with the game loop
+        self._input_velocity = Vector2D(0, 0)
 
     def update_npc_offset(self):
         paddle_height = self.gameobject.shape.height
-        offset = random.uniform(-0.45, 0.45) * paddle_height
+        offset = self.gameobject.gm.random.uniform(-0.45, 0.45) * paddle_height
         self.npc_offset_y = offset
 
+    @staticmethod
+    def accepts(gravity) -> bool:
+        """Anything can arrive over the network, only a finite number for z moves the paddle."""
+        return (
+            isinstance(gravity, dict)
+            and isinstance(gravity.get("z"), (int, float))
+            and math.isfinite(gravity["z"])
+        )
+
     def on_input(self, gravity: dict):
-        if "z" in gravity:
+        if self.accepts(gravity):
             input: float = (
                 math.copysign(abs(gravity["z"] / 9.81) ** 1.5, gravity["z"])
                 * INITIAL_BALL_SPEED
                 * 1.35
             )
-            self.gameobject.set_velocity(Vector2D(0, input))
-            self.last_signal = time.time()
+            self.gameobject.set_velocity(self._input_velocity.set(0, input))
+            self.last_signal = self.clock()
+            self._signalled = True
+
+    def register_callback(self, event: str, func: Callable[["Paddle"], None]):
+        """Calls `func` with this paddle on the "connect" or "disconnect" event, on the game loop's thread."""
+        self._callbacks[event].append(func)
+
+    def unregister_callback(self, event: str, func: Callable[["Paddle"], None]):
+        self._callbacks[event].remove(func)
+
+    def update_connection(self, now: float):
+        """
+        Advances the connection state machine, called once per tick. Input from the sensor connects the player once
+        the device sends everything the game needs, a timeout without input disconnects it again.
+        """
+        if self.state == ConnectionState.CONNECTED:
+            if now - self.last_signal > CONNECTION_TIMEOUT:
+                self._set_state(ConnectionState.DISCONNECTED)
+        elif self._signalled:
+            self._signalled = False
+            if (
+                now - self.last_signal <= CONNECTION_TIMEOUT
+                and self.sensor.has_capability("button_1")
+                and isinstance(self.sensor.get_value("gravity"), dict)
+                and "z" in self.sensor.get_value("gravity")
+            ):
+                self._set_state(ConnectionState.CONNECTED)
+
+    def _set_state(self, state: ConnectionState):
+        self.state = state
+        self.connected = state == ConnectionState.CONNECTED
+        for func in self._callbacks["connect" if self.connected else "disconnect"]:
+            func(self)
 
     def is_ready(self) -> bool:
-        return not self.is_connected() or self.sensor.get_value("button_1") == 1
+        return not self.connected or self.sensor.get_value("button_1") == 1
 
     def update(self, delta_time):
-        if self.gameobject.shape.x < 0:
-            self.gameobject.shape.x = 0
-        elif self.gameobject.shape.x + self.gameobject.shape.width > self.window.width:
-            self.gameobject.shape.x = self.window.width - self.gameobject.shape.width
-        if self.gameobject.shape.y < 0:
-            self.gameobject.shape.y = 0
-        elif (
-            self.gameobject.shape.y + self.gameobject.shape.height > self.window.height
-        ):
-            self.gameobject.shape.y = self.window.height - self.gameobject.shape.height
-        if not self.is_connected():
+        if self.gameobject.x < 0:
+            self.gameobject.x = 0
+        elif self.gameobject.x + self.gameobject.shape.width > self.window.width:
+            self.gameobject.x = self.window.width - self.gameobject.shape.width
+        if self.gameobject.y < 0:
+            self.gameobject.y = 0
+        elif self.gameobject.y + self.gameobject.shape.height > self.window.height:
+            self.gameobject.y = self.window.height - self.gameobject.shape.height
+        if not self.connected:
             self.npc_takeover()
 
-    def is_connected(self):
-        signal_delta = time.time() - (self.last_signal or 0)
-        timed_out = signal_delta > 2
-        return (
-            not timed_out
-            and self.sensor.has_capability("gravity")
-            and "z" in self.sensor.get_value("gravity")
-            and self.sensor.has_capability("button_1")
-        )
+    def is_connected(self) -> bool:
+        return self.connected
 
     def npc_takeover(self):
-        ball = (
-            self.gameobject.gm.find("Ball") if self.gameobject.gm.find("Ball") else None
-        )
+        ball = self.gameobject.gm.find("Ball")
         if not ball:
             return
 
-        ball_center = ball.get_center()
-        paddle_center = self.gameobject.get_center()
+        ball_center = ball.get_center(self._ball_center)
+        paddle_center = self.gameobject.get_center(self._center)
+        ball_velocity = ball.get_velocity(self._ball_velocity)
         target_y = paddle_center.y + self.npc_offset_y
         is_moving_towards_paddle = (
-            ball.velocity.x < 0 and ball_center.x > paddle_center.x
-        ) or (ball.velocity.x > 0 and ball_center.x < paddle_center.x)
+            ball_velocity.x < 0 and ball_center.x > paddle_center.x
+        ) or (ball_velocity.x > 0 and ball_center.x < paddle_center.x)
         distance_x = abs(ball_center.x - paddle_center.x)
         speed_factor = (
             (NPC_MAX_BASE_SPEED + (0.5 - min(0.5, (distance_x) / self.window.width)))
@@ -86,7 +130,7 @@ class Paddle(Script):
         )
         delta_y = max(min(ball_center.y - target_y, 9.81), -9.81)
         desired_vertical_velocity = delta_y / 9.81 * INITIAL_BALL_SPEED * speed_factor
-        self.gameobject.set_velocity(Vector2D(0, desired_vertical_velocity))
+        self.gameobject.set_velocity(self._velocity.set(0, desired_vertical_velocity))
 
     def disconnect(self):
         self.sensor.disconnect()
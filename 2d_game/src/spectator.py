@@ -0,0 +1,405 @@
+from __future__ import annotations
+import secrets
+import socket
+import struct
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Callable, Deque, Dict, List, NamedTuple, Optional, Tuple
+from config import MAX_SPECTATORS, SPECTATOR_RATE, SPECTATOR_TIMEOUT, WIN_CONDITION
+from src.util import GameState
+
+if TYPE_CHECKING:
+    from src.managers.game_manager import GameManager
+
+# Positions are sent in half pixels, scores and the game state as they are
+QUANTUM = 0.5
+FIELDS = ("ball_x", "ball_y", "left_x", "left_y", "right_x", "right_y", "left_score", "right_score", "state")
+POSITIONS = 6  # The first fields are positions, the others can't be interpolated
+POSITION_LIMIT = 1 << 16  # Far outside any window, a decoded position beyond it is garbage
+STATES = frozenset(state.value for state in GameState)
+HISTORY = 64  # Snapshots kept to decode deltas against, older acknowledgements get a full snapshot
+UDP_OVERHEAD = 28  # IPv4 and UDP headers of every datagram
+
+SNAPSHOT, ACK, BYE = 1, 2, 3
+# Kind, session, sequence number, base sequence number (0 for the zero snapshot), game time of the snapshot in ms,
+# bit mask of the fields that follow. Every feed picks a random session, sequence numbers and bases are only
+# meaningful within one session.
+HEADER = struct.Struct("<BHIIIH")
+# Kind, session (0 before the first snapshot), last decoded sequence number (0 to join)
+CONTROL = struct.Struct("<BHI")
+
+Snapshot = Tuple[int, ...]
+ZERO: Snapshot = (0,) * len(FIELDS)
+
+
+def capture(gm: "GameManager") -> Snapshot:
+    """The quantized state spectators see: ball and paddle positions, scores and the game state."""
+    from src.scripts.paddle import Paddle
+
+    ball, left, right = gm.find("Ball"), gm.find("Paddle Left"), gm.find("Paddle Right")
+    return (
+        round(ball.x / QUANTUM),
+        round(ball.y / QUANTUM),
+        round(left.x / QUANTUM),
+        round(left.y / QUANTUM),
+        round(right.x / QUANTUM),
+        round(right.y / QUANTUM),
+        left.get_script(Paddle).score,
+        right.get_script(Paddle).score,
+        gm.state.value,
+    )
+
+
+def encode(session: int, seq: int, time_ms: int, snapshot: Snapshot, base_seq: int, base: Snapshot) -> bytes:
+    """A snapshot as the changes against `base`, every changed field as a zigzag varint of the difference."""
+    mask = 0
+    body = bytearray()
+    for i, (value, old) in enumerate(zip(snapshot, base)):
+        if value == old:
+            continue
+        mask |= 1 << i
+        delta = value - old
+        zigzag = delta << 1 if delta >= 0 else (-delta << 1) - 1
+        while zigzag >= 0x80:
+            body.append(zigzag & 0x7F | 0x80)
+            zigzag >>= 7
+        body.append(zigzag)
+    return HEADER.pack(SNAPSHOT, session, seq, base_seq, time_ms & 0xFFFFFFFF, mask) + body
+
+
+def decode(data: bytes, history: Dict[int, Snapshot], session: int) -> Optional[Tuple[int, int, float, Snapshot]]:
+    """
+    Session, sequence number, game time in seconds and snapshot of a packet. None if it's malformed, its values are
+    out of range or its base isn't in `history`. `history` belongs to `session`, a packet of another session can only
+    be decoded against the zero snapshot.
+    """
+    if len(data) < HEADER.size:
+        return None
+    kind, packet_session, seq, base_seq, time_ms, mask = HEADER.unpack_from(data)
+    if kind != SNAPSHOT or mask >> len(FIELDS):
+        return None
+    if packet_session != session:
+        history = {}
+    base = ZERO if base_seq == 0 else history.get(base_seq)
+    if base is None:
+        return None
+    values = list(base)
+    offset = HEADER.size
+    try:
+        for i in range(len(FIELDS)):
+            if not mask & (1 << i):
+                continue
+            zigzag = shift = 0
+            while True:
+                byte = data[offset]
+                offset += 1
+                zigzag |= (byte & 0x7F) << shift
+                shift += 7
+                if byte < 0x80:
+                    break
+                if shift > 28:
+                    return None
+            values[i] += zigzag >> 1 if not zigzag & 1 else -((zigzag + 1) >> 1)
+    except IndexError:
+        return None
+    if (
+        any(abs(value) > POSITION_LIMIT for value in values[:POSITIONS])
+        or not 0 <= values[6] <= WIN_CONDITION
+        or not 0 <= values[7] <= WIN_CONDITION
+        or values[8] not in STATES
+    ):
+        return None
+    return packet_session, seq, time_ms / 1000, tuple(values)
+
+
+class Spectator:
+    def __init__(self, address: Tuple[str, int], now: float):
+        self.address = address
+        self.acked = 0  # Last snapshot the spectator confirmed, deltas are encoded against it
+        self.last_seen = now
+
+
+class SpectatorStats(NamedTuple):
+    spectators: int
+    snapshots: int  # Broadcasts since the last report
+    sent: int  # Datagrams since the last report
+    payload: int  # Bytes since the last report, without UDP/IP headers
+    full: int  # Datagrams that had no acknowledged base and were encoded against the zero snapshot
+    busy: float  # Seconds spent receiving, encoding and sending
+    rate: float  # Snapshots per second
+
+    @property
+    def bytes_per_packet(self) -> float:
+        return self.payload / self.sent if self.sent else 0.0
+
+    @property
+    def bandwidth(self) -> float:
+        """Bytes per second sent to one spectator, including UDP/IP headers."""
+        return (self.bytes_per_packet + UDP_OVERHEAD) * self.rate if self.sent else 0.0
+
+    @property
+    def cpu(self) -> float:
+        """Fraction of a core the feed needs per spectator."""
+        return self.busy / self.sent * self.rate if self.sent else 0.0
+
+
+class SpectatorFeed:
+    """
+    Broadcasts the state of a match to spectators over UDP. A spectator joins by sending an ACK for sequence number 0
+    and then acknowledges every snapshot it decoded; each snapshot is sent as quantized deltas against the last one
+    that spectator acknowledged, or against zero when none is known anymore. Spectators that share a base share one
+    encoded packet, so most of the per spectator cost is the send call. Silent spectators time out.
+    Runs on the game loop: `update` is called every frame and broadcasts at `rate` per second of `clock`, the game
+    time of the last simulated tick, which every snapshot carries so viewers can place it on their timeline.
+    """
+
+    def __init__(
+        self,
+        game_manager: "GameManager",
+        port: int,
+        rate: int = SPECTATOR_RATE,
+        ip: str = "0.0.0.0",
+        max_spectators: int = MAX_SPECTATORS,
+        clock: Optional[Callable[[], float]] = None,
+    ):
+        self.game_manager = game_manager
+        self.rate = max(1, rate)
+        self.interval = 1 / self.rate
+        self.max_spectators = max_spectators
+        self.clock = clock if clock is not None else game_manager.clock
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            self.sock.setblocking(False)
+            self.sock.bind((ip, port))
+        except OSError:
+            self.sock.close()
+            raise
+        self.address = self.sock.getsockname()
+        self.session = secrets.randbits(16) or 1
+        self.spectators: Dict[Tuple[str, int], Spectator] = {}
+        self.seq = 0
+        self.history: Dict[int, Snapshot] = {}
+        self._order: Deque[int] = deque()
+        self._next_broadcast: Optional[float] = None
+        self._start: Optional[float] = None
+        self._reset_stats()
+
+    def update(self):
+        start = time.perf_counter()
+        now = self.clock()
+        self._receive(now)
+        if self._next_broadcast is None or now >= self._next_broadcast:
+            # Fixed deadlines, but a late frame doesn't cause a burst of snapshots
+            self._next_broadcast = max((self._next_broadcast or now) + self.interval, now)
+            self._expire(now)
+            if self.spectators:
+                self._broadcast(now)
+        self._busy += time.perf_counter() - start
+
+    def _receive(self, now: float):
+        while True:
+            try:
+                data, address = self.sock.recvfrom(64)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                # E.g. ICMP port unreachable from a spectator that quit
+                continue
+            if len(data) != CONTROL.size:
+                continue
+            kind, session, seq = CONTROL.unpack(data)
+            spectator = self.spectators.get(address)
+            if kind == BYE:
+                self.spectators.pop(address, None)
+                continue
+            if kind != ACK:
+                continue
+            if spectator is None:
+                if len(self.spectators) >= self.max_spectators:
+                    continue
+                spectator = self.spectators[address] = Spectator(address, now)
+            spectator.last_seen = now
+            # Acknowledgements can arrive out of order, only newer ones move the base forward. One of an earlier
+            # session refers to different snapshots with the same numbers, the spectator gets a full one instead.
+            if session == self.session and seq > spectator.acked and seq in self.history:
+                spectator.acked = seq
+
+    def _expire(self, now: float):
+        for address in [a for a, s in self.spectators.items() if now - s.last_seen > SPECTATOR_TIMEOUT]:
+            del self.spectators[address]
+
+    def _broadcast(self, now: float):
+        self.seq += 1
+        snapshot = capture(self.game_manager)
+        if self._start is None:
+            self._start = now
+        time_ms = round((now - self._start) * 1000)
+        packets: Dict[int, bytes] = {}
+        for spectator in list(self.spectators.values()):
+            base_seq = spectator.acked if spectator.acked in self.history else 0
+            packet = packets.get(base_seq)
+            if packet is None:
+                base = ZERO if base_seq == 0 else self.history[base_seq]
+                packet = packets[base_seq] = encode(self.session, self.seq, time_ms, snapshot, base_seq, base)
+            try:
+                self.sock.sendto(packet, spectator.address)
+            except OSError:
+                del self.spectators[spectator.address]
+                continue
+            self._sent += 1
+            self._payload += len(packet)
+            if base_seq == 0:
+                self._full += 1
+        self._snapshots += 1
+        self.history[self.seq] = snapshot
+        self._order.append(self.seq)
+        if len(self._order) > HISTORY:
+            del self.history[self._order.popleft()]
+
+    def _reset_stats(self):
+        self._snapshots = 0
+        self._sent = 0
+        self._payload = 0
+        self._full = 0
+        self._busy = 0.0
+
+    def stats(self) -> SpectatorStats:
+        """Stats since the last call."""
+        stats = SpectatorStats(
+            len(self.spectators), self._snapshots, self._sent, self._payload, self._full, self._busy, self.rate
+        )
+        self._reset_stats()
+        return stats
+
+    def close(self):
+        self.sock.close()
+
+
+class SpectatorView(NamedTuple):
+    """Interpolated state in pixels."""
+
+    ball_x: float
+    ball_y: float
+    left_x: float
+    left_y: float
+    right_x: float
+    right_y: float
+    left_score: int
+    right_score: int
+    state: GameState
+
+
+class SpectatorClient:
+    """
+    Receives a SpectatorFeed: decodes and acknowledges snapshots and interpolates between them `delay` seconds
+    behind the newest one, so snapshots arriving late or a lost one don't make the motion stutter.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        delay: float = 0.1,
+        clock: Callable[[], float] = time.perf_counter,
+        keepalive: float = 1.0,
+    ):
+        self.server = (socket.gethostbyname(host), port)
+        self.delay = delay
+        self.clock = clock
+        self.keepalive = keepalive
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self.history: Dict[int, Snapshot] = {}
+        self._order: Deque[int] = deque()
+        self.session = 0
+        self.latest = 0
+        self.received = 0
+        self.dropped = 0  # Packets that couldn't be decoded, e.g. because their base was lost
+        # Game time of the recent snapshots and the offset to the local clock
+        self.timeline: Deque[Tuple[float, Snapshot]] = deque(maxlen=HISTORY)
+        self.offset: Optional[float] = None
+        self._last_ack: Optional[float] = None
+
+    def poll(self) -> int:
+        """Decodes every pending snapshot, acknowledges the newest and returns how many were decoded."""
+        decoded = 0
+        now = self.clock()
+        while True:
+            try:
+                data = self.sock.recv(2048)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                continue
+            self.received += 1
+            result = decode(data, self.history, self.session)
+            if result is None:
+                self.dropped += 1
+                continue
+            session, seq, server_time, snapshot = result
+            if session != self.session:
+                # A new feed, e.g. the game restarted, its snapshots have nothing to do with the ones received so far
+                self._restart()
+                self.session = session
+            if seq <= self.latest:
+                continue
+            decoded += 1
+            self.latest = seq
+            self.history[seq] = snapshot
+            self._order.append(seq)
+            if len(self._order) > HISTORY:
+                del self.history[self._order.popleft()]
+            # The least delayed snapshot so far gives the best estimate of the clock offset
+            if self.offset is None or now - server_time < self.offset:
+                self.offset = now - server_time
+            self.timeline.append((server_time, snapshot))
+        # Acknowledging also joins the feed and keeps the spectator from timing out while nothing arrives
+        if decoded or self._last_ack is None or now - self._last_ack >= self.keepalive:
+            self._send(ACK, self.latest)
+            self._last_ack = now
+        return decoded
+
+    def _restart(self):
+        self.history.clear()
+        self._order.clear()
+        self.latest = 0
+        self.offset = None
+        self.timeline.clear()
+
+    def _send(self, kind: int, seq: int):
+        try:
+            self.sock.sendto(CONTROL.pack(kind, self.session, seq), self.server)
+        except OSError:
+            pass
+
+    def sample(self, now: Optional[float] = None) -> Optional[SpectatorView]:
+        """The state `delay` seconds ago, None until the first snapshot arrived."""
+        if not self.timeline:
+            return None
+        now = self.clock() if now is None else now
+        render_time = now - self.offset - self.delay
+        timeline = self.timeline
+        if render_time <= timeline[0][0]:
+            return self._view(timeline[0][1])
+        if render_time >= timeline[-1][0]:
+            return self._view(timeline[-1][1])
+        for (t0, a), (t1, b) in zip(timeline, list(timeline)[1:]):
+            if t0 <= render_time <= t1:
+                # Across a state change the ball is reset, jump instead of sliding across the field
+                if a[-1] != b[-1]:
+                    return self._view(a)
+                alpha = (render_time - t0) / (t1 - t0)
+                positions = [(x + (y - x) * alpha) for x, y in zip(a[:POSITIONS], b[:POSITIONS])]
+                return self._view(a, positions)
+        return self._view(timeline[-1][1])
+
+    @staticmethod
+    def _view(snapshot: Snapshot, positions: Optional[List[float]] = None) -> SpectatorView:
+        positions = positions if positions is not None else snapshot[:POSITIONS]
+        return SpectatorView(
+            *(p * QUANTUM for p in positions), snapshot[6], snapshot[7], GameState(snapshot[8])
+        )
+
+    def close(self):
+        self._send(BYE, self.latest)
+        self.sock.close()
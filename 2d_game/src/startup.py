@@ -0,0 +1,56 @@
+from __future__ import annotations
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class StartupTimer:
+    """Wall clock time of the startup phases, measured from `start` (the top of game.py) to the first frame."""
+
+    def __init__(self, start: Optional[float] = None):
+        self.start = time.perf_counter() if start is None else start
+        self.phases: Dict[str, float] = {}
+        self.order: List[str] = []
+        self.first_frame: Optional[float] = None  # Seconds from start until the first frame was drawn
+
+    def add(self, name: str, seconds: float):
+        self._register(name)
+        self.phases[name] += seconds
+
+    def _register(self, name: str):
+        # Listed in the order phases start, so nested phases follow the one containing them
+        if name not in self.phases:
+            self.phases[name] = 0.0
+            self.order.append(name)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        self._register(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def timed(self, name: str, func: Callable[..., T]) -> Callable[..., T]:
+        """Wraps `func` so the time of every call is added to the phase `name`."""
+
+        def call(*args, **kwargs) -> T:
+            with self.phase(name):
+                return func(*args, **kwargs)
+
+        return call
+
+    def frame_drawn(self):
+        if self.first_frame is None:
+            self.first_frame = time.perf_counter() - self.start
+
+    def report(self, load_times: Optional[Dict[str, float]] = None) -> str:
+        lines = [f"{name:<14} {self.phases[name] * 1000:8.1f} ms" for name in self.order]
+        if self.first_frame is not None:
+            lines.append(f"{'first frame':<14} {self.first_frame * 1000:8.1f} ms after start")
+        for name, seconds in (load_times or {}).items():
+            lines.append(f"{'asset ' + name:<14} {seconds * 1000:8.1f} ms in the background")
+        return "\n".join(lines)
@@ -0,0 +1,52 @@
+from typing import List, Optional, Tuple
+from pyglet.graphics import Batch, Group
+from src.util import BlendGroup, Box
+
+
+class StaticLayer:
+    """
+    Rectangles that never move, e.g. the center line and the borders, baked into a single vertex list.
+    Drawing them costs one draw call per frame and nothing else, they aren't updated, integrated or synced.
+    """
+
+    def __init__(self, batch: Optional[Batch] = None, group: Optional[Group] = None):
+        self.batch = batch
+        self.group = group
+        self.rects: List[Tuple[float, float, float, float, Tuple[int, int, int, int]]] = []
+        self._vertex_list = None
+
+    def add_rect(self, x: float, y: float, width: float, height: float, color: Tuple[int, ...]) -> Box:
+        """Adds a rectangle to the layer, it's drawn after the next `build`. Returns an undrawn box with its bounds."""
+        rgba = tuple(color) + (255,) * (4 - len(color))
+        self.rects.append((x, y, width, height, rgba))
+        return Box(x, y, width, height, color)
+
+    def build(self):
+        """(Re)creates the vertex list with all rectangles added so far."""
+        self.delete()
+        if self.batch is None or not self.rects:
+            return
+        from pyglet import gl, shapes
+
+        positions = []
+        colors = []
+        for x, y, width, height, rgba in self.rects:
+            x2, y2 = x + width, y + height
+            positions.extend((x, y, x2, y, x2, y2, x, y, x2, y2, x, y2))
+            colors.extend(rgba * 6)
+        program = shapes.get_default_shader()
+        count = len(self.rects) * 6
+        self._vertex_list = program.vertex_list(
+            count,
+            gl.GL_TRIANGLES,
+            self.batch,
+            BlendGroup(program, self.group),
+            position=("f", positions),
+            color=("Bn", colors),
+            translation=("f", (0, 0) * count),
+        )
+
+    def delete(self):
+        if self._vertex_list is not None:
+            self._vertex_list.delete()
+            self._vertex_list = None
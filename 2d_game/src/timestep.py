@@ -0,0 +1,34 @@
+class FixedTimestep:
+    """
+    Accumulates variable frame times and hands them out as fixed simulation ticks, so the physics behaves the same
+    regardless of the render rate and a frame hitch can't produce one huge step.
+    """
+
+    # Frame times are sums of floats, don't lose a tick to rounding when they add up to exactly one
+    EPSILON = 1e-9
+
+    def __init__(self, rate: float, max_substeps: int):
+        self.tick = 1 / rate
+        self.max_substeps = max(1, max_substeps)
+        self.accumulator = 0.0
+        self.dropped = 0.0  # Simulation time skipped because a frame needed more than max_substeps ticks
+        self.time = 0.0  # Simulated seconds, the time of the last tick
+
+    def advance(self, delta_time: float) -> int:
+        """Adds the frame time and returns the number of ticks to simulate for this frame."""
+        self.accumulator += delta_time
+        steps = int((self.accumulator + self.EPSILON) // self.tick)
+        if steps > self.max_substeps:
+            # Catching up would make the next frame even slower, let the simulation fall behind instead
+            self.dropped += (steps - self.max_substeps) * self.tick
+            steps = self.max_substeps
+        self.accumulator = max(0.0, self.accumulator - steps * self.tick)
+        if self.accumulator >= self.tick:
+            self.accumulator %= self.tick
+        self.time += steps * self.tick
+        return steps
+
+    @property
+    def alpha(self) -> float:
+        """How far the current frame is into the next tick, used to interpolate between the last two states."""
+        return min(1.0, self.accumulator / self.tick)
@@ -1,7 +1,8 @@
 from __future__ import annotations
 import math
-from pyglet.graphics import Batch
+from pyglet.graphics import Batch, Group
 from enum import Enum, auto
+from typing import Optional, Tuple
 
 
 class GameState(Enum):
@@ -12,11 +13,73 @@ class GameState(Enum):
     GAME_OVER = auto()
 
 
+class ConnectionState(Enum):
+    DISCONNECTED = auto()
+    CONNECTED = auto()
+
+
 gameobject_batch = Batch()
 ui_batch = Batch()
 
 
+class BlendGroup(Group):
+    """Blended drawing with a shader program, like pyglet's shapes, for vertex lists created by hand."""
+
+    def __init__(self, program, parent: Optional[Group] = None):
+        super().__init__(parent=parent)
+        self.program = program
+
+    def set_state(self):
+        from pyglet import gl
+
+        self.program.bind()
+        gl.glEnable(gl.GL_BLEND)
+        gl.glBlendFunc(gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_ALPHA)
+
+    def unset_state(self):
+        from pyglet import gl
+
+        gl.glDisable(gl.GL_BLEND)
+        self.program.unbind()
+
+
+class Box:
+    """Axis aligned rectangle with the parts of the pyglet shape interface the game logic uses, not drawn itself.
+    Stands in for shapes in headless mode and for geometry baked into a StaticLayer."""
+
+    def __init__(self, x: float, y: float, width: float, height: float, color: Tuple[int, ...] = (255, 255, 255)):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.color = color
+
+    @property
+    def position(self) -> Tuple[float, float]:
+        return self.x, self.y
+
+    @position.setter
+    def position(self, value: Tuple[float, float]):
+        self.x, self.y = value
+
+    def __contains__(self, point: Tuple[float, float]) -> bool:
+        px, py = point
+        return self.x <= px <= self.x + self.width and self.y <= py <= self.y + self.height
+
+    def delete(self):
+        pass
+
+
 class Vector2D:
+    """
+    2D vector. The operators and methods like `normalize` return new vectors, the variants ending in an
+    underscore (and `iadd`/`isub`, `+=`, `-=`, `*=`, `/=`) change the vector in place and return it, so hot
+    paths can reuse preallocated vectors instead of allocating new ones every frame.
+    """
+
+    # No per instance __dict__, smaller and faster attribute access
+    __slots__ = ("x", "y")
+
     def __init__(self, x: float, y: float):
         self.x = x
         self.y = y
@@ -54,6 +117,67 @@ class Vector2D:
         """Linearly interpolate between two vectors."""
         return Vector2D(a.x + (b.x - a.x) * t, a.y + (b.y - a.y) * t)
 
+    def copy(self) -> Vector2D:
+        return Vector2D(self.x, self.y)
+
+    # In place variants
+
+    def set(self, x: float, y: float) -> Vector2D:
+        self.x = x
+        self.y = y
+        return self
+
+    def copy_from(self, other: Vector2D) -> Vector2D:
+        self.x = other.x
+        self.y = other.y
+        return self
+
+    def iadd(self, other: Vector2D) -> Vector2D:
+        self.x += other.x
+        self.y += other.y
+        return self
+
+    def isub(self, other: Vector2D) -> Vector2D:
+        self.x -= other.x
+        self.y -= other.y
+        return self
+
+    def scale_(self, scalar: float) -> Vector2D:
+        self.x *= scalar
+        self.y *= scalar
+        return self
+
+    def normalize_(self) -> Vector2D:
+        """Normalize the vector to a length of 1 in place, a zero vector stays zero."""
+        length = self.length()
+        if length != 0:
+            self.x /= length
+            self.y /= length
+        return self
+
+    def reflect_(self, normal: Vector2D) -> Vector2D:
+        """Reflect the vector on a normal vector in place."""
+        dot_product = self.x * normal.x + self.y * normal.y
+        self.x -= 2 * dot_product * normal.x
+        self.y -= 2 * dot_product * normal.y
+        return self
+
+    def rotate_angle_(self, angle: float) -> Vector2D:
+        """Rotate the vector by a given angle in degrees in place."""
+        rad = angle * (3.141592653589793 / 180)
+        cos_angle = math.cos(rad)
+        sin_angle = math.sin(rad)
+        x = self.x
+        self.x = x * cos_angle - self.y * sin_angle
+        self.y = x * sin_angle + self.y * cos_angle
+        return self
+
+    def lerp_(self, b: Vector2D, t: float) -> Vector2D:
+        """Move the vector towards b by the fraction t in place."""
+        self.x += (b.x - self.x) * t
+        self.y += (b.y - self.y) * t
+        return self
+
     def __add__(self, other: Vector2D):
         return Vector2D(self.x + other.x, self.y + other.y)
 
@@ -71,3 +195,20 @@ class Vector2D:
     def __neg__(self):
         """Return the negation of the vector."""
         return Vector2D(-self.x, -self.y)
+
+    def __iadd__(self, other: Vector2D):
+        return self.iadd(other)
+
+    def __isub__(self, other: Vector2D):
+        return self.isub(other)
+
+    def __imul__(self, scalar: float):
+        return self.scale_(scalar)
+
+    def __itruediv__(self, scalar: float):
+        self.x /= scalar
+        self.y /= scalar
+        return self
+
+    def __repr__(self):
+        return f"Vector2D({self.x}, {self.y})"
@@ -0,0 +1,14 @@
+"""
+Common setup of the benchmark scripts, imported before any module of the game or the sender: puts both on the import
+path and keeps pyglet from opening a display connection, nothing is drawn.
+"""
+
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+# The game's DIPPID module comes first, the sender doesn't import its own copy
+sys.path.insert(0, os.path.join(ROOT, "dippid_sender"))
+sys.path.insert(0, os.path.join(ROOT, "2d_game"))
+
+import src.no_display  # noqa: E402, F401
@@ -0,0 +1,195 @@
+"""
+Measures CollisionManager.update with a growing number of moving, collidable objects.
+Compares the sweep and prune broad phase with testing every pair, which is what the manager did before,
+and the analytic swept box test with the previous corner sampling in speed and tunneling at high ball speeds.
+
+    python benchmarks/collision_benchmark.py
+"""
+
+from __future__ import annotations
+import random
+import time
+from typing import List
+
+import _setup  # noqa: F401
+
+from src.gameobject import GameObject
+from src.managers.collision_manager import CollisionManager
+from src.registry import Registry
+from src.util import Vector2D
+
+WIDTH = 1200
+HEIGHT = 900
+
+
+class Box:
+    """Axis aligned rectangle with the parts of the pyglet shape interface the game logic uses, no GL required."""
+
+    def __init__(self, x: float, y: float, width: float, height: float):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+    @property
+    def position(self):
+        return self.x, self.y
+
+    @position.setter
+    def position(self, value):
+        self.x, self.y = value
+
+    def __contains__(self, point) -> bool:
+        px, py = point
+        return self.x <= px <= self.x + self.width and self.y <= py <= self.y + self.height
+
+
+class Scene:
+    """Stands in for the GameManager, only holds the objects and the window size."""
+
+    def __init__(self):
+        self.width = WIDTH
+        self.height = HEIGHT
+        self.window = self
+        self.physics = None
+        self.registry = Registry()
+        self.gameobjects = self.registry.objects
+        self.dynamic_objects = self.registry.dynamic
+        self.static_objects = self.registry.static
+
+    @property
+    def static_version(self) -> int:
+        return self.registry.static_version
+
+    def register_obj(self, gameobject: GameObject):
+        self.registry.add(gameobject)
+
+    def unregister_obj(self, gameobject: GameObject):
+        self.registry.remove(gameobject)
+
+
+def build_scene(count: int, seed: int = 0) -> Scene:
+    rnd = random.Random(seed)
+    scene = Scene()
+    for _ in range(count):
+        size = rnd.uniform(3, 15)
+        obj = GameObject(Box(rnd.uniform(0, WIDTH), rnd.uniform(0, HEIGHT), size, size), gm=scene)
+        obj.set_velocity(Vector2D(rnd.uniform(-300, 300), rnd.uniform(-300, 300)))
+    return scene
+
+
+def step(scene: Scene, delta_time: float):
+    velocity = Vector2D(0, 0)
+    for obj in scene.gameobjects:
+        obj.get_velocity(velocity)
+        obj.prev_x, obj.prev_y = obj.x, obj.y
+        obj.x += velocity.x * delta_time
+        obj.y += velocity.y * delta_time
+        # Bounce off the window edges so objects stay in the scene
+        if not 0 <= obj.x <= WIDTH:
+            obj.set_velocity(velocity.set(-velocity.x, velocity.y))
+        if not 0 <= obj.y <= HEIGHT:
+            obj.set_velocity(velocity.set(velocity.x, -velocity.y))
+
+
+def all_pairs_update(manager: CollisionManager, objects: List[GameObject]) -> int:
+    """Narrow phase for every pair, as the manager did before the broad phase."""
+    hits = 0
+    for i in range(len(objects)):
+        for j in range(i + 1, len(objects)):
+            if manager.check_collision(objects[i], objects[j]):
+                hits += 1
+    return hits
+
+
+def sampled_check(obj1: GameObject, obj2: GameObject) -> bool:
+    """The previous narrow phase: samples 4 corners of obj1 at 5 points along its movement, ignores obj2's movement."""
+    accuracy = 4
+    w, h = obj1.shape.width, obj1.shape.height
+    for cx, cy in ((0, 0), (w, 0), (0, h), (w, h)):
+        for step_index in range(accuracy + 1):
+            f = step_index / accuracy
+            x = obj1.prev_x + cx + (obj1.x - obj1.prev_x) * f
+            y = obj1.prev_y + cy + (obj1.y - obj1.prev_y) * f
+            if obj2.x <= x <= obj2.x + obj2.shape.width and obj2.y <= y <= obj2.y + obj2.shape.height:
+                return True
+    return False
+
+
+def narrow_phase():
+    """Pairs per second and missed hits of a ball crossing a paddle at increasing speeds."""
+    scene = Scene()
+    manager = CollisionManager(None, scene)
+    ball = GameObject(Box(0, 0, 15, 15), gm=scene)
+    paddle = GameObject(Box(0, 0, 20, 120), gm=scene)
+    rnd = random.Random(1)
+
+    def place(speed: float):
+        # Ball starts left of the paddle and moves right for one frame at the given speed
+        paddle.prev_x = paddle.x = 600
+        paddle.prev_y = paddle.y = 390
+        ball.prev_x = 600 - 15 - rnd.uniform(0, speed / 60)
+        ball.prev_y = rnd.uniform(380, 500)
+        ball.x = ball.prev_x + speed / 60
+        ball.y = ball.prev_y
+
+    print(f"\n{'ball speed':>10} {'missed (analytic)':>18} {'missed (sampled)':>17}")
+    for speed in (250, 1000, 4000, 16000):
+        trials = 2000
+        missed_analytic = missed_sampled = 0
+        for _ in range(trials):
+            place(speed)
+            if ball.x + 15 <= paddle.x:
+                continue
+            missed_analytic += manager.check_collision(ball, paddle) is None
+            missed_sampled += not sampled_check(ball, paddle)
+        print(f"{speed:>10} {missed_analytic:>18} {missed_sampled:>17}")
+
+    place(1000)
+    pairs = 20000
+    start = time.perf_counter()
+    for _ in range(pairs):
+        manager.check_collision(ball, paddle)
+    analytic = pairs / (time.perf_counter() - start)
+    start = time.perf_counter()
+    for _ in range(pairs):
+        sampled_check(ball, paddle)
+    sampled = pairs / (time.perf_counter() - start)
+    print(f"\nNarrow phase: {analytic:,.0f} pairs/s analytic, {sampled:,.0f} pairs/s sampled")
+
+
+def measure(fn, frames: int) -> float:
+    start = time.perf_counter()
+    for _ in range(frames):
+        fn()
+    return (time.perf_counter() - start) / frames * 1000
+
+
+def main():
+    delta_time = 1 / 60
+    print(f"{'objects':>8} {'broad phase':>14} {'all pairs':>14} {'speedup':>8}")
+    for count in (10, 100, 500, 1000, 2000, 5000):
+        scene = build_scene(count)
+        manager = CollisionManager(None, scene)
+        frames = max(3, 2000 // count)
+
+        def broad():
+            step(scene, delta_time)
+            manager.update(delta_time)
+
+        broad_ms = measure(broad, frames)
+        # Testing every pair is quadratic, skip it where it would take minutes
+        if count <= 1000:
+            pairs_ms = measure(
+                lambda: (step(scene, delta_time), all_pairs_update(manager, scene.gameobjects)),
+                max(1, frames // 10),
+            )
+            print(f"{count:>8} {broad_ms:>11.2f} ms {pairs_ms:>11.2f} ms {pairs_ms / broad_ms:>7.1f}x")
+        else:
+            print(f"{count:>8} {broad_ms:>11.2f} ms {'-':>14} {'-':>8}")
+
+    narrow_phase()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Measures the per frame cost of confetti bursts: one GameObject per piece, as the game spawned them before,
+against the ParticleEmitter. The emitter time includes writing the vertex data, into a plain array here since
+nothing is drawn.
+
+    python benchmarks/particle_benchmark.py
+"""
+
+from __future__ import annotations
+import random
+import time
+
+import numpy as np
+
+import _setup  # noqa: F401
+
+from collision_benchmark import HEIGHT, WIDTH, Box, Scene
+from config import INITIAL_BALL_SPEED
+from src.gameobject import GameObject
+from src.particles import VERTICES_PER_PARTICLE, ParticleEmitter
+from src.util import Vector2D
+
+FRAMES = 240
+DELTA_TIME = 1 / 60
+
+
+def gameobject_burst(count: int) -> float:
+    """One GameObject per piece, integrated, bounds checked and removed on its own. Returns ms per frame."""
+    rnd = random.Random(0)
+    scene = Scene()
+    for _ in range(count):
+        piece = GameObject(Box(WIDTH / 2, HEIGHT / 2, 3, 3), collision=False, gravity=True, gm=scene)
+        direction = Vector2D(-1, 0).rotate_angle(rnd.uniform(-15, 15)).normalize()
+        piece.set_velocity(direction * INITIAL_BALL_SPEED * rnd.uniform(0.8, 1.2))
+
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        for piece in list(scene.gameobjects):
+            piece.update(DELTA_TIME)
+            if piece.x + 3 < 0 or piece.x > WIDTH or piece.y + 3 < 0 or piece.y > HEIGHT:
+                piece.destroy()
+            else:
+                piece.sync_shape()
+    return (time.perf_counter() - start) / FRAMES * 1000
+
+
+def emitter_burst(count: int) -> float:
+    """The same burst in a ParticleEmitter. Returns ms per frame."""
+    emitter = ParticleEmitter(WIDTH, HEIGHT, capacity=max(count, 16))
+    vertices = np.zeros((emitter.capacity, VERTICES_PER_PARTICLE, 2), dtype=np.float32)
+    emitter.emit(
+        count, WIDTH / 2, HEIGHT / 2, (-1, 0), INITIAL_BALL_SPEED, spread=15, speed_variation=0.2,
+        rng=np.random.default_rng(0),
+    )
+
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        emitter.begin_tick()
+        emitter.update(DELTA_TIME)
+        emitter.write_translations(vertices, 0.5)
+    return (time.perf_counter() - start) / FRAMES * 1000
+
+
+def main():
+    print(f"{'particles':>10} {'GameObjects':>14} {'emitter':>12}")
+    for count in (15, 100, 1000, 5000, 20000):
+        objects_ms = gameobject_burst(count)
+        emitter_ms = emitter_burst(count)
+        print(f"{count:>10} {objects_ms:>11.3f} ms {emitter_ms:>9.3f} ms")
+    print(f"\nAverage over {FRAMES} frames after the burst, frame budget at 60 Hz: {1000 / 60:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
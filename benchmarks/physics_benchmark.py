@@ -0,0 +1,73 @@
+"""
+Measures the integration and shape sync step for scenes of falling bodies (like confetti bursts) with the
+per-object Python backend and the vectorized numpy PhysicsStore.
+
+    python benchmarks/physics_benchmark.py
+"""
+
+from __future__ import annotations
+import random
+import time
+
+import _setup  # noqa: F401
+
+from collision_benchmark import Box, Scene
+from src.gameobject import GameObject
+from src.physics import PhysicsStore
+from src.util import Vector2D
+
+
+def build_scene(count: int, backend: str, seed: int = 0) -> Scene:
+    rnd = random.Random(seed)
+    scene = Scene()
+    scene.physics = PhysicsStore() if backend == "numpy" else None
+    for _ in range(count):
+        obj = GameObject(Box(rnd.uniform(0, 1200), rnd.uniform(0, 900), 3, 3), gravity=True, gm=scene)
+        obj.set_velocity(Vector2D(rnd.uniform(-300, 300), rnd.uniform(-300, 300)))
+    return scene
+
+
+def integrate(scene: Scene, delta_time: float):
+    """The integration part of GameManager.update."""
+    if scene.physics is not None:
+        scene.physics.integrate(delta_time)
+    else:
+        for go in scene.gameobjects:
+            go.integrate(delta_time)
+
+
+def sync(scene: Scene):
+    """GameManager.sync_shapes, shapes are plain boxes so this is the bookkeeping cost without GL updates."""
+    if scene.physics is not None:
+        scene.physics.sync_shapes()
+    else:
+        for go in scene.gameobjects:
+            go.sync_shape()
+
+
+def main():
+    delta_time = 1 / 60
+    print(f"{'bodies':>8} {'backend':>8} {'integrate':>12} {'sync':>12} {'total':>12}")
+    for count in (15, 100, 1000, 5000, 20000):
+        for backend in ("python", "numpy"):
+            scene = build_scene(count, backend)
+            frames = max(10, 20000 // count)
+            integrate_time = sync_time = 0.0
+            for _ in range(frames):
+                start = time.perf_counter()
+                integrate(scene, delta_time)
+                middle = time.perf_counter()
+                sync(scene)
+                integrate_time += middle - start
+                sync_time += time.perf_counter() - middle
+            integrate_ms = integrate_time / frames * 1000
+            sync_ms = sync_time / frames * 1000
+            print(
+                f"{count:>8} {backend:>8} {integrate_ms:>9.3f} ms {sync_ms:>9.3f} ms"
+                f" {integrate_ms + sync_ms:>9.3f} ms"
+            )
+    print(f"\nFrame budget at 60 Hz: {1000 / 60:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Measures GameObject lookups and removal with thousands of registered objects: the indexed registry against
+scanning the object list, which is what GameManager.find, find_by_tag, find_by_script and GameObject.get_script
+did before.
+
+    python benchmarks/registry_benchmark.py
+"""
+
+from __future__ import annotations
+import time
+from typing import List, Optional
+
+import _setup  # noqa: F401
+
+from collision_benchmark import Box, Scene
+from src.gameobject import GameObject
+from src.script import Script
+
+
+class Marker(Script):
+    def update(self, delta_time: float):
+        pass
+
+
+class Spinner(Marker):
+    pass
+
+
+class Wobble(Script):
+    def update(self, delta_time: float):
+        pass
+
+
+def build_scene(count: int) -> Scene:
+    scene = Scene()
+    for i in range(count):
+        obj = GameObject(Box(0, 0, 1, 1), name=f"Object {i}", tag=f"tag {i % 10}", gm=scene)
+        obj.register_script(Wobble())
+        if i % 100 == 0:
+            obj.register_script(Spinner())
+    # Looked up by name every tick in the game, registered last as the worst case for a scan
+    GameObject(Box(0, 0, 1, 1), name="Ball", tag="ball", gm=scene).register_script(Marker())
+    return scene
+
+
+def scan_find(scene: Scene, name: str) -> Optional[GameObject]:
+    for go in scene.gameobjects:
+        if go.name == name:
+            return go
+    return None
+
+
+def scan_find_by_tag(scene: Scene, tag: str) -> List[GameObject]:
+    return [go for go in scene.gameobjects if go.tag == tag]
+
+
+def scan_find_by_script(scene: Scene, script_type) -> List[GameObject]:
+    return [go for go in scene.gameobjects if any(isinstance(script, script_type) for script in go.scripts)]
+
+
+def scan_get_script(go: GameObject, script_type):
+    for script in go.scripts:
+        if isinstance(script, script_type):
+            return script
+    return None
+
+
+def per_call(fn, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    print(f"{'objects':>8} {'lookup':>16} {'scan':>12} {'indexed':>12}")
+    for count in (100, 1000, 5000, 20000):
+        scene = build_scene(count)
+        registry = scene.registry
+        probe = scene.gameobjects[count // 2]
+        calls = max(20, 200000 // count)
+        cases = [
+            ("find", lambda: scan_find(scene, "Ball"), lambda: registry.find("Ball")),
+            ("find_by_tag", lambda: scan_find_by_tag(scene, "ball"), lambda: registry.find_by_tag("ball")),
+            (
+                "find_by_script",
+                lambda: scan_find_by_script(scene, Marker),
+                lambda: registry.find_by_script(Marker),
+            ),
+            ("get_script", lambda: scan_get_script(probe, Spinner), lambda: probe.get_script(Spinner)),
+        ]
+        for name, scan, indexed in cases:
+            assert scan() == indexed()
+            print(f"{count:>8} {name:>16} {per_call(scan, calls):>9.2f} us {per_call(indexed, calls):>9.2f} us")
+
+        # Removing every object, starting in the middle of the registration order
+        plain = list(scene.gameobjects)
+        objects = plain[len(plain) // 2:] + plain[: len(plain) // 2]
+        start = time.perf_counter()
+        for go in objects:
+            plain.remove(go)
+        list_us = (time.perf_counter() - start) / len(objects) * 1e6
+        start = time.perf_counter()
+        for go in objects:
+            scene.unregister_obj(go)
+        remove_us = (time.perf_counter() - start) / len(objects) * 1e6
+        print(f"{count:>8} {'remove':>16} {list_us:>9.2f} us {remove_us:>9.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+"""
+Runs the hot paths of the sender and the game without a display or network and reports throughput in
+operations per second, so higher is always better: sensor decoding, expression evaluation, the monitor's buffering
+and decimation, Vector2D math, the collision narrow phase and headless game ticks with more and more objects.
+
+    python benchmarks/suite.py                                  # print a table
+    python benchmarks/suite.py --output results.json            # machine-readable results
+    python benchmarks/suite.py --save-baseline baseline.json    # store the results as the baseline
+    python benchmarks/suite.py --baseline baseline.json         # compare, exits with 1 on regressions
+
+Each benchmark runs several times and the fastest run is reported, as timeit does: slower runs were disturbed by
+other processes, the fastest one is the closest to what the code costs. The garbage collector is off while timing.
+A baseline only means something on the machine it was recorded on, record one before changing code.
+"""
+
+from __future__ import annotations
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, TextIO, Tuple
+
+import click
+import numpy as np
+
+from _setup import ROOT
+
+from collision_benchmark import Box, Scene
+from DIPPID import Sensor
+from DIPPID_sender import ButtonState, build_capability, evaluate_expr, load_config, prepare_mocks
+from GUI import DEFAULT_BINS, DEFAULT_HISTORY, RingBuffer, decimate_minmax, flatten
+from src.gameobject import GameObject
+from src.headless import HeadlessGame
+from src.managers.collision_manager import CollisionManager
+from src.util import Vector2D
+
+DEFAULT_THRESHOLD = 0.15
+GAME_OBJECT_COUNTS = (0, 100, 1000)
+
+
+class Benchmark(NamedTuple):
+    name: str
+    unit: str
+    # Returns a function that runs a batch of operations and the number of operations per call
+    setup: Callable[[], Tuple[Callable[[], object], int]]
+
+
+def sensor_decode():
+    sensor = Sensor()
+    sensor.register_callback("gravity", lambda value: None)
+    sensor.register_callback("button_1", lambda value: None)
+    # Values change every message, so every callback fires as with a moving device
+    messages = [
+        json.dumps(
+            {
+                "gravity": {"x": 0.1 * i, "y": -0.2 * i, "z": 9.81 - 0.01 * i},
+                "accelerometer": {"x": 0.3 * i, "y": 0.1, "z": -0.5 * i},
+                "button_1": i % 2,
+            }
+        )
+        for i in range(100)
+    ]
+
+    def run():
+        for message in messages:
+            sensor._update(message)
+
+    return run, len(messages)
+
+
+def sender_evaluate_expr():
+    expressions = ["sin(t / 5) * 9.81 * 2 - 9.81", "cos(t / 10) * 2 - 1", "random() * 10 - 5"]
+
+    def run():
+        for i in range(30):
+            evaluate_expr(expressions[i % 3], i * 0.05)
+
+    return run, 30
+
+
+def sender_build_capability():
+    config = load_config(os.path.join(ROOT, "dippid_sender", "mock_config.json"))
+    mocks = prepare_mocks(config["mocks"], config["interval"], os.path.join(ROOT, "dippid_sender"))
+    buttons: Dict[str, ButtonState] = {}
+    state = {"t": 0.0}
+
+    def run():
+        # One tick builds every capability of the mock config
+        for _ in range(10):
+            state["t"] += 0.05
+            for capability, value in mocks.items():
+                build_capability(capability, value, state["t"], 3, buttons)
+
+    return run, 10
+
+
+def monitor_frame():
+    # The monitor's work per frame without Qt: copy every channel out of its ring buffer and decimate it
+    message = {
+        "gravity": {"x": 0.0, "y": 0.0, "z": 0.0},
+        "accelerometer": {"x": 0.0, "y": 0.0, "z": 0.0},
+        "button_1": 0,
+    }
+    channels = {name: RingBuffer(DEFAULT_HISTORY) for name, _ in flatten(message)}
+    rnd = random.Random(0)
+    # Wrapped around once, so copy_to has to join both ends of the buffer
+    for i in range(DEFAULT_HISTORY + DEFAULT_HISTORY // 3):
+        for buffer in channels.values():
+            buffer.append(i * 0.01, rnd.uniform(-10, 10))
+    times, values = np.zeros(DEFAULT_HISTORY), np.zeros(DEFAULT_HISTORY)
+    out_times, out_values = np.zeros(2 * DEFAULT_BINS), np.zeros(2 * DEFAULT_BINS)
+
+    def run():
+        for buffer in channels.values():
+            n = buffer.copy_to(times, values)
+            decimate_minmax(times, values, n, DEFAULT_BINS, out_times, out_values)
+
+    return run, len(channels)
+
+
+def vector_ops():
+    a = Vector2D(3.0, 4.0)
+    b = Vector2D(-1.5, 2.5)
+    normal = Vector2D(0, 1)
+
+    def run():
+        # Allocating operations as used by the game logic, 6 per loop
+        for _ in range(50):
+            (a + b).normalize().reflect(normal) * 1.5 - b
+            a.length()
+
+    return run, 300
+
+
+def vector_inplace_ops():
+    a = Vector2D(3.0, 4.0)
+    b = Vector2D(-1.5, 2.5)
+    normal = Vector2D(0, 1)
+    out = Vector2D(0, 0)
+
+    def run():
+        for _ in range(50):
+            out.copy_from(a).iadd(b).normalize_().reflect_(normal).scale_(1.5).isub(b)
+
+    return run, 300
+
+
+def collision_pairs():
+    scene = Scene()
+    manager = CollisionManager(None, scene)
+    rnd = random.Random(1)
+    pairs = []
+    # Half of the pairs collide during the movement
+    for i in range(100):
+        ball = GameObject(Box(0, 0, 15, 15), gm=scene)
+        paddle = GameObject(Box(600, 390, 20, 120), gm=scene)
+        ball.prev_x = 600 - 15 - rnd.uniform(0, 30)
+        ball.prev_y = rnd.uniform(380, 500)
+        ball.x = ball.prev_x + (40 if i % 2 else 5)
+        ball.y = ball.prev_y
+        pairs.append((ball, paddle))
+
+    def run():
+        for ball, paddle in pairs:
+            manager.check_collision(ball, paddle, 1 / 60)
+
+    return run, len(pairs)
+
+
+def game_ticks(objects: int):
+    def setup():
+        game = HeadlessGame(tick_rate=60, seed=0)
+        gm = game.game_manager
+        rnd = random.Random(0)
+        for _ in range(objects):
+            shape = gm.create_shape(rnd.uniform(100, 1100), rnd.uniform(100, 800), 6, 6, (255, 255, 255))
+            obj = GameObject.create(shape, collision=True, gm=gm)
+            obj.set_velocity(Vector2D(rnd.uniform(-40, 40), rnd.uniform(-40, 40)))
+        gm.reset()
+
+        def run():
+            for _ in range(10):
+                game.step()
+
+        return run, 10
+
+    return setup
+
+
+BENCHMARKS: List[Benchmark] = [
+    Benchmark("sensor_decode", "messages/s", sensor_decode),
+    Benchmark("sender_evaluate_expr", "expressions/s", sender_evaluate_expr),
+    Benchmark("sender_build_capability", "ticks/s", sender_build_capability),
+    Benchmark("monitor_frame", "channels/s", monitor_frame),
+    Benchmark("vector_ops", "ops/s", vector_ops),
+    Benchmark("vector_inplace_ops", "ops/s", vector_inplace_ops),
+    Benchmark("collision_check_collision", "pairs/s", collision_pairs),
+] + [Benchmark(f"game_ticks_{count}_objects", "ticks/s", game_ticks(count)) for count in GAME_OBJECT_COUNTS]
+
+
+def measure(benchmark: Benchmark, duration: float, repeat: int) -> List[float]:
+    """Operations per second of `repeat` runs of about `duration` seconds each, after one warm up call."""
+    run, per_call = benchmark.setup()
+    run()
+    rates = []
+    gc_enabled = gc.isenabled()
+    try:
+        for _ in range(repeat):
+            gc.collect()
+            gc.disable()
+            calls = 0
+            start = time.perf_counter()
+            while True:
+                run()
+                calls += 1
+                elapsed = time.perf_counter() - start
+                if elapsed >= duration:
+                    break
+            gc.enable()
+            rates.append(calls * per_call / elapsed)
+    finally:
+        if gc_enabled:
+            gc.enable()
+        else:
+            gc.disable()
+    return rates
+
+
+def compare(results: Dict, baseline: Dict, threshold: float, log: TextIO = sys.stdout) -> List[str]:
+    """Prints the change against the baseline and returns the names of benchmarks that got slower than allowed."""
+    regressions = []
+    print(f"\n{'benchmark':<30} {'baseline':>14} {'current':>14} {'change':>8}", file=log)
+    for name, result in results["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<30} {'-':>14} {result['value']:>14,.0f} {'new':>8}", file=log)
+            continue
+        change = result["value"] / base["value"] - 1
+        flag = ""
+        if change < -threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<30} {base['value']:>14,.0f} {result['value']:>14,.0f} {change:>+8.1%}{flag}", file=log)
+    return regressions
+
+
+@click.command()
+@click.option("--duration", "-d", default=0.5, show_default=True, help="Seconds per run")
+@click.option("--repeat", "-r", default=5, show_default=True, help="Runs per benchmark, the fastest is reported")
+@click.option("--filter", "-k", "name_filter", default=None, help="Only run benchmarks whose name contains this")
+@click.option("--output", "-o", default=None, help="Write the results as JSON to this file, - for stdout")
+@click.option("--baseline", "-b", default=None, help="Compare against the results in this JSON file")
+@click.option("--save-baseline", default=None, help="Write the results as the new baseline to this file")
+@click.option("--threshold", default=DEFAULT_THRESHOLD, show_default=True, help="Slowdown that counts as a regression")
+def main(
+    duration: float,
+    repeat: int,
+    name_filter: Optional[str],
+    output: Optional[str],
+    baseline: Optional[str],
+    save_baseline: Optional[str],
+    threshold: float,
+):
+    """Runs the benchmark suite, optionally comparing against a baseline."""
+    benchmarks = [b for b in BENCHMARKS if name_filter is None or name_filter in b.name]
+    # Keep the table off stdout when the JSON goes there
+    log = sys.stderr if output == "-" else sys.stdout
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "duration": duration,
+            "repeat": repeat,
+        },
+        "results": {},
+    }
+    print(f"{'benchmark':<30} {'best':>14} {'median':>14} {'worst':>14}  unit", file=log)
+    for benchmark in benchmarks:
+        rates = measure(benchmark, duration, repeat)
+        value = max(rates)
+        results["results"][benchmark.name] = {"value": value, "unit": benchmark.unit, "runs": rates}
+        median = statistics.median(rates)
+        print(f"{benchmark.name:<30} {value:>14,.0f} {median:>14,.0f} {min(rates):>14,.0f}  {benchmark.unit}", file=log)
+
+    if output == "-":
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    elif output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+    if save_baseline:
+        with open(save_baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline written to {save_baseline}", file=log)
+
+    if baseline:
+        with open(baseline) as f:
+            stored = json.load(f)
+        regressions = compare(results, stored, threshold, log)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {threshold:.0%}: {', '.join(regressions)}", file=log)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
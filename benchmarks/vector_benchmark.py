@@ -0,0 +1,83 @@
+"""
+Compares the allocating Vector2D operations with their in place variants and counts the vectors allocated per
+frame in a headless NPC against NPC match, the hot path of a regular match.
+
+    python benchmarks/vector_benchmark.py
+"""
+
+from __future__ import annotations
+import timeit
+import tracemalloc
+
+import _setup  # noqa: F401
+
+from src.headless import HeadlessGame
+from src.util import Vector2D
+
+
+class _DictVector(Vector2D):
+    """Same vector with a per instance __dict__, as before __slots__ were added."""
+
+
+def micro():
+    a = Vector2D(3.0, 4.0)
+    b = Vector2D(-1.5, 2.5)
+    normal = Vector2D(0, 1)
+    out = Vector2D(0, 0)
+    cases = [
+        ("add", lambda: a + b, lambda: out.copy_from(a).iadd(b)),
+        ("scale", lambda: a * 1.5, lambda: out.copy_from(a).scale_(1.5)),
+        ("normalize", lambda: a.normalize(), lambda: out.copy_from(a).normalize_()),
+        ("reflect", lambda: a.reflect(normal), lambda: out.copy_from(a).reflect_(normal)),
+        ("rotate", lambda: a.rotate_angle(15), lambda: out.copy_from(a).rotate_angle_(15)),
+        ("lerp", lambda: Vector2D.lerp(a, b, 0.25), lambda: out.copy_from(a).lerp_(b, 0.25)),
+    ]
+    number = 200000
+    print(f"{'operation':>10} {'allocating':>14} {'in place':>14}")
+    for name, allocating, in_place in cases:
+        allocating_ns = min(timeit.repeat(allocating, number=number, repeat=3)) / number * 1e9
+        in_place_ns = min(timeit.repeat(in_place, number=number, repeat=3)) / number * 1e9
+        print(f"{name:>10} {allocating_ns:>11.1f} ns {in_place_ns:>11.1f} ns")
+
+    count = 100000
+    for cls in (_DictVector, Vector2D):
+        tracemalloc.start()
+        vectors = [cls(1.0, 2.0) for _ in range(count)]
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del vectors
+        label = "__dict__" if cls is _DictVector else "__slots__"
+        print(f"{count} vectors with {label}: {size / count:.0f} bytes each")
+
+
+def frame_allocations(frames: int = 3000):
+    """Vectors allocated per frame by collision handling, the scripts and the NPCs."""
+    game = HeadlessGame(tick_rate=60, seed=0)
+    game.game_manager.reset()
+
+    allocated = 0
+    original_init = Vector2D.__init__
+
+    def counting_init(self, x, y):
+        nonlocal allocated
+        allocated += 1
+        original_init(self, x, y)
+
+    Vector2D.__init__ = counting_init
+    try:
+        for _ in range(frames):
+            game.step()
+            game.game_manager.sync_shapes()
+    finally:
+        Vector2D.__init__ = original_init
+        game.close()
+    print(f"\nVector2D allocations: {allocated / frames:.2f} per frame over {frames} frames")
+
+
+def main():
+    micro()
+    frame_allocations()
+
+
+if __name__ == "__main__":
+    main()
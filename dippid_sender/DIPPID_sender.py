@@ -5,15 +5,25 @@ import click
 import socket
 import json
 import time
+import gc
+import os
+import sys
+import tracemalloc
 from simpleeval import simple_eval
-from typing import Optional, TypedDict
+from typing import Callable, List, NamedTuple, Optional, TypedDict
 from typing import Dict
 import random
+from transport import Transport
+from trace_source import TraceConfig, TraceSource
+from telemetry import Telemetry
+from config_watcher import ConfigWatcher, Reload
 
 
 DEFAULT_PORT = 5700
 DEFAULT_IP = "127.0.0.1"
 DEFAULT_INTERVAL = 50
+DEFAULT_BATCH = 1
+ALLOCATION_TICKS = 1000  # Ticks the benchmark traces allocations for
 
 
 class ButtonState:
@@ -33,14 +43,21 @@ class ButtonState:
         return self.values[0] < self.values[1] > self.values[2]
 
 
+class Destination(TypedDict):
+    ip: str
+    port: int
+
+
 class Config(TypedDict):
     interval: int
     ip: str
     port: int
+    destinations: List[Destination]
+    batch: int
     mocks: MockConfig
 
 
-MockConfig = Dict[str, Dict[str, str] | str]
+MockConfig = Dict[str, Dict[str, str] | str | TraceConfig | TraceSource]
 MockData = Dict[str, Dict[str, float] | float]
 
 
@@ -64,6 +81,59 @@ def evaluate_expr(math_expr: str, t: float) -> float:
         return 0.0
 
 
+def load_config(config: str) -> Config:
+    """Loads the config from a JSON string or a path to a JSON file."""
+    try:
+        return json.loads(config)
+    except json.JSONDecodeError:
+        try:
+            with open(config) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"File not found: {config}")
+
+
+def prepare_mocks(mocks: MockConfig, interval: int, base_dir: str) -> MockConfig:
+    """Replaces trace entries (objects with a `trace` key) with memory-mapped trace sources, expression
+    entries are kept as they are."""
+    return {
+        capability: (
+            TraceSource.from_config(value, interval, base_dir)
+            if isinstance(value, dict) and "trace" in value
+            else value
+        )
+        for capability, value in mocks.items()
+    }
+
+
+def build_data(
+    mocks: MockConfig,
+    t: float,
+    truncate: Optional[int],
+    buttons: Dict[str, ButtonState],
+) -> MockData:
+    """Builds the full data object for a single tick from the mock config."""
+    data: MockData = {}
+    for capability, value in mocks.items():
+        sub = build_capability(capability, value, t, truncate, buttons)
+        data[capability] = sub.get(None) if None in sub else sub
+    return data
+
+
+def apply_reload(
+    reload: Reload, prepared: MockConfig, buttons: Dict[str, ButtonState]
+) -> MockConfig:
+    """Swaps the changed capabilities of a config reload in. Unchanged capabilities keep their prepared mocks and
+    button states, buttons of changed or removed capabilities start over."""
+    for capability in list(reload.changed) + list(reload.removed):
+        for name in [n for n in buttons if n == capability or n.startswith(capability + ".")]:
+            del buttons[name]
+    return {
+        capability: reload.changed[capability] if capability in reload.changed else prepared[capability]
+        for capability in reload.order
+    }
+
+
 @click.command()
 @click.option(
     "--config", "-c", required=True, help="JSON string or path/to/file.json", type=str
@@ -78,64 +148,289 @@ def evaluate_expr(math_expr: str, t: float) -> float:
     help="Truncate values to this many decimal places",
     type=int,
 )
-def run(config: str, verbose: bool, truncate: Optional[int]):
+@click.option(
+    "--benchmark",
+    "-b",
+    required=False,
+    help="Run the tick pipeline as fast as possible for this many seconds against a local sink and print stats",
+    type=float,
+)
+@click.option(
+    "--summary",
+    "-s",
+    required=False,
+    help="Print rate, jitter and value range statistics every this many seconds instead of every packet",
+    type=float,
+)
+@click.option(
+    "--watch",
+    "-w",
+    required=False,
+    is_flag=True,
+    help="Reload changed capabilities and the interval when the config file changes, without restarting the stream",
+)
+def run(
+    config: str,
+    verbose: bool,
+    truncate: Optional[int],
+    benchmark: Optional[float],
+    summary: Optional[float],
+    watch: bool,
+):
     # Attempt to load the config from a JSON string or file, exit if it fails
-    cfg: Config = {}
-    try:
-        cfg = json.loads(config)
-    except json.JSONDecodeError:
-        try:
-            with open(config) as f:
-                cfg = json.load(f)
-        except FileNotFoundError:
-            raise FileNotFoundError(f"File not found: {config}")
+    cfg: Config = load_config(config)
 
     # Retrieve config values with defaults
     ip = cfg.get("ip", DEFAULT_IP)
     port = cfg.get("port", DEFAULT_PORT)
     interval = cfg.get("interval", DEFAULT_INTERVAL)
     mocks = cfg.get("mocks", {})
+    # Trace paths are relative to the config file, or the working directory for JSON strings
+    base_dir = os.path.dirname(os.path.abspath(config)) if os.path.isfile(config) else os.getcwd()
+    prepared = prepare_mocks(mocks, interval, base_dir)
+    # Additional destinations receive the same packets, ticks can be batched into fewer syscalls
+    destinations = [(ip, port)] + [
+        (d.get("ip", DEFAULT_IP), d["port"]) for d in cfg.get("destinations", [])
+    ]
+    batch = cfg.get("batch", DEFAULT_BATCH)
 
-    if verbose:
+    if benchmark is not None:
+        run_benchmark(prepared, truncate, benchmark, len(destinations), batch)
+        return
+
+    if verbose or summary:
+        targets = ", ".join(f"{d_ip}:{d_port}" for d_ip, d_port in destinations)
         print(
-            f"Sending to {ip}:{port} every {interval}ms\nConfig:\n{json.dumps(mocks, indent=2)}"
+            f"Sending to {targets} every {interval}ms\nConfig:\n{json.dumps(mocks, indent=2)}"
         )
 
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    transport = Transport(destinations, batch)
+    # Output is written by a background thread so printing never delays a tick
+    telemetry: Optional[Telemetry] = None
+    if verbose or summary:
+        telemetry = Telemetry(summary=summary, stats=transport.stats)
+        telemetry.start()
+    watcher: Optional[ConfigWatcher] = None
+    if watch:
+        if not os.path.isfile(config):
+            raise click.BadParameter("--watch requires a config file", param_hint="--config")
+        watcher = ConfigWatcher(
+            config,
+            cfg,
+            interval,
+            lambda m, i: prepare_mocks(m, i, base_dir),
+            # Built once with throwaway button states, the same way the send loop will
+            validate=lambda capability, value: build_capability(capability, value, 0.0, truncate, {}),
+        )
+        watcher.start()
+
+    try:
+        stream(transport, prepared, interval, truncate, watcher=watcher, telemetry=telemetry)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if watcher is not None:
+            watcher.stop()
+        transport.close()
+        if telemetry is not None:
+            telemetry.close()
+            print(f"\nSender stats: {transport.stats()}, {telemetry.dropped} output lines dropped")
+
+
+def stream(
+    transport: Transport,
+    prepared: MockConfig,
+    interval: int,
+    truncate: Optional[int] = None,
+    should_stop: Callable[[], bool] = lambda: False,
+    watcher: Optional[ConfigWatcher] = None,
+    telemetry: Optional[Telemetry] = None,
+):
+    """Sends one packet built from the mocks every `interval` ms until `should_stop` returns True."""
     start = time.time()
     # Store button states to be able to detect button presses
     buttons: Dict[str, ButtonState] = {}
+    # Ticks are scheduled against fixed deadlines so time spent in a tick doesn't delay the next one
+    next_tick = time.perf_counter()
+
+    while not should_stop():
+        # Swap in config changes between ticks, parsing already happened on the watcher thread
+        if watcher is not None:
+            reload = watcher.take()
+            if reload is not None:
+                prepared = apply_reload(reload, prepared, buttons)
+                interval = reload.interval
 
-    while True:
         # Store the time since start for capability evaluations
         t = time.time() - start
-        data: MockData = {}
 
         # Build each capability from the config and time
-        for capability, value in mocks.items():
-            sub = build_capability(capability, value, t, truncate, buttons)
-            data[capability] = sub.get(None) if None in sub else sub
+        data = build_data(prepared, t, truncate, buttons)
 
         # Send the data
         msg = json.dumps(data)
-        if verbose:
-            print(
-                f"\nMockData at {f'{t // 3600:02.0f}:{t % 3600 // 60:02.0f}:{t % 60:06.3f}'}\n",
-                json.dumps(data, indent=4),
-            )
-        sock.sendto(msg.encode(), (ip, port))
-        time.sleep(interval / 1000)
+        if telemetry is not None:
+            telemetry.submit(t, data)
+        transport.send(msg.encode())
+
+        next_tick += interval / 1000
+        delay = next_tick - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            # Running behind (e.g. the process was suspended), don't try to catch up with a burst
+            next_tick = time.perf_counter()
+
+
+def run_benchmark(
+    mocks: MockConfig,
+    truncate: Optional[int],
+    duration: float,
+    num_destinations: int = 1,
+    batch: int = DEFAULT_BATCH,
+):
+    """Runs the tick pipeline (build, serialize, send) without sleeping for the given duration and prints
+    throughput, a per-stage time breakdown and allocation counts. Packets are sent to local sink sockets
+    that are never read, so the numbers don't depend on a receiver being present. Allocations are traced with
+    tracemalloc in a separate pass of at most `ALLOCATION_TICKS` ticks, tracing slows the pipeline down."""
+    sinks = []
+    for _ in range(num_destinations):
+        sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sink.bind(("127.0.0.1", 0))
+        sinks.append(sink)
+    transport = Transport([sink.getsockname() for sink in sinks], batch)
+
+    buttons: Dict[str, ButtonState] = {}
+    stages = {"build": 0.0, "serialize": 0.0, "send": 0.0}
+    ticks = 0
+    sent_bytes = 0
+
+    start = time.perf_counter()
+    end = start + duration
+    t0 = start
+    while t0 < end:
+        data = build_data(mocks, t0 - start, truncate, buttons)
+        t1 = time.perf_counter()
+        msg = json.dumps(data).encode()
+        t2 = time.perf_counter()
+        transport.send(msg)
+        t3 = time.perf_counter()
+
+        stages["build"] += t1 - t0
+        stages["serialize"] += t2 - t1
+        stages["send"] += t3 - t2
+        sent_bytes += len(msg)
+        ticks += 1
+        t0 = t3
+
+    elapsed = time.perf_counter() - start
+    # Before the tracing pass sends more packets through the same transport
+    transport_stats = transport.stats()
+    allocations = trace_allocations(mocks, truncate, buttons, transport, min(ticks, ALLOCATION_TICKS))
+    transport.close()
+    for sink in sinks:
+        sink.close()
+
+    if ticks == 0:
+        print("No ticks completed, increase the benchmark duration")
+        return
+
+    print(f"Benchmark: {ticks} ticks in {elapsed:.3f}s ({len(mocks)} capabilities)")
+    print(f"  Throughput: {ticks / elapsed:,.0f} ticks/s, {sent_bytes / elapsed / 1024:,.1f} KiB/s")
+    print(f"  Avg packet: {sent_bytes / ticks:.1f} bytes")
+    print(f"  Transport: {transport_stats}")
+    print("  Stages:")
+    for stage, total in stages.items():
+        print(
+            f"    {stage:<10} {total / ticks * 1e6:8.2f} us/tick  {total / elapsed * 100:5.1f}%"
+        )
+    if allocations is not None:
+        print(f"  Allocations per tick (tracemalloc, {allocations.ticks} ticks):")
+        print(
+            f"    peak:     {allocations.peak:,.0f} bytes above the live heap on average,"
+            f" {allocations.max_peak:,} at most"
+        )
+        print(f"    cyclic:   {allocations.cyclic:,.1f} bytes left for the garbage collector")
+        print(f"    retained: {allocations.retained:+,.1f} bytes, {allocations.blocks:+,.2f} blocks after collecting")
+        for line in allocations.growth:
+            print(f"    {line}")
+
+
+class AllocationStats(NamedTuple):
+    ticks: int
+    peak: float  # Bytes in use during a tick on top of what was live before it, on average
+    max_peak: int
+    cyclic: float  # Bytes only freed by the garbage collector, on average
+    retained: float  # Bytes still allocated after a tick and a collection, on average
+    blocks: float  # Change of sys.getallocatedblocks() per tick, on average
+    growth: List[str]  # Source lines that retained the most memory over all ticks
+
+
+def trace_allocations(
+    mocks: MockConfig,
+    truncate: Optional[int],
+    buttons: Dict[str, ButtonState],
+    transport: Transport,
+    ticks: int,
+) -> Optional[AllocationStats]:
+    """Runs `ticks` ticks of the pipeline under tracemalloc and measures what every single tick allocates."""
+    if ticks == 0:
+        return None
+    # Start from a clean heap so the counts only reflect the pipeline, collections would hide cyclic garbage
+    gc.collect()
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        # A running total instead of a list, the measurement mustn't retain anything per tick itself
+        total_peak = max_peak = 0
+        blocks = sys.getallocatedblocks()
+        start, _ = tracemalloc.get_traced_memory()
+        current = start
+        for tick in range(ticks):
+            tracemalloc.reset_peak()
+            transport.send(json.dumps(build_data(mocks, tick * 0.001, truncate, buttons)).encode())
+            after, peak = tracemalloc.get_traced_memory()
+            total_peak += peak - current
+            max_peak = max(max_peak, peak - current)
+            current = after
+        gc.collect()
+        collected, _ = tracemalloc.get_traced_memory()
+        blocks = sys.getallocatedblocks() - blocks
+        own = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        growth = tracemalloc.take_snapshot().filter_traces(own).compare_to(before.filter_traces(own), "lineno")
+    finally:
+        tracemalloc.stop()
+        if gc_enabled:
+            gc.enable()
+    return AllocationStats(
+        ticks,
+        total_peak / ticks,
+        max_peak,
+        (current - collected) / ticks,
+        (collected - start) / ticks,
+        blocks / ticks,
+        [str(stat) for stat in growth[:3] if stat.size_diff > 0],
+    )
 
 
 def build_capability(
     capability: str,
-    value: str | Dict[str, str],
+    value: str | Dict[str, str] | TraceSource,
     t: float,
     truncate: Optional[int],
     buttons: Dict[str, ButtonState],
 ) -> Dict[str, float]:
     """Builds a capability from the given value. If the value is a string, it is treated as a single value capability with no subkeys."""
 
+    # Traces already hold their values, only truncation applies
+    if isinstance(value, TraceSource):
+        sub = value.sample(t)
+        if truncate is not None and truncate >= 0:
+            sub = {key: round(result, truncate) for key, result in sub.items()}
+        return sub
+
     # Wrap the value in a dict with None key if it's a string
     if isinstance(value, str):
         value = {None: value}
@@ -0,0 +1,246 @@
+from __future__ import annotations
+import json
+import os
+import socket
+import time
+import click
+import numpy as np
+from threading import Lock, Thread
+from typing import Dict, List, Optional, Tuple
+
+
+DEFAULT_PORT = 5700
+DEFAULT_IP = "0.0.0.0"
+DEFAULT_HISTORY = 10_000  # Samples kept per channel
+DEFAULT_BINS = 500  # Min/max pairs drawn per channel
+DEFAULT_FPS = 30
+
+
+class RingBuffer:
+    """Fixed-size buffer of timestamped samples. Memory is allocated once, old samples are overwritten."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.times = np.zeros(capacity)
+        self.values = np.zeros(capacity)
+        self.index = 0
+        self.count = 0
+
+    def append(self, t: float, value: float):
+        self.times[self.index] = t
+        self.values[self.index] = value
+        self.index = (self.index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def copy_to(self, out_times: np.ndarray, out_values: np.ndarray) -> int:
+        """Copies the samples in chronological order into the given arrays and returns the sample count."""
+        n = self.count
+        start = (self.index - n) % self.capacity
+        first = min(n, self.capacity - start)
+        out_times[:first] = self.times[start : start + first]
+        out_values[:first] = self.values[start : start + first]
+        out_times[first:n] = self.times[: n - first]
+        out_values[first:n] = self.values[: n - first]
+        return n
+
+
+def decimate_minmax(
+    times: np.ndarray,
+    values: np.ndarray,
+    n: int,
+    bins: int,
+    out_times: np.ndarray,
+    out_values: np.ndarray,
+) -> int:
+    """Reduces the first `n` samples to a min and max per bin so peaks stay visible however many samples are drawn.
+    Writes into the preallocated output arrays (at least `2 * bins` long) and returns the number of points."""
+    if n <= 2 * bins:
+        out_times[:n] = times[:n]
+        out_values[:n] = values[:n]
+        return n
+
+    # Bin the newest samples, the few oldest ones that don't fill a bin are skipped
+    per_bin = n // bins
+    used = per_bin * bins
+    t = times[n - used : n].reshape(bins, per_bin)
+    v = values[n - used : n].reshape(bins, per_bin)
+    out_times[0 : 2 * bins : 2] = t[:, 0]
+    out_times[1 : 2 * bins : 2] = t[:, -1]
+    np.min(v, axis=1, out=out_values[0 : 2 * bins : 2])
+    np.max(v, axis=1, out=out_values[1 : 2 * bins : 2])
+    return 2 * bins
+
+
+def flatten(data: dict) -> List[Tuple[str, float]]:
+    """Returns all numeric values of a DIPPID message as (channel, value) pairs, e.g. ("accelerometer.x", 0.5)."""
+    result = []
+    for capability, value in data.items():
+        if isinstance(value, dict):
+            for key, sub in value.items():
+                if isinstance(sub, (int, float)) and not isinstance(sub, bool):
+                    result.append((f"{capability}.{key}", sub))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            result.append((capability, value))
+    return result
+
+
+class StreamRecorder:
+    """Listens on a UDP port and records every numeric channel of incoming DIPPID messages into ring buffers."""
+
+    def __init__(self, port: int, ip: str = DEFAULT_IP, history: int = DEFAULT_HISTORY):
+        self.history = history
+        self.channels: Dict[str, RingBuffer] = {}
+        self.lock = Lock()
+        self.packets = 0
+        self.start = time.monotonic()
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.settimeout(0.1)
+        self._sock.bind((ip, port))
+        self._receiving = True
+        self._thread = Thread(target=self._receive, daemon=True)
+        self._thread.start()
+
+    def _receive(self):
+        while self._receiving:
+            try:
+                data, _ = self._sock.recvfrom(65535)
+            except (TimeoutError, socket.timeout):
+                continue
+            except OSError:
+                return
+            try:
+                message = json.loads(data)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            if isinstance(message, dict):
+                self.record(time.monotonic() - self.start, message)
+
+    def record(self, t: float, message: dict):
+        with self.lock:
+            self.packets += 1
+            for name, value in flatten(message):
+                buffer = self.channels.get(name)
+                if buffer is None:
+                    buffer = self.channels[name] = RingBuffer(self.history)
+                buffer.append(t, value)
+
+    def stop(self):
+        self._receiving = False
+        self._thread.join()
+        self._sock.close()
+
+
+class Monitor:
+    """Plots every channel of a StreamRecorder, one plot per capability with a curve per sub key."""
+
+    def __init__(
+        self,
+        recorder: StreamRecorder,
+        bins: int = DEFAULT_BINS,
+        fps: int = DEFAULT_FPS,
+        window_title: str = "DIPPID Monitor",
+    ):
+        # Qt is only imported here so the buffers above can be used without a display
+        import pyqtgraph as pg
+
+        self.pg = pg
+        self.app = pg.mkQApp(window_title)
+        self.recorder = recorder
+        self.bins = bins
+        self.widget = pg.GraphicsLayoutWidget(title=window_title)
+        self.widget.resize(1000, 700)
+        self.widget.show()
+        self.plots = {}
+        self.curves = {}
+        # Scratch arrays are shared by all channels so drawing doesn't allocate per frame
+        self._times = np.zeros(recorder.history)
+        self._values = np.zeros(recorder.history)
+        self._draw_buffers: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self.frames = 0
+
+        self.timer = pg.QtCore.QTimer()
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(int(1000 / fps))
+
+    def _add_curve(self, name: str):
+        capability = name.split(".", 1)[0]
+        plot = self.plots.get(capability)
+        if plot is None:
+            plot = self.widget.addPlot(row=len(self.plots), col=0, title=capability)
+            plot.addLegend()
+            plot.showGrid(x=True, y=True, alpha=0.2)
+            self.plots[capability] = plot
+        pen = self.pg.intColor(len(self.curves), hues=9)
+        self.curves[name] = plot.plot(name=name, pen=pen, skipFiniteCheck=True)
+        self._draw_buffers[name] = (np.zeros(2 * self.bins), np.zeros(2 * self.bins))
+
+    def refresh(self):
+        with self.recorder.lock:
+            names = list(self.recorder.channels)
+        for name in names:
+            if name not in self.curves:
+                self._add_curve(name)
+
+            with self.recorder.lock:
+                n = self.recorder.channels[name].copy_to(self._times, self._values)
+            out_times, out_values = self._draw_buffers[name]
+            count = decimate_minmax(
+                self._times, self._values, n, self.bins, out_times, out_values
+            )
+            self.curves[name].setData(out_times[:count], out_values[:count])
+        self.frames += 1
+
+    def run(self, duration: Optional[float] = None) -> int:
+        if duration is not None:
+            self.pg.QtCore.QTimer.singleShot(int(duration * 1000), self.app.quit)
+        return self.pg.exec()
+
+
+@click.command()
+@click.option("--port", "-p", default=DEFAULT_PORT, help="Port to listen on", type=int)
+@click.option(
+    "--history",
+    default=DEFAULT_HISTORY,
+    help="Number of samples kept per channel",
+    type=int,
+)
+@click.option(
+    "--bins", default=DEFAULT_BINS, help="Number of min/max pairs drawn per channel", type=int
+)
+@click.option("--fps", default=DEFAULT_FPS, help="Plot refresh rate", type=int)
+@click.option(
+    "--duration",
+    "-d",
+    required=False,
+    help="Close the monitor after this many seconds",
+    type=float,
+)
+@click.option(
+    "--offscreen",
+    is_flag=True,
+    help="Use the offscreen Qt platform, e.g. to run without a display",
+)
+def run(
+    port: int,
+    history: int,
+    bins: int,
+    fps: int,
+    duration: Optional[float],
+    offscreen: bool,
+):
+    if offscreen:
+        os.environ["QT_QPA_PLATFORM"] = "offscreen"
+
+    recorder = StreamRecorder(port, history=history)
+    monitor = Monitor(recorder, bins=bins, fps=fps, window_title=f"DIPPID Monitor :{port}")
+    try:
+        monitor.run(duration)
+    finally:
+        recorder.stop()
+    print(
+        f"Received {recorder.packets} packets on {len(recorder.channels)} channels, drew {monitor.frames} frames"
+    )
+
+
+if __name__ == "__main__":
+    run()
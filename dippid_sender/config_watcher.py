@@ -0,0 +1,134 @@
+from __future__ import annotations
+import json
+import os
+import time
+from threading import Lock, Thread
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set
+
+
+FIXED_KEYS = ("ip", "port", "destinations", "batch")
+
+
+class Reload(NamedTuple):
+    """Changes between two versions of the config, ready to be swapped in by the send loop."""
+
+    order: List[str]  # All capabilities of the new config in order
+    changed: Dict[str, Any]  # Prepared mocks of new or modified capabilities
+    removed: Set[str]
+    interval: int
+
+
+class ConfigWatcher(Thread):
+    """Polls a config file and prepares changed capabilities in the background.
+
+    Parsing and preparing (e.g. opening traces) happens on this thread, the send loop only picks up the finished
+    result with `take()` between ticks. Unchanged capabilities are not part of the result so their state is kept.
+    `validate` is called with every changed, prepared capability and raises if the send loop couldn't build it,
+    a config that fails is rejected as a whole so a reload never stops the stream.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        cfg: Dict[str, Any],
+        interval: int,
+        prepare: Callable[[Dict[str, Any], int], Dict[str, Any]],
+        poll: float = 0.25,
+        validate: Optional[Callable[[str, Any], object]] = None,
+    ):
+        super().__init__(name="config-watcher", daemon=True)
+        self.path = path
+        self.prepare = prepare
+        self.poll = poll
+        self.validate = validate
+        self._mocks = cfg.get("mocks", {})
+        self._interval = cfg.get("interval", interval)
+        # Settings that can't be changed while running
+        self._fixed = {key: cfg.get(key) for key in FIXED_KEYS}
+        self._mtime = self._stat()
+        self._pending: Optional[Reload] = None
+        self._lock = Lock()
+        self._running = True
+
+    def _stat(self) -> Optional[tuple]:
+        try:
+            stat = os.stat(self.path)
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def take(self) -> Optional[Reload]:
+        """Returns the latest reload if there is one, cheap enough to call every tick."""
+        if self._pending is None:
+            return None
+        with self._lock:
+            reload, self._pending = self._pending, None
+        return reload
+
+    def stop(self):
+        self._running = False
+
+    def run(self):
+        while self._running:
+            time.sleep(self.poll)
+            mtime = self._stat()
+            if mtime is None or mtime == self._mtime:
+                continue
+            self._mtime = mtime
+            try:
+                with open(self.path) as f:
+                    cfg = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                # Probably saved halfway, the next write triggers another attempt
+                print(f"Ignoring config change, unable to parse '{self.path}': {e}")
+                continue
+            self._apply(cfg)
+
+    def _apply(self, cfg: Dict[str, Any]):
+        mocks = cfg.get("mocks", {})
+        interval = cfg.get("interval", self._interval)
+        if not isinstance(mocks, dict):
+            print("Ignoring config change: 'mocks' must be an object")
+            return
+        changed_raw = {
+            capability: value
+            for capability, value in mocks.items()
+            if capability not in self._mocks or self._mocks[capability] != value
+        }
+        removed = set(self._mocks) - set(mocks)
+
+        if isinstance(interval, bool) or not isinstance(interval, (int, float)) or interval <= 0:
+            print(f"Ignoring config change: interval must be a positive number of ms, got {interval!r}")
+            return
+        try:
+            changed = self.prepare(changed_raw, interval)
+            if self.validate is not None:
+                for capability, value in changed.items():
+                    self.validate(capability, value)
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            print(f"Ignoring config change, keeping the current config: {e}")
+            return
+
+        for key in FIXED_KEYS:
+            if cfg.get(key) != self._fixed[key]:
+                print(f"Changing '{key}' requires a restart, keeping the current value")
+                self._fixed[key] = cfg.get(key)
+
+        if not changed and not removed and interval == self._interval:
+            return
+
+        self._mocks = mocks
+        self._interval = interval
+        reload = Reload(list(mocks), changed, removed, interval)
+        with self._lock:
+            pending = self._pending
+            if pending is not None:
+                # The loop hasn't picked up the previous reload yet, merge both
+                merged = {k: v for k, v in pending.changed.items() if k in mocks}
+                merged.update(changed)
+                reload = Reload(
+                    list(mocks), merged, (pending.removed | removed) - set(mocks), interval
+                )
+            self._pending = reload
+        names = ", ".join(list(changed) + [f"-{name}" for name in removed])
+        print(f"Reloaded config ({names or f'interval {interval}ms'})")
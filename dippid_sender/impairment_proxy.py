@@ -0,0 +1,284 @@
+from __future__ import annotations
+import heapq
+import json
+import random
+import socket
+import time
+import click
+from typing import Dict, List, Optional, Tuple
+
+
+DEFAULT_LISTEN_PORT = 5750  # Clear of the game's player (5700, 5701) and spectator (5800) ports
+DEFAULT_TARGET = "127.0.0.1:5700"
+DEFAULT_OVERSIZE_BYTES = 4096
+CORRUPTIONS = ("truncate", "bitflip", "utf8", "types")
+
+
+class Impairments:
+    """Decides what happens to each datagram passing through the proxy.
+    Probabilities are per packet, times are in seconds."""
+
+    def __init__(
+        self,
+        latency: float = 0,
+        jitter: float = 0,
+        loss: float = 0,
+        burst_loss: float = 0,
+        burst_length: float = 1,
+        duplicate: float = 0,
+        reorder: float = 0,
+        reorder_delay: float = 0.05,
+        stall: float = 0,
+        stall_duration: float = 0.2,
+        corrupt: float = 0,
+        oversize: float = 0,
+        oversize_bytes: int = DEFAULT_OVERSIZE_BYTES,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.burst_loss = burst_loss
+        self.burst_length = max(1.0, burst_length)
+        self.duplicate = duplicate
+        self.reorder = reorder
+        self.reorder_delay = reorder_delay
+        self.stall = stall
+        self.stall_duration = stall_duration
+        self.corrupt = corrupt
+        self.oversize = oversize
+        self.oversize_bytes = oversize_bytes
+        self.random = random.Random(seed)
+        # Gilbert-Elliott loss model: while in a burst every packet is lost
+        self._in_burst = False
+        self._stalled_until = 0.0
+        self.stats: Dict[str, int] = {
+            "received": 0,
+            "forwarded": 0,
+            "lost": 0,
+            "burst_lost": 0,
+            "duplicated": 0,
+            "reordered": 0,
+            "stalled": 0,
+            "corrupted": 0,
+            "oversized": 0,
+        }
+
+    def process(self, payload: bytes, now: float) -> List[Tuple[float, bytes]]:
+        """Returns the (delivery time, payload) pairs to forward for a received datagram, empty if it is lost."""
+        rnd = self.random
+        self.stats["received"] += 1
+
+        # The burst may end before this packet, so bursts last `burst_length` packets on average including the first
+        if self._in_burst and rnd.random() < 1 / self.burst_length:
+            self._in_burst = False
+        if self._in_burst:
+            self.stats["burst_lost"] += 1
+            return []
+        if self.burst_loss and rnd.random() < self.burst_loss:
+            self._in_burst = True
+            self.stats["burst_lost"] += 1
+            return []
+        if self.loss and rnd.random() < self.loss:
+            self.stats["lost"] += 1
+            return []
+
+        if self.oversize and rnd.random() < self.oversize:
+            payload = self._oversize(payload)
+            self.stats["oversized"] += 1
+        if self.corrupt and rnd.random() < self.corrupt:
+            payload = self._corrupt(payload)
+            self.stats["corrupted"] += 1
+
+        copies = 1
+        if self.duplicate and rnd.random() < self.duplicate:
+            copies = 2
+            self.stats["duplicated"] += 1
+
+        # A stall holds back everything until it ends, which releases the queued packets as one burst
+        if self.stall and now >= self._stalled_until and rnd.random() < self.stall:
+            self._stalled_until = now + self.stall_duration
+        if now < self._stalled_until:
+            self.stats["stalled"] += 1
+
+        deliveries = []
+        for _ in range(copies):
+            delay = self.latency + (rnd.uniform(-self.jitter, self.jitter) if self.jitter else 0)
+            if self.reorder and rnd.random() < self.reorder:
+                # Hold the packet back long enough for later ones to overtake it
+                delay += self.reorder_delay
+                self.stats["reordered"] += 1
+            deliver_at = max(now + max(0.0, delay), self._stalled_until)
+            deliveries.append((deliver_at, payload))
+        return deliveries
+
+    def _oversize(self, payload: bytes) -> bytes:
+        """Pads the message with a filler key so it exceeds the receive buffer while staying valid JSON."""
+        try:
+            data = json.loads(payload)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return payload + b" " * self.oversize_bytes
+        if not isinstance(data, dict):
+            return payload
+        data["_padding"] = "x" * max(0, self.oversize_bytes - len(payload))
+        return json.dumps(data).encode()
+
+    def _corrupt(self, payload: bytes) -> bytes:
+        rnd = self.random
+        kind = rnd.choice(CORRUPTIONS)
+        if kind == "truncate" and len(payload) > 1:
+            return payload[: rnd.randrange(1, len(payload))]
+        if kind == "bitflip" and payload:
+            data = bytearray(payload)
+            for _ in range(rnd.randint(1, 4)):
+                data[rnd.randrange(len(data))] ^= 1 << rnd.randrange(8)
+            return bytes(data)
+        if kind == "utf8":
+            return payload[: len(payload) // 2] + b"\xff\xfe" + payload[len(payload) // 2 :]
+        # Valid JSON with values of the wrong type
+        try:
+            data = json.loads(payload)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return payload
+        if not isinstance(data, dict):
+            return payload
+        for key in data:
+            data[key] = rnd.choice([None, "nan", [], {"z": None}, True])
+        return json.dumps(data).encode()
+
+    def summary(self) -> str:
+        return ", ".join(f"{key} {value}" for key, value in self.stats.items() if value)
+
+
+def run_proxy(
+    listen: Tuple[str, int],
+    target: Tuple[str, int],
+    impairments: Impairments,
+    stats_interval: Optional[float] = None,
+    duration: Optional[float] = None,
+):
+    """Forwards datagrams from `listen` to `target` through the impairments until interrupted."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(listen)
+    out = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    out.connect(target)
+
+    queue: List[Tuple[float, int, bytes]] = []
+    seq = 0
+    start = time.monotonic()
+    next_stats = start + stats_interval if stats_interval else None
+
+    try:
+        while True:
+            now = time.monotonic()
+            if duration is not None and now - start >= duration:
+                break
+
+            # Deliver everything that is due
+            while queue and queue[0][0] <= now:
+                _, _, payload = heapq.heappop(queue)
+                try:
+                    out.send(payload)
+                    impairments.stats["forwarded"] += 1
+                except OSError:
+                    # Nobody listening on the target (yet)
+                    pass
+
+            if next_stats is not None and now >= next_stats:
+                print(f"[{now - start:8.1f}s] {impairments.summary()}")
+                next_stats += stats_interval
+
+            # Wait for the next packet, but not longer than the next delivery or stats output
+            deadlines = [t for t in (queue[0][0] if queue else None, next_stats) if t is not None]
+            timeout = min(deadlines) - now if deadlines else 0.1
+            sock.settimeout(min(0.1, max(0.0001, timeout)))
+            try:
+                payload, _ = sock.recvfrom(65535)
+            except (TimeoutError, socket.timeout):
+                continue
+
+            for deliver_at, data in impairments.process(payload, time.monotonic()):
+                heapq.heappush(queue, (deliver_at, seq, data))
+                seq += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sock.close()
+        out.close()
+        print(f"Proxy stats: {impairments.summary()}")
+
+
+def parse_address(address: str, default_ip: str = "127.0.0.1") -> Tuple[str, int]:
+    if ":" in address:
+        ip, port = address.rsplit(":", 1)
+        return ip or default_ip, int(port)
+    return default_ip, int(address)
+
+
+@click.command()
+@click.option(
+    "--listen", "-l", default=str(DEFAULT_LISTEN_PORT), help="[ip:]port the sender sends to", type=str
+)
+@click.option(
+    "--target", "-t", default=DEFAULT_TARGET, help="ip:port of the receiving SensorUDP", type=str
+)
+@click.option("--latency", default=0.0, help="Base delay in ms", type=float)
+@click.option("--jitter", default=0.0, help="Random delay of +/- this many ms", type=float)
+@click.option("--loss", default=0.0, help="Probability of losing a single packet", type=float)
+@click.option("--burst-loss", default=0.0, help="Probability of a loss burst starting", type=float)
+@click.option("--burst-length", default=5.0, help="Mean number of packets lost per burst", type=float)
+@click.option("--duplicate", default=0.0, help="Probability of sending a packet twice", type=float)
+@click.option("--reorder", default=0.0, help="Probability of holding a packet back so later ones overtake it", type=float)
+@click.option("--reorder-delay", default=50.0, help="Extra delay in ms for reordered packets", type=float)
+@click.option("--stall", default=0.0, help="Probability of a stall that releases queued packets as one burst", type=float)
+@click.option("--stall-duration", default=200.0, help="Stall length in ms", type=float)
+@click.option("--corrupt", default=0.0, help="Probability of a malformed payload", type=float)
+@click.option("--oversize", default=0.0, help="Probability of padding a payload beyond the receive buffer", type=float)
+@click.option("--oversize-bytes", default=DEFAULT_OVERSIZE_BYTES, help="Size of oversized payloads", type=int)
+@click.option("--seed", required=False, help="Random seed for reproducible runs", type=int)
+@click.option("--stats", "stats_interval", required=False, help="Print stats every this many seconds", type=float)
+@click.option("--duration", "-d", required=False, help="Stop after this many seconds", type=float)
+def run(
+    listen: str,
+    target: str,
+    latency: float,
+    jitter: float,
+    loss: float,
+    burst_loss: float,
+    burst_length: float,
+    duplicate: float,
+    reorder: float,
+    reorder_delay: float,
+    stall: float,
+    stall_duration: float,
+    corrupt: float,
+    oversize: float,
+    oversize_bytes: int,
+    seed: Optional[int],
+    stats_interval: Optional[float],
+    duration: Optional[float],
+):
+    impairments = Impairments(
+        latency=latency / 1000,
+        jitter=jitter / 1000,
+        loss=loss,
+        burst_loss=burst_loss,
+        burst_length=burst_length,
+        duplicate=duplicate,
+        reorder=reorder,
+        reorder_delay=reorder_delay / 1000,
+        stall=stall,
+        stall_duration=stall_duration / 1000,
+        corrupt=corrupt,
+        oversize=oversize,
+        oversize_bytes=oversize_bytes,
+        seed=seed,
+    )
+    listen_addr = parse_address(listen, "0.0.0.0")
+    target_addr = parse_address(target)
+    print(f"Forwarding {listen_addr[0]}:{listen_addr[1]} -> {target_addr[0]}:{target_addr[1]}")
+    run_proxy(listen_addr, target_addr, impairments, stats_interval, duration)
+
+
+if __name__ == "__main__":
+    run()
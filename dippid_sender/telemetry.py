@@ -0,0 +1,137 @@
+from __future__ import annotations
+import json
+import math
+import queue
+import sys
+import time
+from threading import Thread
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Stop marker for the writer thread
+_STOP = None
+
+
+def format_time(t: float) -> str:
+    return f"{t // 3600:02.0f}:{t % 3600 // 60:02.0f}:{t % 60:06.3f}"
+
+
+class Telemetry(Thread):
+    """Writes sender output from a background thread so a slow terminal can't stall the send loop.
+
+    Packets are handed over through a bounded queue. If the writer falls behind, packets are dropped instead of
+    blocking the sender. In summary mode only periodic rate, jitter and value range statistics are printed.
+    """
+
+    def __init__(
+        self,
+        summary: Optional[float] = None,
+        maxsize: int = 256,
+        stats: Optional[Callable[[], str]] = None,
+    ):
+        super().__init__(name="telemetry", daemon=True)
+        self.summary = summary
+        self.stats = stats
+        self.dropped = 0
+        self._queue: queue.Queue[Optional[Tuple[float, dict]]] = queue.Queue(maxsize)
+        self._reset_summary()
+
+    def submit(self, t: float, data: dict):
+        """Queues a packet for output, never blocks."""
+        try:
+            self._queue.put_nowait((t, data))
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        """Flushes the remaining output and stops the writer."""
+        try:
+            self._queue.put(_STOP, timeout=1)
+        except queue.Full:
+            pass
+        self.join(timeout=2)
+        if self.summary is not None:
+            self._print_summary()
+
+    def run(self):
+        next_summary = time.monotonic() + (self.summary or 0)
+        while True:
+            timeout = max(0.0, next_summary - time.monotonic()) if self.summary else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = False
+
+            if item is _STOP:
+                return
+            if item:
+                if self.summary is None:
+                    self._print_packet(*item)
+                else:
+                    self._collect(*item)
+
+            if self.summary is not None and time.monotonic() >= next_summary:
+                self._print_summary()
+                next_summary += self.summary
+
+    def _print_packet(self, t: float, data: dict):
+        sys.stdout.write(f"\nMockData at {format_time(t)}\n {json.dumps(data, indent=4)}\n")
+        sys.stdout.flush()
+
+    def _reset_summary(self):
+        self._count = 0
+        self._intervals = 0
+        self._last_t: Optional[float] = None
+        # Running sums of the tick intervals for the mean and standard deviation
+        self._dt_sum = 0.0
+        self._dt_sq_sum = 0.0
+        self._dt_max = 0.0
+        self._ranges: Dict[str, List[float]] = {}
+
+    def _collect(self, t: float, data: dict):
+        self._count += 1
+        if self._last_t is not None:
+            dt = t - self._last_t
+            self._intervals += 1
+            self._dt_sum += dt
+            self._dt_sq_sum += dt * dt
+            self._dt_max = max(self._dt_max, dt)
+        self._last_t = t
+
+        for capability, value in data.items():
+            values = value.items() if isinstance(value, dict) else ((None, value),)
+            for key, val in values:
+                if not isinstance(val, (int, float)):
+                    continue
+                name = f"{capability}.{key}" if key is not None else capability
+                r = self._ranges.get(name)
+                if r is None:
+                    self._ranges[name] = [val, val]
+                elif val < r[0]:
+                    r[0] = val
+                elif val > r[1]:
+                    r[1] = val
+
+    def _print_summary(self):
+        intervals = self._intervals
+        lines = [f"\n[{time.strftime('%H:%M:%S')}] {self._count} packets"]
+        if intervals > 0:
+            mean = self._dt_sum / intervals
+            std = math.sqrt(max(0.0, self._dt_sq_sum / intervals - mean * mean))
+            rate = 1 / mean if mean > 0 else 0.0
+            lines[0] += (
+                f", {rate:.1f} Hz, interval {mean * 1000:.2f}ms"
+                f" (jitter {std * 1000:.2f}ms, max {self._dt_max * 1000:.2f}ms)"
+            )
+        if self.dropped:
+            lines[0] += f", {self.dropped} dropped"
+        if self.stats:
+            lines.append(f"  {self.stats()}")
+        for name, (low, high) in self._ranges.items():
+            lines.append(f"  {name:<20} [{low:.3f}, {high:.3f}]")
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+
+        # Keep the last tick so the next window's first interval is measured as well
+        last_t = self._last_t
+        self._reset_summary()
+        self._last_t = last_t
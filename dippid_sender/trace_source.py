@@ -0,0 +1,102 @@
+from __future__ import annotations
+import mmap
+import os
+from typing import Dict, List, Optional, TypedDict
+
+
+class TraceConfig(TypedDict, total=False):
+    trace: str
+    columns: List[str]
+    rate: float
+    speed: float
+    loop: bool
+    dtype: str
+    width: int
+    offset: int
+
+
+class TraceSource:
+    """Plays back a pre-recorded trace from a memory-mapped `.npy` array or raw binary log.
+
+    Rows are only read when they are sampled, so memory use doesn't depend on the size of the trace.
+    Raw logs need a `dtype` and the number of values per row (`width`), `.npy` files carry both in their header.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        columns: Optional[List[str]] = None,
+        rate: float = 20,
+        speed: float = 1.0,
+        loop: bool = True,
+        dtype: str = "float32",
+        width: Optional[int] = None,
+        offset: int = 0,
+    ):
+        # numpy is only needed if traces are used
+        import numpy as np
+
+        self.path = path
+        if path.endswith(".npy"):
+            rows = np.load(path, mmap_mode="r")
+        else:
+            if width is None:
+                raise ValueError(f"Trace '{path}' is a raw log and needs a 'width'")
+            rows = np.memmap(path, dtype=dtype, mode="r", offset=offset)
+            # Ignore a trailing partial row, e.g. from a recording that was cut off
+            rows = rows[: len(rows) // width * width].reshape(-1, width)
+        if rows.ndim == 1:
+            rows = rows.reshape(-1, 1)
+        if rows.ndim != 2 or len(rows) == 0:
+            raise ValueError(f"Trace '{path}' must contain a non-empty 1D or 2D array")
+        if columns is not None and len(columns) > rows.shape[1]:
+            raise ValueError(
+                f"Trace '{path}' has {rows.shape[1]} columns but {len(columns)} are mapped"
+            )
+        if rate <= 0 or speed <= 0:
+            raise ValueError(f"Trace '{path}' needs a positive rate and speed")
+
+        # Rows are streamed in order, so let the kernel read ahead and drop pages behind us
+        raw_mmap = getattr(rows, "_mmap", None)
+        if raw_mmap is not None and hasattr(mmap, "MADV_SEQUENTIAL"):
+            raw_mmap.madvise(mmap.MADV_SEQUENTIAL)
+
+        self._rows = rows
+        self.columns = columns
+        self.rate = rate
+        self.speed = speed
+        self.loop = loop
+
+    @staticmethod
+    def from_config(cfg: TraceConfig, interval: int, base_dir: str) -> TraceSource:
+        """Creates a trace from a mock config entry. Relative paths are resolved against the config file and the
+        rate defaults to one row per tick."""
+        path = cfg["trace"]
+        if not os.path.isabs(path):
+            path = os.path.join(base_dir, path)
+        return TraceSource(
+            path,
+            columns=cfg.get("columns"),
+            rate=cfg.get("rate", 1000 / interval),
+            speed=cfg.get("speed", 1.0),
+            loop=cfg.get("loop", True),
+            dtype=cfg.get("dtype", "float32"),
+            width=cfg.get("width"),
+            offset=cfg.get("offset", 0),
+        )
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def sample(self, t: float) -> Dict[Optional[str], float]:
+        """Returns the row recorded at time `t`. Loops or holds the last row once the trace ends."""
+        index = int(t * self.speed * self.rate)
+        if self.loop:
+            index %= len(self._rows)
+        else:
+            index = min(index, len(self._rows) - 1)
+
+        values = self._rows[index].tolist()
+        if self.columns is None:
+            return {None: values[0]}
+        return {name: values[i] for i, name in enumerate(self.columns)}
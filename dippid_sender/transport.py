@@ -0,0 +1,186 @@
+from __future__ import annotations
+import ctypes
+import ctypes.util
+import socket
+import struct
+import sys
+from typing import List, Optional, Tuple
+
+Address = Tuple[str, int]
+
+
+class _IOVec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_name", ctypes.c_void_p),
+        ("msg_namelen", ctypes.c_uint32),
+        ("msg_iov", ctypes.POINTER(_IOVec)),
+        ("msg_iovlen", ctypes.c_size_t),
+        ("msg_control", ctypes.c_void_p),
+        ("msg_controllen", ctypes.c_size_t),
+        ("msg_flags", ctypes.c_int),
+    ]
+
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [("msg_hdr", _MsgHdr), ("msg_len", ctypes.c_uint)]
+
+
+class _SockAddrIn(ctypes.Structure):
+    _fields_ = [
+        ("sin_family", ctypes.c_ushort),
+        ("sin_port", ctypes.c_uint8 * 2),
+        ("sin_addr", ctypes.c_uint8 * 4),
+        ("sin_zero", ctypes.c_uint8 * 8),
+    ]
+
+
+def _load_sendmmsg():
+    """Returns libc's sendmmsg if the platform has it (Linux), otherwise None."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        func = libc.sendmmsg
+    except (OSError, AttributeError):
+        return None
+    func.argtypes = [ctypes.c_int, ctypes.POINTER(_MMsgHdr), ctypes.c_uint, ctypes.c_int]
+    func.restype = ctypes.c_int
+    return func
+
+
+_sendmmsg = _load_sendmmsg()
+
+
+class Transport:
+    """Sends datagrams to one or more destinations.
+
+    A single destination uses a connected socket so the kernel doesn't resolve the address for every packet.
+    With `batch` > 1 packets are queued and flushed together, using one `sendmmsg` call per flush where
+    available and one `send`/`sendto` per packet otherwise."""
+
+    def __init__(self, destinations: List[Address], batch: int = 1):
+        if not destinations:
+            raise ValueError("At least one destination is required")
+        self.destinations = [(socket.gethostbyname(ip), port) for ip, port in destinations]
+        self.batch = max(1, batch)
+        self.connected = len(self.destinations) == 1
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        if self.connected:
+            self.sock.connect(self.destinations[0])
+        # Each queued entry is the payload and the index of its destination
+        self._queue: List[Tuple[bytes, int]] = []
+        self._ticks_queued = 0
+        self._addrs = [self._sockaddr(addr) for addr in self.destinations]
+        # Message headers for a full batch are built once and only get new payload pointers per flush
+        capacity = self.batch * len(self.destinations)
+        self._iovecs = (_IOVec * capacity)()
+        self._msgs = (_MMsgHdr * capacity)()
+        for i in range(capacity):
+            hdr = self._msgs[i].msg_hdr
+            hdr.msg_iov = ctypes.pointer(self._iovecs[i])
+            hdr.msg_iovlen = 1
+            if not self.connected:
+                addr = self._addrs[i % len(self.destinations)]
+                hdr.msg_name = ctypes.cast(ctypes.pointer(addr), ctypes.c_void_p)
+                hdr.msg_namelen = ctypes.sizeof(_SockAddrIn)
+        # Calls that failed only count as errors, so syscalls per packet reflects how well packets are batched
+        self.packets = 0
+        self.syscalls = 0
+        self.errors = 0
+
+    @staticmethod
+    def _sockaddr(addr: Address) -> _SockAddrIn:
+        sa = _SockAddrIn()
+        sa.sin_family = socket.AF_INET
+        sa.sin_port[:] = struct.pack("!H", addr[1])
+        sa.sin_addr[:] = socket.inet_aton(addr[0])
+        return sa
+
+    @property
+    def uses_sendmmsg(self) -> bool:
+        return _sendmmsg is not None and self.batch > 1
+
+    def send(self, payload: bytes):
+        """Sends the payload to every destination, or queues it until a full batch of ticks is collected."""
+        if self.batch == 1 and self.connected:
+            self._send_one(payload, 0)
+            return
+        for index in range(len(self.destinations)):
+            self._queue.append((payload, index))
+        self._ticks_queued += 1
+        if self._ticks_queued >= self.batch:
+            self.flush()
+
+    def flush(self):
+        """Sends all queued datagrams."""
+        if not self._queue:
+            return
+        if _sendmmsg is not None and len(self._queue) > 1:
+            self._flush_sendmmsg()
+        else:
+            for payload, index in self._queue:
+                self._send_one(payload, index)
+        self._queue.clear()
+        self._ticks_queued = 0
+
+    def _send_one(self, payload: bytes, index: int):
+        try:
+            if self.connected:
+                self.sock.send(payload)
+            else:
+                self.sock.sendto(payload, self.destinations[index])
+        except OSError:
+            # e.g. ECONNREFUSED from a previous packet while nobody listens, keep sending
+            self.errors += 1
+            return
+        self.syscalls += 1
+        self.packets += 1
+
+    def _flush_sendmmsg(self):
+        count = len(self._queue)
+        iovecs = self._iovecs
+        # Queued entries are in destination order for each tick, matching the prepared headers.
+        # The payloads are referenced by the queue, so their memory stays valid until the call returns.
+        for i, (payload, _) in enumerate(self._queue):
+            iovecs[i].iov_base = ctypes.cast(ctypes.c_char_p(payload), ctypes.c_void_p)
+            iovecs[i].iov_len = len(payload)
+        msgs = self._msgs
+
+        offset = 0
+        while offset < count:
+            sent = _sendmmsg(
+                self.sock.fileno(),
+                ctypes.cast(ctypes.byref(msgs, offset * ctypes.sizeof(_MMsgHdr)), ctypes.POINTER(_MMsgHdr)),
+                count - offset,
+                0,
+            )
+            if sent < 0:
+                # Skip the datagram that failed and continue with the rest of the batch
+                self.errors += 1
+                offset += 1
+                continue
+            self.syscalls += 1
+            self.packets += sent
+            offset += sent
+
+    def syscalls_per_packet(self) -> Optional[float]:
+        return self.syscalls / self.packets if self.packets else None
+
+    def stats(self) -> str:
+        ratio = self.syscalls_per_packet()
+        mode = "connected" if self.connected else f"{len(self.destinations)} destinations"
+        if self.batch > 1:
+            mode += f", batch {self.batch} via {'sendmmsg' if _sendmmsg else 'send loop'}"
+        return (
+            f"{self.packets} packets, {self.syscalls} syscalls"
+            f" ({'n/a' if ratio is None else f'{ratio:.3f}'} syscalls/packet, {mode})"
+            + (f", {self.errors} failed sends" if self.errors else "")
+        )
+
+    def close(self):
+        self.flush()
+        self.sock.close()
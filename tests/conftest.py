@@ -0,0 +1,2 @@
+# Nothing is drawn, the tests run without a display
+import src.no_display  # noqa: F401
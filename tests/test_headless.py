@@ -0,0 +1,29 @@
+from config import PLAYER_2_PORT, WIN_CONDITION
+from src.headless import HeadlessGame, MatchResult
+
+
+def park_left(game: HeadlessGame):
+    """Holds the left paddle at the bottom, alternating the value like a real device so every packet is an input."""
+    game.sensor("left").push(gravity={"z": -9.81 if game.ticks % 2 else -9.8}, button_1=1)
+
+
+def play(seed: int) -> MatchResult:
+    game = HeadlessGame(seed=seed)
+    try:
+        result = game.run_match(max_duration=120, controller=park_left)
+        assert game.paddle("left").connected
+        assert game.paddle("left").gameobject.y == 0
+        return result
+    finally:
+        game.close()
+
+
+def test_parked_player_loses_every_point():
+    result = play(seed=1)
+    assert result.winner == PLAYER_2_PORT
+    assert result.scores == (0, WIN_CONDITION)
+
+
+def test_same_seed_replays_the_same_match():
+    assert play(seed=7) == play(seed=7)
+    assert play(seed=7).ticks != play(seed=8).ticks
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from GUI import RingBuffer, StreamRecorder, decimate_minmax, flatten
+
+HISTORY = 1000
+BINS = 50
+
+
+def filled_buffer(samples: int) -> RingBuffer:
+    buffer = RingBuffer(HISTORY)
+    rnd = np.random.default_rng(0)
+    for i, value in enumerate(rnd.uniform(-10, 10, samples)):
+        buffer.append(i * 0.01, value)
+    return buffer
+
+
+def test_ring_buffer_keeps_the_newest_samples_in_order():
+    buffer = filled_buffer(HISTORY + HISTORY // 3)
+    times, values = np.zeros(HISTORY), np.zeros(HISTORY)
+    n = buffer.copy_to(times, values)
+    assert n == HISTORY
+    assert np.all(np.diff(times) > 0)
+    assert times[-1] == pytest.approx((HISTORY + HISTORY // 3 - 1) * 0.01)
+
+
+def test_decimation_keeps_the_extremes_and_the_newest_sample():
+    buffer = filled_buffer(HISTORY + HISTORY // 3)
+    times, values = np.zeros(HISTORY), np.zeros(HISTORY)
+    n = buffer.copy_to(times, values)
+    out_times, out_values = np.zeros(2 * BINS), np.zeros(2 * BINS)
+    count = decimate_minmax(times, values, n, BINS, out_times, out_values)
+    assert count == 2 * BINS
+    assert out_values.min() == values.min()
+    assert out_values.max() == values.max()
+    assert out_times[-1] == times[-1]
+
+
+def test_few_samples_are_drawn_as_they_are():
+    buffer = filled_buffer(BINS)
+    times, values = np.zeros(HISTORY), np.zeros(HISTORY)
+    n = buffer.copy_to(times, values)
+    out_times, out_values = np.zeros(2 * BINS), np.zeros(2 * BINS)
+    assert decimate_minmax(times, values, n, BINS, out_times, out_values) == BINS
+    assert np.array_equal(out_values[:BINS], values[:BINS])
+
+
+def test_monitor_plots_every_channel_offscreen(monkeypatch):
+    pytest.importorskip("pyqtgraph")
+    monkeypatch.setenv("QT_QPA_PLATFORM", "offscreen")
+    from GUI import Monitor
+
+    recorder = StreamRecorder(0, ip="127.0.0.1", history=HISTORY)
+    try:
+        message = {"gravity": {"x": 0.0, "y": 0.0, "z": 9.81}, "button_1": 1, "name": "not a number"}
+        for i in range(HISTORY * 2):
+            message["gravity"]["x"] = float(i % 7)
+            recorder.record(i * 0.01, message)
+        monitor = Monitor(recorder, bins=BINS, fps=1)
+        monitor.refresh()
+        assert set(monitor.curves) == {name for name, _ in flatten(message)}
+        assert set(monitor.plots) == {"gravity", "button_1"}
+        x, y = monitor.curves["gravity.x"].getData()
+        assert len(x) == 2 * BINS
+        assert (y.min(), y.max()) == (0.0, 6.0)
+        assert monitor.frames == 1
+        monitor.timer.stop()
+        monitor.widget.close()
+    finally:
+        recorder.stop()